@@ -1,4 +1,4 @@
 # API submodule
-from fastapi import APIRouter
+from app.api.router import router as api_router
 
-api_router = APIRouter()
\ No newline at end of file
+__all__ = ["api_router"]
\ No newline at end of file
@@ -0,0 +1,66 @@
+from fastapi import Request
+from supabase import AsyncClient
+from app.infrastructure.job_queue import JobQueue
+from app.infrastructure.supabase_client import SupabaseClient
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.company_repository import CompanyRepository
+from app.services.auth_service import AuthService
+from app.services.embedding_service import EmbeddingService
+from app.services.facet_service import CandidateFacetService
+from app.services.resume_evaluation_service import ResumeEvaluationService
+from app.services.resume_service import ResumeService
+from app.services.search_service import CandidateSearchService
+from app.services.skill_service import SkillService
+
+def get_auth_service(request: Request) -> AuthService:
+    """The AuthService built by the lifespan."""
+    return request.app.state.auth_service
+
+def get_auth_repository(request: Request) -> AuthRepository:
+    """The user repository shared with the AuthService."""
+    return request.app.state.auth_repository
+
+def get_company_repository(request: Request) -> CompanyRepository:
+    """The company repository shared with the AuthService."""
+    return request.app.state.company_repository
+
+def get_resume_service(request: Request) -> ResumeService:
+    """The ResumeService built by the lifespan."""
+    return request.app.state.resume_service
+
+def get_resume_evaluation_service(request: Request) -> ResumeEvaluationService:
+    """The ResumeEvaluationService built by the lifespan."""
+    return request.app.state.resume_evaluation_service
+
+def get_skill_service(request: Request) -> SkillService:
+    """The SkillService built by the lifespan."""
+    return request.app.state.skill_service
+
+def get_embedding_service(request: Request) -> EmbeddingService:
+    """The EmbeddingService built by the lifespan."""
+    return request.app.state.embedding_service
+
+def get_search_service(request: Request) -> CandidateSearchService:
+    """The CandidateSearchService built by the lifespan."""
+    return request.app.state.search_service
+
+def get_facet_service(request: Request) -> CandidateFacetService:
+    """The CandidateFacetService built by the lifespan."""
+    return request.app.state.facet_service
+
+def get_job_queue(request: Request) -> JobQueue:
+    """The background JobQueue started by the lifespan."""
+    return request.app.state.job_queue
+
+def get_supabase_client() -> AsyncClient:
+    """The pooled supabase client opened by the lifespan."""
+    return SupabaseClient.get_instance()
+
+"""
+1. Dependencies:
+    . Routes declare what they need with Depends(...) instead of building it at import time
+    . Services and repositories are built once in the lifespan (main.py) and kept on app.state
+    . Tests and benchmarks can swap them with app.dependency_overrides
+
+2. Nothing here connects or constructs anything; importing the API has no side effects
+"""
@@ -1,7 +1,21 @@
 from fastapi import APIRouter
 from app.api.v1.auth.auth import router as auth_router
-from api.v1.auth.verification import router as verification_router
+from app.api.v1.auth.verification import router as verification_router
+from app.api.v1.resume.resume import router as resume_router
+from app.api.v1.search.search import router as search_router
+from app.api.v1.admin.cache import router as admin_cache_router
+from app.api.v1.admin.export import router as admin_export_router
+from app.api.v1.admin.jobs import router as admin_jobs_router
+from app.api.v1.admin.rate_limits import router as admin_rate_limits_router
+from app.api.v1.admin.supabase import router as admin_supabase_router
 
 router = APIRouter()
 router.include_router(auth_router, tags=["auth"])
-router.include_router(verification_router, tags=["verify"])
\ No newline at end of file
+router.include_router(verification_router, tags=["verify"])
+router.include_router(resume_router, tags=["resume"])
+router.include_router(search_router, tags=["search"])
+router.include_router(admin_export_router, tags=["admin"])
+router.include_router(admin_cache_router, tags=["admin"])
+router.include_router(admin_rate_limits_router, tags=["admin"])
+router.include_router(admin_jobs_router, tags=["admin"])
+router.include_router(admin_supabase_router, tags=["admin"])
\ No newline at end of file
@@ -0,0 +1,15 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, Request
+
+from app.core.security import require_admin
+from app.repositories.company_repository import CompanyRepository
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/cache/stats", summary="Repository cache statistics")
+async def cache_stats(request: Request) -> Dict[str, Any]:
+    """Hit, miss and eviction counters of the repository and LLM response caches in this worker."""
+    return {
+        "companies": CompanyRepository.cache_stats(),
+        "llm_responses": request.app.state.resume_evaluation_service.llm.stats(),
+    }
@@ -0,0 +1,39 @@
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.api.deps import get_auth_repository, get_company_repository
+from app.core.security import require_admin
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.base import BaseRepository
+from app.repositories.company_repository import CompanyRepository
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+async def _ndjson(repository: BaseRepository[BaseModel], batch_size: int) -> AsyncIterator[bytes]:
+    """Encode one page at a time so memory stays flat regardless of table size."""
+    lines = []
+    async for entity in repository.iter_all(batch_size):
+        lines.append(entity.model_dump_json())
+        if len(lines) == batch_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+@router.get("/admin/users/export", summary="Export all users as NDJSON")
+async def export_users(
+    batch_size: int = Query(500, ge=1, le=5000),
+    auth_repo: AuthRepository = Depends(get_auth_repository)
+):
+    """Stream every user, one JSON object per line."""
+    return StreamingResponse(_ndjson(auth_repo, batch_size), media_type="application/x-ndjson")
+
+@router.get("/admin/companies/export", summary="Export all companies as NDJSON")
+async def export_companies(
+    batch_size: int = Query(500, ge=1, le=5000),
+    company_repo: CompanyRepository = Depends(get_company_repository)
+):
+    """Stream every company, one JSON object per line."""
+    return StreamingResponse(_ndjson(company_repo, batch_size), media_type="application/x-ndjson")
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import get_job_queue
+from app.core.exceptions import NotFoundException
+from app.core.security import require_admin
+from app.infrastructure.job_queue import JOB_STATUSES, JobQueue
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/jobs/stats", summary="Background job statistics")
+async def job_stats(jobs: JobQueue = Depends(get_job_queue)) -> Dict[str, Any]:
+    """Counters of this worker's queue and job counts per status in the store."""
+    return await jobs.stats()
+
+@router.get("/admin/jobs", summary="List background jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(" + "|".join(JOB_STATUSES) + ")$"),
+    limit: int = Query(100, ge=1, le=1000),
+    jobs: JobQueue = Depends(get_job_queue)
+) -> List[Dict[str, Any]]:
+    """Most recently updated jobs, optionally only those with one status (status=dead for the dead letters)."""
+    return [job.to_dict() for job in await jobs.list(status, limit)]
+
+@router.get("/admin/jobs/{job_id}", summary="Get a background job")
+async def get_job(job_id: str, jobs: JobQueue = Depends(get_job_queue)) -> Dict[str, Any]:
+    job = await jobs.get(job_id)
+    if job is None:
+        raise NotFoundException("Job not found")
+    return job.to_dict()
+
+@router.post("/admin/jobs/{job_id}/retry", summary="Retry a dead-lettered job")
+async def retry_job(job_id: str, jobs: JobQueue = Depends(get_job_queue)) -> Dict[str, Any]:
+    """Queue a dead job again with a fresh set of attempts."""
+    job = await jobs.retry(job_id)
+    if job is None:
+        raise NotFoundException("No dead job with this id")
+    return job.to_dict()
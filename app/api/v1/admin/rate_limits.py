@@ -0,0 +1,12 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from app.core.rate_limit import rate_limiter
+from app.core.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/rate-limits/stats", summary="Rate limiter statistics")
+async def rate_limit_stats() -> Dict[str, Any]:
+    """Hits, rejections, tracked keys and expirations per route and dimension in this worker."""
+    return rate_limiter.stats()
@@ -0,0 +1,13 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_admin
+from app.infrastructure.supabase_client import SupabaseClient
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/supabase/resilience", summary="Supabase circuit breakers, retries and hedging")
+async def resilience_stats() -> Dict[str, Any]:
+    """Breaker state, retry budget and timeout/retry/hedge counters of this worker's Supabase client."""
+    resilience = SupabaseClient.get_resilience()
+    return {"enabled": resilience is not None, **(resilience.stats() if resilience else {})}
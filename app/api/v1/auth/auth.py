@@ -1,83 +1,159 @@
-from fastapi import APIRouter, HTTPException
+import logging
 
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from app.api.deps import get_auth_service
 from app.api.v1.auth.schemas import (
+    BulkRegistrationRequest,
+    BulkRegistrationResponse,
+    BulkRegistrationResult,
     LoginRequest, 
     PasswordResetRequest, 
     RegistrationRequest, 
     UserResponse
 )
-from app.domain.auth.models import UserCreate
+from app.core.exceptions import ServiceUnavailableException
+from app.core.rate_limit import rate_limiter
+from app.core.security import require_admin
+from app.domain.auth.models import UserCreate, UserRegistration
+from app.infrastructure.supabase_client import track_round_trips
 from app.services.auth_service import AuthService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
-auth_service = AuthService()
+
+def _registration_from_request(request: RegistrationRequest) -> UserRegistration:
+    user_data = UserCreate(
+        email=request.email,
+        phone=request.phone,
+        first_name=request.first_name,
+        last_name=request.last_name,
+        country=request.country,
+        user_type=request.user_type,
+        work_status=request.work_status,
+        password=request.password
+    )
+    
+    company_data = None
+    if request.user_type == "client":
+        company_data = {
+            "company_name": request.company_name,
+            "registration_number": request.registration_number,
+            "country": request.company_country
+        }
+    
+    return UserRegistration(
+        user_data=user_data,
+        registration_type=request.registration_type,
+        company_data=company_data,
+        auth_provider=request.auth_provider,
+        social_id=request.social_id
+    )
 
 @router.post("/register", response_model=UserResponse)
-async def register_user(request: RegistrationRequest):
+async def register_user(request: RegistrationRequest, auth_service: AuthService = Depends(get_auth_service)):
     """Register a new user."""
     try:
-        user_data = UserCreate(
-            email=request.email,
-            phone=request.phone,
-            first_name=request.first_name,
-            last_name=request.last_name,
-            country=request.country,
-            user_type=request.user_type,
-            work_status=request.work_status,
-            password=request.password
+        registration = _registration_from_request(request)
+        user = await auth_service.register_user(
+            user_data=registration.user_data,
+            registration_type=registration.registration_type,
+            company_data=registration.company_data,
+            auth_provider=registration.auth_provider,
+            social_id=registration.social_id
         )
         
-        company_data = None
-        if request.user_type == "client":
-            company_data = {
-                "company_name": request.company_name,
-                "registration_number": request.registration_number,
-                "country": request.company_country
-            }
-        
-        user = await auth_service.register_user(
-            user_data=user_data,
-            registration_type=request.registration_type,
-            company_data=company_data,
-            auth_provider=request.auth_provider,
-            social_id=request.social_id
+        return UserResponse.project(user)
+    except ServiceUnavailableException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/register/bulk", response_model=BulkRegistrationResponse, dependencies=[Depends(require_admin)])
+async def register_users_bulk(
+    request: BulkRegistrationRequest,
+    http_request: Request,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Register many users in one request, reporting success or failure per row.
+
+    Admins only (onboarding client companies): one call creates up to 1000 accounts and queues as many password hashes.
+    """
+    rate_limiter.check("register_bulk", http_request)
+    try:
+        outcomes = await auth_service.register_users_bulk(
+            [_registration_from_request(item) for item in request.users]
         )
         
-        return UserResponse(**user.model_dump())
+        results = [
+            BulkRegistrationResult(
+                index=outcome.index,
+                success=outcome.user is not None,
+                user=UserResponse.project(outcome.user) if outcome.user else None,
+                error=outcome.error
+            )
+            for outcome in outcomes
+        ]
+        created = sum(result.success for result in results)
+        return BulkRegistrationResponse(created=created, failed=len(results) - created, results=results)
+    except ServiceUnavailableException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/login", response_model=UserResponse)
-async def login_user(request: LoginRequest):
+async def login_user(
+    request: LoginRequest,
+    response: Response,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Login user with various methods."""
     try:
-        user = await auth_service.login_user(
-            email=request.email,
-            password=request.password,
-            phone=request.phone,
-            otp=request.otp,
-            auth_provider=request.auth_provider,
-            social_id=request.social_id
-        )
+        with track_round_trips() as round_trips:
+            user = await auth_service.login_user(
+                email=request.email,
+                password=request.password,
+                phone=request.phone,
+                otp=request.otp,
+                auth_provider=request.auth_provider,
+                social_id=request.social_id
+            )
         
-        return UserResponse(**user.model_dump())
+        response.headers["X-Supabase-Round-Trips"] = str(round_trips.count)
+        logger.info("Login completed", extra={
+            "login_method": request.auth_provider or ("password" if request.password else "otp"),
+            "supabase_round_trips": round_trips.count
+        })
+        return UserResponse.project(user)
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-@router.post("/send-otp")
-async def send_otp(phone: str):
-    """Send OTP for phone verification."""
+@router.post("/send-otp", status_code=202)
+async def send_otp(phone: str, http_request: Request, auth_service: AuthService = Depends(get_auth_service)):
+    """Send OTP for phone verification. Answers as soon as the SMS is queued."""
+    rate_limiter.check("send_otp", http_request, phone=phone)
     try:
-        await auth_service.send_otp(phone)
-        return {"message": "OTP sent successfully"}
+        job_id = await auth_service.send_otp(phone)
+        return {"message": "OTP is being sent", "job_id": job_id}
+    except ServiceUnavailableException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/reset-password")
-async def reset_password(request: PasswordResetRequest):
-    """Send password reset email."""
+@router.post("/reset-password", status_code=202)
+async def reset_password(
+    request: PasswordResetRequest,
+    http_request: Request,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """Send password reset email. Answers as soon as the email is queued."""
+    rate_limiter.check("reset_password", http_request, email=request.email, phone=request.phone)
     try:
-        await auth_service.reset_password(request.email)
-        return {"message": "Password reset email sent successfully"}
+        job_id = await auth_service.reset_password(request.email)
+        return {"message": "Password reset email is being sent", "job_id": job_id}
+    except ServiceUnavailableException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
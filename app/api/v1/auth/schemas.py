@@ -1,8 +1,7 @@
 from datetime import datetime
 from uuid import UUID
-import phonenumbers
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional, Literal
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+from typing import List, Optional, Literal
 
 class RegistrationRequest(BaseModel):
     user_type: Literal["job_seeker", "client"]
@@ -21,17 +20,19 @@ class RegistrationRequest(BaseModel):
     social_id: Optional[str] = None
     auth_provider: Optional[str] = None
     
-    @field_validator
-    def validate_phone(cls, v, info):
-        region = info.data.get("region", "IN")
-        if cls.phone is not None:
+    @model_validator(mode="after")
+    def validate_phone(self):
+        region = self.region or "IN"
+        if self.phone is not None:
+            # Imported on first use: its metadata tables are not needed to boot the API
+            import phonenumbers
             try:
-                parsed = phonenumbers.parse(v, region)
+                parsed = phonenumbers.parse(self.phone, region)
                 if not phonenumbers.is_valid_number_for_region(parsed, region):
                     raise ValueError(f"Invalid phone number for region {region}")
             except Exception:
                 raise ValueError(f"Invalid phone number for region {region}")
-        return v
+        return self
     
 class LoginRequest(BaseModel):
     email: Optional[EmailStr] = None
@@ -41,23 +42,25 @@ class LoginRequest(BaseModel):
     auth_provider: Optional[str] = None
     social_id: Optional[str] = None
     
-    @field_validator
-    def validate_login_method(cls, v):
-        if not any([v.email, v.phone, v.social_id]):
+    @model_validator(mode="after")
+    def validate_login_method(self):
+        if not any([self.email, self.phone, self.social_id]):
             raise ValueError("At least one login method must be provided")
-        return v
+        return self
     
 class PasswordResetRequest(BaseModel):
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
     
-    @field_validator
-    def validate_reset_method(cls, v):
-        if not v.email and not v.phone:
+    @model_validator(mode="after")
+    def validate_reset_method(self):
+        if not self.email and not self.phone:
             raise ValueError("Either email or phone must be provided")
-        return v
+        return self
     
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: UUID
     email: Optional[EmailStr]
     first_name: str
@@ -69,11 +72,31 @@ class UserResponse(BaseModel):
     work_status: Optional[str]
     company_id: Optional[UUID]
     created_at: datetime
-    updated_at: datetime      
+    updated_at: datetime
+    
+    @classmethod
+    def project(cls, user: BaseModel) -> "UserResponse":
+        """Copy the response fields off an already-validated user without validating them again."""
+        return cls.model_construct(**{name: getattr(user, name) for name in cls.model_fields})
+    
+class BulkRegistrationRequest(BaseModel):
+    users: List[RegistrationRequest] = Field(..., min_length=1, max_length=1000)
+    
+class BulkRegistrationResult(BaseModel):
+    index: int
+    success: bool
+    user: Optional[UserResponse] = None
+    error: Optional[str] = None
+    
+class BulkRegistrationResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRegistrationResult]
     
 class PhoneVerificationRequest(BaseModel):
     phone: str
     
 class VerificationResponse(BaseModel):
     success: bool
-    message: str
\ No newline at end of file
+    message: str
+    job_id: Optional[str] = None  # background job delivering the message, when one was queued
\ No newline at end of file
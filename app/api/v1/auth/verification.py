@@ -1,20 +1,31 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from supabase import AsyncClient
 
+from app.api.deps import get_auth_service, get_supabase_client
 from app.api.v1.auth.schemas import PhoneVerificationRequest, VerificationResponse
-from app.infrastructure.supabase_client import SupabaseClient
+from app.core.exceptions import ServiceUnavailableException
+from app.core.rate_limit import rate_limiter
+from app.services.auth_service import AuthService
 
 router = APIRouter()
-supabase_client = SupabaseClient.get_instance()
 
-@router.post("/verify/email/resend", summary="Resend verification email")
-async def resend_email_verification(email: str):
-    """Resend email verification link."""
+@router.post("/verify/email/resend", summary="Resend verification email", status_code=202)
+async def resend_email_verification(
+    email: str,
+    http_request: Request,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """Resend email verification link. Answers as soon as the email is queued."""
+    rate_limiter.check("verify_email_resend", http_request, email=email)
     try:
-        await supabase_client.auth.resend_signup_email(email)
+        job_id = await auth_service.resend_verification_email(email)
         return {
             "success": True,
-            "message": "Verification email sent successfully"
+            "message": "Verification email is being sent",
+            "job_id": job_id
         }
+    except ServiceUnavailableException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -22,7 +33,11 @@ async def resend_email_verification(email: str):
         )
 
 @router.post("/verify/phone", response_model=VerificationResponse)
-async def verify_phone(request: PhoneVerificationRequest, otp: str):
+async def verify_phone(
+    request: PhoneVerificationRequest,
+    otp: str,
+    supabase_client: AsyncClient = Depends(get_supabase_client)
+):
     """Verify phone number with OTP."""
     try:
         response = await supabase_client.auth.verify_otp({
@@ -43,20 +58,24 @@ async def verify_phone(request: PhoneVerificationRequest, otp: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/verify/phone/resend", response_model=VerificationResponse)
+@router.post("/verify/phone/resend", response_model=VerificationResponse, status_code=202)
 async def resend_phone_verification(
-    request: PhoneVerificationRequest
+    request: PhoneVerificationRequest,
+    http_request: Request,
+    auth_service: AuthService = Depends(get_auth_service)
 ):
-    """Resend phone verification OTP."""
+    """Resend phone verification OTP. Answers as soon as the SMS is queued."""
+    rate_limiter.check("verify_phone_resend", http_request, phone=request.phone)
     try:
-        await supabase_client.auth.sign_in_with_otp({
-            "phone": request.phone
-        })
+        job_id = await auth_service.send_otp(request.phone)
         
         return VerificationResponse(
             success=True,
-            message="OTP sent successfully"
+            message="OTP is being sent",
+            job_id=job_id
         )
+    except ServiceUnavailableException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
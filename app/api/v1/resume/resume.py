@@ -0,0 +1,114 @@
+import json
+from typing import Any, AsyncIterator, Dict
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_resume_evaluation_service, get_resume_service, get_skill_service
+from app.api.v1.resume.schemas import (
+    ResumeEvaluationRequest,
+    ResumeEvaluationResponse,
+    ResumeResponse,
+    ResumeSkillsResponse,
+    ResumeUploadResponse
+)
+from app.core.exceptions import AppException
+from app.core.security import get_current_user
+from app.domain.resume.models import ResumePage
+from app.services.resume_evaluation_service import ResumeEvaluationService
+from app.services.resume_service import ResumeService, SpooledUpload, spool_request
+from app.services.skill_service import SkillService
+
+router = APIRouter()
+
+async def _ndjson_pages(
+    first: ResumePage,
+    pages: AsyncIterator[ResumePage],
+    upload: SpooledUpload
+) -> AsyncIterator[bytes]:
+    """Page lines as they are parsed, then a summary line (or an error line once the status is sent)."""
+    page_count = characters = 0
+    try:
+        page = first
+        while page is not None:
+            page_count += 1
+            characters += len(page.text)
+            yield (page.model_dump_json() + "\n").encode()
+            page = await anext(pages, None)
+        yield (json.dumps({"done": True, "page_count": page_count, "characters": characters}) + "\n").encode()
+    except AppException as e:
+        yield (json.dumps({"done": False, "error": e.message}) + "\n").encode()
+    finally:
+        await pages.aclose()
+        upload.close()
+
+@router.put("/resumes/me", response_model=ResumeUploadResponse, summary="Upload your resume")
+async def upload_resume(
+    http_request: Request,
+    stream: bool = Query(False, description="Stream the extracted pages back as NDJSON while parsing"),
+    user: Dict[str, Any] = Depends(get_current_user),
+    resume_service: ResumeService = Depends(get_resume_service)
+):
+    """
+    Upload a PDF or DOCX resume as multipart/form-data or as the raw request body.
+
+    The text is extracted page by page and stored for the current user, replacing any previous resume.
+    """
+    upload = await spool_request(http_request)
+    if stream:
+        pages = resume_service.ingest(UUID(user["id"]), upload)
+        try:
+            # Type, size and the first page are checked before the 200 goes out
+            first = await anext(pages)
+        except StopAsyncIteration:
+            upload.close()
+            raise HTTPException(status_code=400, detail="The file has no pages.")
+        except Exception:
+            await pages.aclose()
+            upload.close()
+            raise
+        return StreamingResponse(_ndjson_pages(first, pages, upload), media_type="application/x-ndjson")
+
+    try:
+        resume = await resume_service.upload_resume(UUID(user["id"]), upload)
+    finally:
+        upload.close()
+    return ResumeUploadResponse(
+        filename=resume.filename,
+        content_type=resume.content_type,
+        size_bytes=resume.size_bytes,
+        page_count=resume.page_count,
+        characters=len(resume.text)
+    )
+
+@router.get("/resumes/me", response_model=ResumeResponse, summary="Get your resume text")
+async def get_resume(
+    user: Dict[str, Any] = Depends(get_current_user),
+    resume_service: ResumeService = Depends(get_resume_service)
+):
+    """The text extracted from the current user's last uploaded resume."""
+    resume = await resume_service.get_resume(UUID(user["id"]))
+    if resume is None:
+        raise HTTPException(status_code=404, detail="No resume uploaded yet.")
+    return ResumeResponse.model_validate(resume, from_attributes=True)
+
+@router.get("/resumes/me/skills", response_model=ResumeSkillsResponse, summary="Skills found in your resume")
+async def get_resume_skills(
+    user: Dict[str, Any] = Depends(get_current_user),
+    skill_service: SkillService = Depends(get_skill_service)
+):
+    """Known skills mentioned in the current user's resume, with counts and character offsets into its text."""
+    return ResumeSkillsResponse(skills=await skill_service.extract_for_user(UUID(user["id"])))
+
+@router.post("/resumes/me/evaluation", response_model=ResumeEvaluationResponse, summary="Evaluate your resume for a role")
+async def evaluate_resume(
+    request: ResumeEvaluationRequest,
+    user: Dict[str, Any] = Depends(get_current_user),
+    evaluation_service: ResumeEvaluationService = Depends(get_resume_evaluation_service)
+):
+    """
+    AI score and summary of the current user's resume for a target role.
+
+    Repeating an evaluation of an unchanged resume for the same role is answered from cache (cached=true).
+    """
+    return await evaluation_service.evaluate(UUID(user["id"]), request.role)
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+from app.domain.skills.models import SkillMatch
+
+class ResumeUploadResponse(BaseModel):
+    filename: Optional[str]
+    content_type: str
+    size_bytes: int
+    page_count: int
+    characters: int
+    
+class ResumeResponse(BaseModel):
+    user_id: UUID
+    filename: Optional[str]
+    content_type: str
+    size_bytes: int
+    page_count: int
+    text: str
+    skills: List[str]
+    updated_at: datetime
+
+class ResumeEvaluationRequest(BaseModel):
+    role: str = Field(..., min_length=2, max_length=200, description="The role to evaluate the resume for")
+
+class ResumeEvaluationResponse(BaseModel):
+    score: int
+    summary: str
+    model: str
+    prompt_version: str
+    cached: bool
+
+class ResumeSkillsResponse(BaseModel):
+    skills: List[SkillMatch]
@@ -0,0 +1,33 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+class CandidateProfile(BaseModel):
+    """Public part of a profile; contact details are left out of search results."""
+    id: UUID
+    first_name: str
+    last_name: str
+    country: str
+    user_type: str
+    work_status: Optional[str]
+    is_verified: bool
+    
+    @classmethod
+    def project(cls, user: BaseModel) -> "CandidateProfile":
+        return cls.model_construct(**{name: getattr(user, name) for name in cls.model_fields})
+    
+class CandidateHit(BaseModel):
+    profile: CandidateProfile
+    score: float
+    
+class CandidateSearchResponse(BaseModel):
+    results: List[CandidateHit]
+    
+class FacetValue(BaseModel):
+    value: str
+    count: int
+    
+class CandidateFacetResponse(BaseModel):
+    total: int
+    results: List[CandidateProfile]
+    facets: Dict[str, List[FacetValue]]
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import get_facet_service, get_search_service
+from app.api.v1.search.schemas import (
+    CandidateFacetResponse,
+    CandidateHit,
+    CandidateProfile,
+    CandidateSearchResponse,
+    FacetValue
+)
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.domain.auth.models import UserInDB
+from app.infrastructure.facet_index import And, Not, Query as FacetQuery, all_of, any_of
+from app.services.facet_service import CandidateFacetService
+from app.services.search_service import CandidateSearchService
+
+router = APIRouter()
+
+class CandidateFilters:
+    """Pre-filters shared by the search routes: repeat a parameter to accept several values."""
+
+    def __init__(
+        self,
+        country: Optional[List[str]] = Query(None, description="ISO country codes"),
+        user_type: List[str] = Query(["job_seeker"]),
+        work_status: Optional[List[str]] = Query(None, description="experienced / fresher")
+    ):
+        self.filters = {
+            name: values
+            for name, values in (("country", country), ("user_type", user_type), ("work_status", work_status))
+            if values
+        }
+
+def _response(hits: Sequence[Tuple[UserInDB, float]]) -> CandidateSearchResponse:
+    return CandidateSearchResponse.model_construct(results=[
+        CandidateHit.model_construct(profile=CandidateProfile.project(user), score=round(score, 4))
+        for user, score in hits
+    ])
+
+@router.get("/search/candidates", response_model=CandidateSearchResponse, summary="Search candidates by skills")
+async def search_candidates(
+    q: str = Query(..., min_length=2, max_length=2000, description="Skills, roles or a job description"),
+    k: int = Query(20, ge=1, le=settings.SEARCH_MAX_RESULTS),
+    filters: CandidateFilters = Depends(),
+    user: Dict[str, Any] = Depends(get_current_user),
+    search_service: CandidateSearchService = Depends(get_search_service)
+):
+    """Profiles (with their resumes) most similar in meaning to the query, best match first."""
+    return _response(await search_service.search(q, k, filters.filters))
+
+@router.get(
+    "/search/candidates/similar/{user_id}",
+    response_model=CandidateSearchResponse,
+    summary="Find candidates similar to a user"
+)
+async def similar_candidates(
+    user_id: UUID,
+    k: int = Query(20, ge=1, le=settings.SEARCH_MAX_RESULTS),
+    filters: CandidateFilters = Depends(),
+    user: Dict[str, Any] = Depends(get_current_user),
+    search_service: CandidateSearchService = Depends(get_search_service)
+):
+    return _response(await search_service.similar(user_id, k, filters.filters))
+
+@router.get("/search/facets", response_model=CandidateFacetResponse, summary="Filter candidates by attributes and skills")
+async def facet_candidates(
+    filters: CandidateFilters = Depends(),
+    skill: Optional[List[str]] = Query(None, description="Skill ids the candidate must all have"),
+    any_skill: Optional[List[str]] = Query(None, description="Skill ids of which the candidate needs at least one"),
+    exclude_skill: Optional[List[str]] = Query(None, description="Skill ids the candidate must not have"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.SEARCH_MAX_RESULTS),
+    user: Dict[str, Any] = Depends(get_current_user),
+    facet_service: CandidateFacetService = Depends(get_facet_service)
+):
+    """
+    Candidates matching every given filter, newest first, with counts per country, user_type, work_status and skill.
+
+    Values of one attribute are alternatives (country=IN&country=US); different filters must all hold.
+    """
+    clauses: List[FacetQuery] = [any_of(name, values) for name, values in filters.filters.items()]
+    if skill:
+        clauses.append(all_of("skills", skill))
+    if any_skill:
+        clauses.append(any_of("skills", any_skill))
+    clauses += [Not(any_of("skills", exclude_skill))] if exclude_skill else []
+    total, users, facets = await facet_service.search(And(tuple(clauses)) if clauses else None, offset, limit)
+    return CandidateFacetResponse.model_construct(
+        total=total,
+        results=[CandidateProfile.project(user) for user in users],
+        facets={
+            field: [FacetValue.model_construct(value=value, count=count) for value, count in values]
+            for field, values in facets.items()
+        }
+    )
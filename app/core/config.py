@@ -1,4 +1,4 @@
-from typing import Set
+from typing import Dict, Optional, Set
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -13,12 +13,188 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
     
+    # Supabase HTTP pool
+    SUPABASE_HTTP2: bool = True
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 100
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 20
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_CONNECT_TIMEOUT: float = 5.0
+    SUPABASE_READ_TIMEOUT: float = 10.0
+    SUPABASE_POOL_TIMEOUT: float = 5.0
+    
+    # Supabase resilience (timeouts, circuit breakers, retries and hedging around every round trip)
+    SUPABASE_RESILIENCE_ENABLED: bool = True
+    SUPABASE_OPERATION_TIMEOUTS: Dict[str, float] = {"read": 3.0, "write": 5.0, "auth": 5.0, "other": 10.0}
+    SUPABASE_BREAKER_ERROR_RATE: float = 0.5
+    SUPABASE_BREAKER_MIN_REQUESTS: int = 20  # within the window, before the error rate counts
+    SUPABASE_BREAKER_WINDOW: float = 10.0
+    SUPABASE_BREAKER_OPEN_SECONDS: float = 5.0
+    SUPABASE_RETRY_MAX_ATTEMPTS: int = 3  # reads only
+    SUPABASE_RETRY_BUDGET_RATIO: float = 0.1  # retries and hedges per request
+    SUPABASE_RETRY_BUDGET_RESERVE: float = 10.0
+    SUPABASE_RETRY_BACKOFF: float = 0.05
+    SUPABASE_HEDGE_ENABLED: bool = False
+    SUPABASE_HEDGE_PERCENTILE: float = 95.0
+    SUPABASE_HEDGE_MIN_DELAY: float = 0.005
+    
+    # JWT verification
+    SUPABASE_JWT_SECRET: str = ""
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_URL: str = ""
+    JWKS_REFRESH_INTERVAL: float = 600.0
+    JWT_LEEWAY: float = 5.0
+    TOKEN_CACHE_SIZE: int = 10000
+    
+    # Password hashing pool
+    PASSWORD_POOL_WORKERS: Optional[int] = None
+    PASSWORD_POOL_MAX_CONCURRENCY: Optional[int] = None
+    PASSWORD_POOL_MAX_QUEUE: int = 64
+    PASSWORD_POOL_WARM: bool = True  # spawn and warm the workers in the background once the app is ready
+    
+    # Password policy: composition is checked in the API process, zxcvbn only sees the first
+    # PASSWORD_STRENGTH_MAX_CHARS characters; recent strength verdicts are cached under a keyed hash
+    PASSWORD_MIN_LENGTH: int = 12
+    PASSWORD_MAX_LENGTH: int = 128
+    PASSWORD_MIN_SCORE: int = 3
+    PASSWORD_STRENGTH_MAX_CHARS: int = 32
+    PASSWORD_VERDICT_CACHE_SIZE: int = 1024
+    PASSWORD_VERDICT_CACHE_TTL: float = 600.0
+    
+    # bcrypt cost: pinned by PASSWORD_BCRYPT_ROUNDS, or calibrated on a pool worker at startup so one hash takes about
+    # PASSWORD_HASH_TARGET_SECONDS; stored hashes further than the tolerance from it are rehashed after login
+    PASSWORD_BCRYPT_ROUNDS: Optional[int] = None
+    PASSWORD_HASH_TARGET_SECONDS: float = 0.25
+    PASSWORD_BCRYPT_MIN_ROUNDS: int = 10
+    PASSWORD_BCRYPT_MAX_ROUNDS: int = 16
+    PASSWORD_BCRYPT_REHASH_TOLERANCE: int = 1
+    # The first uvicorn worker on a host calibrates and records the cost here, the others reuse it; empty calibrates per worker
+    PASSWORD_CALIBRATION_PATH: str = "data/bcrypt_calibration.json"
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+    PASSWORD_REHASH_MAX_CONCURRENCY: int = 1
+    PASSWORD_REHASH_CHECK_CACHE_SIZE: int = 10000
+    PASSWORD_REHASH_CHECK_TTL: float = 3600.0
+    
+    # Startup: worker boot (process start to ready) budget reported by /ready
+    STARTUP_TARGET_SECONDS: float = 2.0
+    
+    # Repository point-lookup batching (window 0 = coalesce within one event-loop tick)
+    REPOSITORY_BATCH_WINDOW: float = 0.0
+    REPOSITORY_BATCH_MAX_SIZE: int = 100
+    
+    # Repository backend: "postgrest" (Supabase REST API) or "postgres" (asyncpg pool at DATABASE_URL)
+    REPOSITORY_BACKEND: str = "postgrest"
+    DATABASE_URL: str = ""
+    DATABASE_POOL_MIN_SIZE: int = 2
+    DATABASE_POOL_MAX_SIZE: int = 20
+    DATABASE_COMMAND_TIMEOUT: float = 10.0
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100  # 0 behind PgBouncer in transaction mode
+    
+    # Company cache
+    COMPANY_CACHE_SIZE: int = 10000
+    COMPANY_CACHE_TTL: float = 300.0
+    COMPANY_CACHE_NEGATIVE_TTL: float = 30.0
+    
+    # Resume ingestion
+    RESUME_MAX_BYTES: int = 10 * 1024 * 1024
+    RESUME_SPOOL_MEMORY_BYTES: int = 1024 * 1024  # larger uploads spill to a temp file in RESUME_TMP_DIR
+    RESUME_TMP_DIR: Optional[str] = None  # None = the system temp directory
+    RESUME_MAX_PAGES: int = 50
+    RESUME_PAGES_PER_JOB: int = 4
+    RESUME_PARSE_WORKERS: Optional[int] = None  # None = cpu count
+    RESUME_PARSE_MAX_CONCURRENCY: Optional[int] = None  # parse jobs in flight, None = workers
+    RESUME_PARSE_MAX_QUEUE: int = 32
+    
+    # Rate limits: route -> dimension (ip, phone, email) -> "count/period"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # take the client IP from X-Forwarded-For (only behind a trusted proxy)
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "send_otp": {"ip": "20/hour", "phone": "5/hour"},
+        "verify_phone_resend": {"ip": "20/hour", "phone": "5/hour"},
+        "verify_email_resend": {"ip": "20/hour", "email": "5/hour"},
+        "reset_password": {"ip": "20/hour", "email": "5/hour", "phone": "5/hour"},
+        "register_bulk": {"ip": "30/hour"},
+    }
+    
+    # Background jobs (OTP, verification and password reset dispatch)
+    JOBS_BACKEND: str = "sqlite"  # sqlite (jobs survive restarts) | memory
+    JOBS_SQLITE_PATH: str = "data/jobs.sqlite3"
+    JOBS_WORKERS: int = 16  # worker tasks per uvicorn worker (jobs are I/O bound)
+    JOBS_MAX_QUEUE: int = 1000  # queued jobs per uvicorn worker before enqueueing answers 503
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_DELAY: float = 1.0
+    JOBS_RETRY_MAX_DELAY: float = 60.0
+    JOBS_ATTEMPT_TIMEOUT: float = 30.0
+    JOBS_DRAIN_TIMEOUT: float = 10.0  # on shutdown; jobs still queued afterwards stay in the store
+    JOBS_LEASE_SECONDS: float = 60.0  # a crashed worker's jobs are claimed by others after this
+    JOBS_RETENTION: float = 7 * 24 * 3600.0  # finished and dead jobs are kept this long
+    
     # OpenAI
     OPENAI_API_KEY: str
     
-    # Logtail
-    LOGTAIL_SOURCE_TOKEN: str
-    LOGTAIL_INGESTING_HOST: str
+    # Embeddings
+    EMBEDDING_BACKEND: str = "openai"  # openai | fake (deterministic, offline)
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 1536
+    EMBEDDING_ENCODING: str = "cl100k_base"  # tiktoken encoding used for chunking; "bytes" needs no download
+    EMBEDDING_CHUNK_TOKENS: int = 512
+    EMBEDDING_CHUNK_OVERLAP: int = 64
+    EMBEDDING_BATCH_SIZE: int = 512  # inputs per API request
+    EMBEDDING_BATCH_TOKENS: int = 100_000  # tokens per API request
+    EMBEDDING_MAX_CONCURRENCY: int = 4  # API requests in flight per worker
+    EMBEDDING_REQUEST_TIMEOUT: float = 30.0
+    EMBEDDING_CACHE_PATH: str = "data/embeddings.sqlite3"
+    
+    # Skill extraction
+    SKILL_TAXONOMY_PATH: str = ""  # JSON taxonomy; "" = the bundled app/domain/skills/taxonomy.json
+    SKILL_MAX_TEXT_CHARS: int = 200_000
+    SKILL_BATCH_SIZE: int = 64  # documents per pool job in batch mode
+    SKILL_POOL_WORKERS: Optional[int] = None  # None = cpu count
+    SKILL_POOL_MAX_QUEUE: int = 32
+    
+    # LLM (resume evaluation)
+    LLM_BACKEND: str = "openai"  # openai | fake (deterministic, offline)
+    LLM_FAKE_MALFORMED_RATE: float = 0.0  # share of fake replies that are fenced or truncated JSON
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_TEMPERATURE: float = 0.0
+    LLM_MAX_TOKENS: int = 800
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_INPUT_CHARS: int = 40_000  # resume text beyond this is cut before it is sent
+    LLM_CACHE_PATH: str = "data/llm_cache.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_TTL: float = 30 * 24 * 3600.0
+    
+    # Candidate search (vector index of profile embeddings)
+    VECTOR_INDEX_PATH: str = "data/vector_index"  # snapshot directory, "" = in memory only
+    # Off by default: each worker only holds its own writes, so the scheduled rebuild is the one snapshot writer
+    VECTOR_INDEX_SAVE_ON_SHUTDOWN: bool = False
+    VECTOR_INDEX_BATCH_SIZE: int = 256  # profiles embedded per indexing round
+    VECTOR_INDEX_COMPACT_RATIO: float = 0.2  # compact once this share of rows are tombstones
+    VECTOR_INDEX_COMPACT_INTERVAL: float = 60.0
+    SEARCH_MAX_RESULTS: int = 100
+    
+    # Facet search (in-memory inverted index of user attributes and resume skills)
+    FACET_INDEX_BATCH_SIZE: int = 1000  # users per page while loading
+    FACET_INDEX_FLUSH_SIZE: int = 20_000  # users per bulk insert into the index
+    FACET_VALUES_LIMIT: int = 20  # most frequent values returned per facet
+    FACET_INDEX_RETRY_BASE_DELAY: float = 1.0  # a failed load is retried, doubling the wait up to the max
+    FACET_INDEX_RETRY_MAX_DELAY: float = 60.0
+    
+    # Logtail (without a source token logs go to the local file sink)
+    LOGTAIL_SOURCE_TOKEN: str = ""
+    LOGTAIL_INGESTING_HOST: str = "in.logs.betterstack.com"
+    
+    # Log shipping
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_OVERFLOW_POLICY: str = "drop_newest"  # drop_newest | drop_oldest | sample
+    LOG_SAMPLE_RATE: int = 10
+    LOG_SAMPLE_THRESHOLD: float = 0.5
+    LOG_BATCH_SIZE: int = 500
+    LOG_FLUSH_INTERVAL: float = 1.0
+    LOG_SHIP_TIMEOUT: float = 5.0
+    LOG_OFFLINE_RETRY: float = 30.0
+    LOG_FILE_PATH: str = "logs/app.log"
+    LOG_FILE_MAX_BYTES: int = 50 * 1024 * 1024
     
     model_config = SettingsConfigDict(
         env_file=".env",
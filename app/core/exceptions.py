@@ -30,4 +30,19 @@ class NotFoundException(AppException):
 class ConflictException(AppException):
     """Exception for conflict errors."""
     def __init__(self, message: str = "Resource conflict"):
-        super().__init__(message, status_code=409) 
\ No newline at end of file
+        super().__init__(message, status_code=409)
+
+class ServiceUnavailableException(AppException):
+    """Exception for temporarily overloaded or unavailable services."""
+    def __init__(self, message: str = "Service temporarily unavailable"):
+        super().__init__(message, status_code=503)
+
+class PayloadTooLargeException(AppException):
+    """Exception for request bodies over the configured size limit."""
+    def __init__(self, message: str = "Payload too large"):
+        super().__init__(message, status_code=413)
+
+class UnsupportedMediaTypeException(AppException):
+    """Exception for uploads of a type the service does not accept."""
+    def __init__(self, message: str = "Unsupported media type"):
+        super().__init__(message, status_code=415)
@@ -0,0 +1,304 @@
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Any, Dict, List, Optional, Protocol
+import httpx
+from app.core.config import settings
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    import json
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "sample")
+
+# Per-request INFO chatter from the HTTP stack; the shipper's own uploads would otherwise log themselves
+_QUIET_LOGGERS = ("httpx", "httpcore", "hpack")
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including the fields passed through `extra`."""
+
+    def to_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        log_record = {
+            "dt": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                log_record[key] = value
+        if record.exc_info:
+            log_record["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
+        return log_record
+
+    def encode(self, record: logging.LogRecord) -> bytes:
+        return _dumps(self.to_dict(record))
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self.encode(record).decode()
+
+class LogSink(Protocol):
+    def send(self, lines: List[bytes]) -> None:
+        """Deliver a batch of encoded records, raising if it could not."""
+
+class LogtailSink:
+    """Ships batches to the Logtail (Better Stack) HTTP ingest API as a JSON array."""
+
+    def __init__(self, source_token: str, host: str, timeout: float):
+        self.url = host if host.startswith(("http://", "https://")) else f"https://{host}"
+        self._client = httpx.Client(
+            timeout=timeout,
+            headers={"Authorization": f"Bearer {source_token}", "Content-Type": "application/json"}
+        )
+
+    def send(self, lines: List[bytes]) -> None:
+        response = self._client.post(self.url, content=b"[" + b",".join(lines) + b"]")
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+class FileSink:
+    """Appends batches as JSON lines to a local file, rotating it once it grows past max_bytes."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._file = None
+
+    def send(self, lines: List[bytes]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "ab")
+        self._file.write(b"\n".join(lines) + b"\n")
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None
+            os.replace(self.path, f"{self.path}.1")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue without ever blocking the caller.
+
+    Formatting is left to the shipper thread. When the queue is full (or, with the
+    "sample" policy, past sample_threshold) records are dropped instead of waited on.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]", policy: str, sample_rate: int, sample_threshold: float):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"LOG_OVERFLOW_POLICY must be one of {OVERFLOW_POLICIES}, got {policy!r}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.sample_rate = max(sample_rate, 1)
+        self.sample_from = int(log_queue.maxsize * sample_threshold)
+        self._seen_while_sampling = 0
+        self.counters = {"enqueued": 0, "dropped": 0, "sampled_out": 0}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now (its args may be mutated later) but keep exc_info for the shipper to format
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == "sample" and self.queue.qsize() >= self.sample_from:
+            self._seen_while_sampling += 1
+            if self._seen_while_sampling % self.sample_rate:
+                self.counters["sampled_out"] += 1
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy != "drop_oldest":
+                self.counters["dropped"] += 1
+                return
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+            self.counters["dropped"] += 1
+        self.counters["enqueued"] += 1
+
+class LogPipeline:
+    """Bounded log queue in front of a background thread that batches records to a sink."""
+
+    def __init__(
+        self,
+        sink: Optional[LogSink],
+        fallback: LogSink,
+        queue_size: int = 10000,
+        policy: str = "drop_newest",
+        sample_rate: int = 10,
+        sample_threshold: float = 0.5,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        offline_retry: float = 30.0
+    ):
+        self.sink = sink
+        self.fallback = fallback
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.offline_retry = offline_retry
+        self.formatter = JSONFormatter()
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size), policy, sample_rate, sample_threshold)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._offline_until = 0.0
+        self._reported_drops = 0
+        self._counters = {"batches": 0, "shipped": 0, "sink_failures": 0, "fallback_records": 0, "lost_records": 0}
+
+    @classmethod
+    def from_settings(cls) -> "LogPipeline":
+        """Build a pipeline from the application settings; without a Logtail token it writes to the file sink only."""
+        sink = None
+        if settings.LOGTAIL_SOURCE_TOKEN:
+            sink = LogtailSink(settings.LOGTAIL_SOURCE_TOKEN, settings.LOGTAIL_INGESTING_HOST, settings.LOG_SHIP_TIMEOUT)
+        return cls(
+            sink=sink,
+            fallback=FileSink(settings.LOG_FILE_PATH, settings.LOG_FILE_MAX_BYTES),
+            queue_size=settings.LOG_QUEUE_SIZE,
+            policy=settings.LOG_OVERFLOW_POLICY,
+            sample_rate=settings.LOG_SAMPLE_RATE,
+            sample_threshold=settings.LOG_SAMPLE_THRESHOLD,
+            batch_size=settings.LOG_BATCH_SIZE,
+            flush_interval=settings.LOG_FLUSH_INTERVAL,
+            offline_retry=settings.LOG_OFFLINE_RETRY
+        )
+
+    def install(self, logger: Optional[logging.Logger] = None, level: str = "INFO") -> None:
+        """Attach the queue handler (to the root logger by default) so every module logger feeds it."""
+        logger = logger or logging.getLogger()
+        logger.setLevel(level)
+        for name in _QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+
+    def start(self) -> None:
+        """Start the shipper thread (called on startup)."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is queued and stop the shipper thread (called on shutdown)."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        log_queue = self.handler.queue
+        while True:
+            batch: List[logging.LogRecord] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (self._stopping.is_set() and log_queue.empty()):
+                    break
+                try:
+                    batch.append(log_queue.get(timeout=min(remaining, 0.1)))
+                except queue.Empty:
+                    continue
+            self._ship(batch)
+            if self._stopping.is_set() and log_queue.empty():
+                return
+
+    def _ship(self, batch: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.encode(record))
+            except Exception:
+                self._counters["lost_records"] += 1
+        drops = self.handler.counters["dropped"] + self.handler.counters["sampled_out"]
+        if drops > self._reported_drops:
+            lines.append(_dumps({
+                "dt": datetime.now(timezone.utc).isoformat(),
+                "level": "WARNING",
+                "message": f"Log pipeline dropped {drops - self._reported_drops} records",
+                "logger": __name__,
+                "dropped_records": drops - self._reported_drops,
+            }))
+            self._reported_drops = drops
+        if not lines:
+            return
+        self._counters["batches"] += 1
+
+        if self.sink is not None and time.monotonic() >= self._offline_until:
+            try:
+                self.sink.send(lines)
+                self._counters["shipped"] += len(lines)
+                return
+            except Exception:
+                # Treat the backend as offline for a while instead of stalling every batch on it
+                self._counters["sink_failures"] += 1
+                self._offline_until = time.monotonic() + self.offline_retry
+        try:
+            self.fallback.send(lines)
+            self._counters["fallback_records"] += len(lines)
+        except Exception:
+            self._counters["lost_records"] += len(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.handler.counters,
+            **self._counters,
+            "queued": self.handler.queue.qsize(),
+            "queue_size": self.handler.queue.maxsize,
+            "policy": self.handler.policy,
+            "offline": time.monotonic() < self._offline_until,
+        }
+
+log_pipeline = LogPipeline.from_settings()
+
+"""
+1. Why:
+    . Handlers attached directly to a logger run on the caller's thread, so a slow backend slows the request
+    . Here the request path only copies the record onto a bounded queue; JSON encoding and I/O happen on the shipper thread
+
+2. Flow:
+    . NonBlockingQueueHandler is installed on the root logger, so every `logging.getLogger(__name__)` feeds it
+    . The shipper thread collects up to LOG_BATCH_SIZE records or waits LOG_FLUSH_INTERVAL, then ships the batch
+    . Batches go to Logtail when LOGTAIL_SOURCE_TOKEN is set, otherwise (or while Logtail is failing) to LOG_FILE_PATH
+    . After a Logtail failure the sink is skipped for LOG_OFFLINE_RETRY seconds so batches keep moving
+
+3. Overflow (LOG_OVERFLOW_POLICY):
+    . drop_newest: a record arriving at a full queue is discarded
+    . drop_oldest: the oldest queued record is discarded to make room
+    . sample: past LOG_SAMPLE_THRESHOLD of the queue only one in LOG_SAMPLE_RATE records is kept; a full queue drops the rest
+    . Drops are counted and reported downstream as a single warning record per batch
+
+4. Records:
+    . JSONFormatter writes the standard fields plus every `extra` field, and the formatted traceback if any
+    . orjson encodes straight to bytes; the stdlib json module is only a fallback
+"""
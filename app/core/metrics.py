@@ -0,0 +1,244 @@
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Dict, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request latencies span cached token checks (sub-ms) to bcrypt-bound registrations (~seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP responses by route template and status code.",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served.",
+    ["method"], multiprocess_mode="livesum"
+)
+REPOSITORY_CALL_DURATION = Histogram(
+    "repository_call_duration_seconds", "Repository method latency, i.e. time spent waiting on Supabase.",
+    ["repository", "method", "outcome"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_OPERATION_DURATION = Histogram(
+    "password_operation_duration_seconds", "Password work executed on the process pool.",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_QUEUE_WAIT = Histogram(
+    "password_queue_wait_seconds", "Time password work waited for a free pool slot.",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_OPERATIONS_IN_PROGRESS = Gauge(
+    "password_operations_in_progress", "Password operations running on the process pool.",
+    multiprocess_mode="livesum"
+)
+PASSWORD_REJECTIONS = Counter(
+    "password_rejections_total", "Password operations rejected because the pool queue was full."
+)
+PASSWORD_POLICY_VERDICTS = Counter(
+    "password_policy_verdicts_total", "Password policy verdicts by outcome and where they were reached (policy, cache, estimator).",
+    ["outcome", "source"]
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter.",
+    ["route", "dimension"]
+)
+RESUME_PARSE_DURATION = Histogram(
+    "resume_parse_duration_seconds", "Time to extract the text of one uploaded resume.",
+    ["content_type"], buckets=LATENCY_BUCKETS + (30.0, 60.0)
+)
+RESUME_PAGES_PARSED = Counter(
+    "resume_pages_parsed_total", "Resume pages (DOCX sections) extracted.",
+    ["content_type"]
+)
+RESUME_UPLOAD_REJECTIONS = Counter(
+    "resume_upload_rejections_total", "Resume uploads rejected before or during parsing.",
+    ["reason"]
+)
+EMBEDDING_REQUEST_DURATION = Histogram(
+    "embedding_request_duration_seconds", "Embedding API requests (one packed batch each).",
+    ["outcome"], buckets=LATENCY_BUCKETS + (30.0,)
+)
+EMBEDDING_INPUTS = Counter(
+    "embedding_inputs_total", "Texts looked up for embedding, by whether the cache had them.",
+    ["result"]
+)
+EMBEDDING_TOKENS = Counter(
+    "embedding_tokens_total", "Tokens sent to the embedding backend."
+)
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total", "LLM requests by how they were answered: cache hit, upstream miss, or coalesced onto one in flight.",
+    ["result"]
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Upstream LLM calls (cache misses only).",
+    ["outcome"], buckets=LATENCY_BUCKETS + (30.0, 60.0)
+)
+LLM_CACHE_EVICTIONS = Counter(
+    "llm_cache_evictions_total", "LLM cache entries removed: by expiry, to stay under the size bound, or unreadable to the caller.",
+    ["reason"]
+)
+JOBS_ENQUEUED = Counter(
+    "jobs_enqueued_total", "Background jobs offered to the job queue, accepted or rejected because it was full.",
+    ["name", "result"]
+)
+JOBS_FINISHED = Counter(
+    "jobs_finished_total", "Background jobs that succeeded or were dead-lettered after their last attempt.",
+    ["name", "status"]
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "Background job attempts.",
+    ["name", "outcome"], buckets=LATENCY_BUCKETS + (30.0,)
+)
+SUPABASE_BREAKER_STATE = Gauge(
+    "supabase_breaker_state", "Circuit breaker state per Supabase service: 0 closed, 1 half open, 2 open.",
+    ["service"], multiprocess_mode="livemax"
+)
+SUPABASE_RESILIENCE_EVENTS = Counter(
+    "supabase_resilience_events", "Supabase attempts that timed out, were retried, hedged or rejected by an open circuit.",
+    ["service", "event"]
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and in-flight requests per route template.
+
+    Routes are labelled by their template (/api/v1/users/{id}), never the raw path,
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+        self._children: Dict[Tuple[str, str, str], Tuple[Any, Any]] = {}
+        self._in_progress: Dict[str, Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_progress = self._in_progress.get(method)
+        if in_progress is None:
+            in_progress = self._in_progress[method] = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            template = _route_template(scope)
+            duration, requests = self._route_metrics(method, template, status)
+            duration.observe(elapsed)
+            requests.inc()
+
+    def _route_metrics(self, method: str, template: str, status: str) -> Tuple[Any, Any]:
+        # Resolving label children costs more than observing, so keep them per route and status
+        key = (method, template, status)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                HTTP_REQUEST_DURATION.labels(method, template),
+                HTTP_REQUESTS.labels(method, template, status),
+            )
+        return children
+
+def _route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. /api/v1/admin/jobs/{job_id}."""
+    # The router stores the matched route on the (shared) scope. FastAPI versions that include routers lazily
+    # store the route as declared (without the include prefixes) and the prefixed one as the effective route
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(effective, "path", None) or getattr(route, "path", None) or scope["path"]
+
+def instrument_repository_methods(cls: type) -> None:
+    """Wrap the public coroutine methods defined on cls so their latency is recorded."""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(attribute):
+            continue
+        setattr(cls, name, _timed_repository_call(cls.__name__, name, attribute))
+
+def _timed_repository_call(repository: str, method: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    # Children are created on first use so methods that never run do not export empty series
+    children: Dict[str, Any] = {}
+
+    def observe(outcome: str, seconds: float) -> None:
+        child = children.get(outcome)
+        if child is None:
+            child = children[outcome] = REPOSITORY_CALL_DURATION.labels(repository, method, outcome)
+        child.observe(seconds)
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException:
+            observe("error", time.perf_counter() - started)
+            raise
+        observe("ok", time.perf_counter() - started)
+        return result
+
+    return wrapper
+
+def multiprocess_enabled() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared multiprocess directory (called on shutdown)."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition, aggregated across uvicorn workers in multiprocess mode."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+"""
+1. What is recorded:
+    . http_request_duration_seconds / http_requests_total / http_requests_in_progress from PrometheusMiddleware
+    . repository_call_duration_seconds for every public async repository method (BaseRepository wires this up)
+    . password_operation_duration_seconds, password_queue_wait_seconds and in-progress/rejection counts from PasswordExecutor
+    . password_policy_verdicts_total{outcome=too_short|too_long|composition|weak|strong, source=policy|cache|estimator} from PasswordPolicy
+    . rate_limit_rejections_total from the rate limiter
+    . resume_parse_duration_seconds, resume_pages_parsed_total and resume_upload_rejections_total from ResumeService
+    . embedding_request_duration_seconds, embedding_inputs_total{result=hit|miss} and embedding_tokens_total from EmbeddingService
+    . llm_cache_lookups_total{result=hit|miss|coalesced}, llm_request_duration_seconds{outcome=success|error|invalid} and llm_cache_evictions_total from CachedLLM
+    . supabase_breaker_state and supabase_resilience_events_total{event=timeouts|retries|hedges|hedges_won|rejected} from ResilientTransport
+    . jobs_enqueued_total{result=accepted|rejected}, jobs_finished_total{status=succeeded|dead} and job_duration_seconds from JobQueue
+
+2. Hot path cost:
+    . The middleware is plain ASGI (no BaseHTTPMiddleware task/stream overhead)
+    . Label children are resolved once and reused, so each request is a few dict lookups and observes
+
+3. Multiple uvicorn workers:
+    . Set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory before the workers start
+    . prometheus_client then keeps values in per-process mmap files and /metrics aggregates them
+    . Gauges use livesum, and mark_process_dead() removes a worker's live values when it shuts down
+"""
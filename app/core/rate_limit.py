@@ -0,0 +1,223 @@
+import math
+from collections import deque
+import re
+import time
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from fastapi import Request
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RULE = re.compile(r"^\s*(\d+)\s*/\s*(\d*\.?\d*)\s*(second|minute|hour|day)?s?\s*$")
+
+class RateLimitException(AppException):
+    """Exception for requests rejected by the rate limiter."""
+    def __init__(self, message: str = "Too many requests", retry_after: float = 1.0):
+        super().__init__(message, status_code=429)
+        self.headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+def parse_rule(rule: str) -> Tuple[int, float]:
+    """Parse "5/hour", "20/10minutes" or "100/60" (seconds) into (limit, window seconds)."""
+    match = _RULE.match(rule)
+    if not match or not (match.group(2) or match.group(3)):
+        raise ValueError(f"Invalid rate limit {rule!r}, expected e.g. '5/hour' or '100/60'")
+    count, amount, unit = match.groups()
+    window = float(amount or 1) * _PERIODS[unit or "second"]
+    return int(count), window
+
+class SlidingWindowStore:
+    """
+    Sliding-window counters for one (limit, window) rule, sharded and expired by a timer wheel.
+
+    Each key keeps only the count of the current and the previous fixed window; the
+    sliding count is the previous count weighted by how much of it still overlaps
+    the sliding window, plus the current count.
+    """
+
+    def __init__(self, limit: int, window: float, shards: int = 64, wheel_slots: int = 16, sweep_batch: int = 64):
+        self.limit = limit
+        self.window = window
+        self.sweep_batch = sweep_batch
+        self._shards: List[Dict[str, List[int]]] = [{} for _ in range(shards)]
+        # A key is dead two windows after its current window started; the wheel only has to cover that horizon
+        self._tick = 2 * window / wheel_slots
+        self._wheel: List[Set[str]] = [set() for _ in range(wheel_slots + 2)]
+        self._wheel_cursor = int(time.monotonic() / self._tick)
+        self._expiring: Deque[Set[str]] = deque()
+        self._counters = {"hits": 0, "rejections": 0, "expired": 0}
+
+    def _shard(self, key: str) -> Dict[str, List[int]]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _advance(self, now: float) -> None:
+        """Hand every wheel slot the clock has moved past to the sweeper, then sweep a bounded batch."""
+        now_tick = int(now / self._tick)
+        if now_tick > self._wheel_cursor:
+            for step in range(min(now_tick - self._wheel_cursor, len(self._wheel))):
+                index = (self._wheel_cursor + step) % len(self._wheel)
+                if self._wheel[index]:
+                    self._expiring.append(self._wheel[index])
+                    self._wheel[index] = set()
+            self._wheel_cursor = now_tick
+        if self._expiring:
+            self._sweep(int(now / self.window))
+
+    def _sweep(self, current_window: int) -> None:
+        # Bounded per call so a slot holding a million keys never stalls one request
+        budget = self.sweep_batch
+        while budget and self._expiring:
+            slot = self._expiring[0]
+            if not slot:
+                self._expiring.popleft()
+                continue
+            key = slot.pop()
+            budget -= 1
+            shard = self._shard(key)
+            entry = shard.get(key)
+            # Keys touched in a newer window were rescheduled into a later slot
+            if entry is not None and entry[0] + 2 <= current_window:
+                del shard[key]
+                self._counters["expired"] += 1
+
+    def _schedule(self, key: str, window_index: int) -> None:
+        expires_tick = int((window_index + 2) * self.window / self._tick) + 1
+        self._wheel[expires_tick % len(self._wheel)].add(key)
+
+    def _state(self, key: str, now: float) -> Tuple[int, float, float]:
+        """(current window index, sliding count, seconds elapsed in the current window)"""
+        window_index = int(now / self.window)
+        elapsed = now - window_index * self.window
+        entry = self._shard(key).get(key)
+        if entry is None:
+            return window_index, 0.0, elapsed
+        start, current, previous = entry
+        if start == window_index:
+            pass
+        elif start == window_index - 1:
+            current, previous = 0, current
+        else:
+            current, previous = 0, 0
+        return window_index, previous * (1 - elapsed / self.window) + current, elapsed
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """Seconds until key would be admitted again (0 if it is admitted now)."""
+        now = time.monotonic() if now is None else now
+        window_index, count, elapsed = self._state(key, now)
+        if count < self.limit:
+            return 0.0
+        entry = self._shard(key)[key]
+        current = entry[1] if entry[0] == window_index else 0
+        previous = count - current
+        if current >= self.limit or previous <= 0:
+            return self.window - elapsed
+        # previous * (1 - t / window) + current < limit, solved for t
+        admit_at = self.window * (1 - (self.limit - current) / previous)
+        return max(admit_at - elapsed, 0.0) + 1e-3
+
+    def hit(self, key: str, now: Optional[float] = None) -> None:
+        """Count one request for key."""
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        self._counters["hits"] += 1
+        window_index = int(now / self.window)
+        shard = self._shard(key)
+        entry = shard.get(key)
+        if entry is None:
+            shard[key] = [window_index, 1, 0]
+            self._schedule(key, window_index)
+        elif entry[0] == window_index:
+            entry[1] += 1
+        else:
+            entry[2] = entry[1] if entry[0] == window_index - 1 else 0
+            entry[0] = window_index
+            entry[1] = 1
+            self._schedule(key, window_index)
+
+    def reject(self) -> None:
+        self._counters["rejections"] += 1
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "keys": len(self), "limit": self.limit, "window_seconds": self.window}
+
+class RateLimiter:
+    """Per-route, per-dimension (ip, phone, email) sliding-window limits."""
+
+    def __init__(self, rules: Dict[str, Dict[str, str]], enabled: bool = True, trust_forwarded: bool = False):
+        self.enabled = enabled
+        self.trust_forwarded = trust_forwarded
+        self._stores: Dict[str, Dict[str, SlidingWindowStore]] = {
+            route: {dimension: SlidingWindowStore(*parse_rule(rule)) for dimension, rule in dimensions.items()}
+            for route, dimensions in rules.items()
+        }
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        return cls(settings.RATE_LIMITS, settings.RATE_LIMIT_ENABLED, settings.RATE_LIMIT_TRUST_FORWARDED)
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def check(self, route: str, request: Request, **identities: Optional[str]) -> None:
+        """
+        Admit or reject one request to route, counting it against every configured dimension.
+
+        identities are the phone/email the request targets; the client IP is taken from the request.
+        Raises RateLimitException without counting anything if any dimension is over its limit.
+        """
+        stores = self._stores.get(route)
+        if not self.enabled or not stores:
+            return
+        now = time.monotonic()
+        identities = {"ip": self.client_ip(request), **identities}
+        keys = []
+        for dimension, store in stores.items():
+            value = identities.get(dimension)
+            if not value:
+                continue
+            key = "".join(value.split()).lower()
+            retry_after = store.retry_after(key, now)
+            if retry_after:
+                store.reject()
+                RATE_LIMIT_REJECTIONS.labels(route, dimension).inc()
+                raise RateLimitException(f"Too many requests, retry in {math.ceil(retry_after)}s.", retry_after)
+            keys.append((store, key))
+        for store, key in keys:
+            store.hit(key, now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            route: {dimension: store.stats() for dimension, store in stores.items()}
+            for route, stores in self._stores.items()
+        }
+
+rate_limiter = RateLimiter.from_settings()
+
+"""
+1. Algorithm (sliding window counter):
+    . Per key: [window index, count in current window, count in previous window]
+    . Sliding count = previous * (1 - elapsed / window) + current; a request is admitted while it is below the limit
+    . Constant memory per key, unlike a log of timestamps, so millions of keys stay cheap
+
+2. Store:
+    . Keys are spread over shards (plain dicts) so no single dict grows, and rehashes, unboundedly
+    . A timer wheel of 2*window/slots ticks expires keys two windows after their last window started
+    . The wheel advances lazily on hits; due slots are handed to a sweeper that checks at most sweep_batch keys
+      per hit, so expiry is amortised O(1) and never stalls a single request
+
+3. Admission:
+    . Routes call rate_limiter.check(...) before any outbound I/O, so a rejected request costs a few dict lookups
+    . Every dimension is checked before any is counted: a blocked IP does not burn the phone's quota
+    . Rejections raise RateLimitException (429 with Retry-After)
+
+4. Configuration:
+    . RATE_LIMITS maps route -> dimension -> "count/period", e.g. {"send_otp": {"ip": "20/hour", "phone": "5/hour"}}
+    . Limits are per worker process; with N workers the effective limit is up to N times higher
+"""
@@ -1,44 +1,233 @@
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.config import settings
 from app.infrastructure.supabase_client import SupabaseClient
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally against the JWT secret or the project JWKS."""
+
+    def __init__(
+        self,
+        secret: str,
+        audience: str,
+        jwks_url: str,
+        refresh_interval: float,
+        cache_size: int,
+        leeway: float
+    ):
+        self.secret = secret
+        self.audience = audience
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.cache_size = cache_size
+        self.leeway = leeway
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._keys_fetched_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        """Build a verifier from the application settings."""
+        return cls(
+            secret=settings.SUPABASE_JWT_SECRET,
+            audience=settings.SUPABASE_JWT_AUDIENCE,
+            jwks_url=settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            refresh_interval=settings.JWKS_REFRESH_INTERVAL,
+            cache_size=settings.TOKEN_CACHE_SIZE,
+            leeway=settings.JWT_LEEWAY
+        )
+
+    async def start(self) -> None:
+        """Load the signing keys and keep them fresh in the background."""
+        try:
+            await self.refresh_keys()
+        except Exception as e:
+            logger.error(f"Failed to load JWKS on startup: {str(e)}")
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background key refresh."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def refresh_keys(self) -> None:
+        """Fetch the JWKS and replace the cached signing keys."""
+        async with self._refresh_lock:
+            await self._fetch_keys()
+
+    async def _refresh_if_stale(self, min_age: float = 30.0) -> None:
+        # Unknown kid: the project may have rotated keys since the last refresh.
+        async with self._refresh_lock:
+            if time.monotonic() - self._keys_fetched_at >= min_age:
+                await self._fetch_keys()
+
+    async def _fetch_keys(self) -> None:
+        response = await SupabaseClient.get_http_client().get(self.jwks_url)
+        response.raise_for_status()
+        keys = {}
+        for jwk in response.json().get("keys", []):
+            try:
+                key = jwt.PyJWK(jwk)
+            except jwt.PyJWKError as e:
+                logger.error(f"Skipping unusable JWK {jwk.get('kid')}: {str(e)}")
+                continue
+            keys[jwk.get("kid")] = key
+        self._keys = keys
+        self._keys_fetched_at = time.monotonic()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh_keys()
+            except Exception as e:
+                logger.error(f"Failed to refresh JWKS: {str(e)}")
+
+    async def _signing_key(self, header: Dict[str, Any]) -> Tuple[Any, str]:
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.secret:
+                raise jwt.InvalidTokenError("HS256 token received but no JWT secret is configured")
+            return self.secret, algorithm
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm {algorithm}")
+
+        key = self._keys.get(header.get("kid"))
+        if key is None:
+            await self._refresh_if_stale()
+            key = self._keys.get(header.get("kid"))
+        if key is None:
+            raise jwt.InvalidKeyError("No signing key matches the token kid")
+        return key.key, key.algorithm_name
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its claims.
+
+        Verified tokens are cached until they expire, so repeat requests with
+        the same token skip signature checks entirely.
+        """
+        now = time.time()
+        cached = self._cache.get(token)
+        if cached:
+            claims, expires_at = cached
+            if expires_at > now:
+                self._cache.move_to_end(token)
+                return claims
+            del self._cache[token]
+
+        key, algorithm = await self._signing_key(jwt.get_unverified_header(token))
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            leeway=self.leeway,
+            options={"require": ["exp", "sub"]}
+        )
+
+        self._cache[token] = (claims, float(claims["exp"]))
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return claims
+
+token_verifier = TokenVerifier.from_settings()
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": claims["sub"],
+        "aud": claims.get("aud"),
+        "role": claims.get("role"),
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "app_metadata": claims.get("app_metadata", {}),
+        "user_metadata": claims.get("user_metadata", {}),
+        "session_id": claims.get("session_id"),
+    }
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """
     Get the current authenticated user from the JWT token.
-    
+
+    The token is verified locally, so no request is made to Supabase Auth.
+
     Args:
         credentials: The HTTP authorization credentials containing the JWT token
-        
+
     Returns:
         dict: The user data if authenticated
-        
+
     Raises:
         HTTPException: If the token is invalid or expired
     """
+    try:
+        claims = await token_verifier.verify(credentials.credentials)
+        return _user_from_claims(claims)
+    except Exception as e:
+        logger.error(f"Authentication error: {str(e)}")
+        raise _credentials_exception()
+
+async def require_admin(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+    """Allow only users whose app_metadata carries the admin role."""
+    if user.get("app_metadata", {}).get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return user
+
+async def get_current_user_remote(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """
+    Get the current authenticated user by asking Supabase Auth.
+
+    Use this on revocation-sensitive routes: unlike get_current_user it notices
+    sessions that were signed out or users that were banned before the token expired.
+
+    Args:
+        credentials: The HTTP authorization credentials containing the JWT token
+
+    Returns:
+        dict: The user data if authenticated
+
+    Raises:
+        HTTPException: If the token is invalid, expired or revoked
+    """
     try:
         client = SupabaseClient.get_instance()
-        
+
         # Verify the JWT token and get the user
-        user = client.auth.get_user(credentials.credentials)
-        
+        user = await client.auth.get_user(credentials.credentials)
+
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-            
-        return user.user.dict()
-        
+            raise _credentials_exception()
+
+        return user.user.model_dump()
+
     except Exception as e:
         logger.error(f"Authentication error: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) 
\ No newline at end of file
+        raise _credentials_exception()
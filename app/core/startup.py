@@ -0,0 +1,139 @@
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process was exec'd (Linux), so interpreter start-up counts towards boot time."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name; starttime is field 22 of the whole line
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class StartupProfile:
+    """Records how a worker spends its boot: module imports, lifespan phases and time to first ready."""
+
+    def __init__(self, top_imports: int = 15):
+        self.top_imports = top_imports
+        age = _process_age()
+        self._created = time.perf_counter()
+        self._process_started = self._created - age if age is not None else None
+        self._imports: Dict[str, float] = {}
+        self._original_import = None
+        self._imports_done: Optional[float] = None
+        self._phases: Dict[str, float] = {}
+        self._ready: Optional[float] = None
+
+    def track_imports(self) -> None:
+        """Time every module imported from here until ready() (or stop_tracking_imports())."""
+        if self._original_import is not None:
+            return
+        self._original_import = original = builtins.__import__
+        imports = self._imports
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # Already-loaded modules (the vast majority of import statements) skip the bookkeeping
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                imports.setdefault(name, time.perf_counter() - started)
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def imports_done(self) -> None:
+        """Mark the end of the module-level import phase (the app object exists)."""
+        self._imports_done = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one named step of the startup lifespan."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[name] = time.perf_counter() - started
+
+    def ready(self) -> None:
+        """Mark the worker ready to serve (end of the lifespan startup)."""
+        if self._ready is None:
+            self._ready = time.perf_counter()
+        self.stop_tracking_imports()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready is not None
+
+    def boot_seconds(self) -> Optional[float]:
+        """Process start (or profile creation, where the start time is unknown) to ready."""
+        if self._ready is None:
+            return None
+        return self._ready - (self._process_started if self._process_started is not None else self._created)
+
+    def slowest_imports(self) -> List[Dict[str, Any]]:
+        """The costliest imports, inclusive of what they imported in turn."""
+        ranked = sorted(self._imports.items(), key=lambda item: item[1], reverse=True)[:self.top_imports]
+        return [{"module": name, "ms": round(seconds * 1000, 1)} for name, seconds in ranked]
+
+    def report(self, target_seconds: Optional[float] = None) -> Dict[str, Any]:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        boot = self.boot_seconds()
+        imports_done = self._imports_done
+        return {
+            "ready": self.is_ready,
+            "boot_ms": ms(boot),
+            "interpreter_ms": ms(self._created - self._process_started) if self._process_started is not None else None,
+            "import_ms": ms(imports_done - self._created) if imports_done else None,
+            "lifespan_ms": ms(self._ready - imports_done) if self._ready and imports_done else None,
+            "phases_ms": {name: ms(seconds) for name, seconds in self._phases.items()},
+            "slowest_imports": self.slowest_imports(),
+            "target_ms": ms(target_seconds),
+            "within_target": boot <= target_seconds if boot is not None and target_seconds else None,
+        }
+
+startup_profile = StartupProfile()
+
+async def readiness_endpoint(request: "Request") -> "JSONResponse":
+    """200 with the startup report once the lifespan has finished, 503 before."""
+    # This module is imported before anything else in main.py, so it imports nothing heavy itself
+    from starlette.responses import JSONResponse
+    from app.core.config import settings
+    report = startup_profile.report(settings.STARTUP_TARGET_SECONDS)
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+"""
+1. What is measured:
+    . interpreter_ms: process exec to the first line of main.py (Linux only, from /proc)
+    . import_ms: main.py's module-level imports, up to the app object being built
+    . lifespan_ms and phases_ms: the startup half of the lifespan (client connections, pools)
+    . boot_ms: process start to ready; compared against STARTUP_TARGET_SECONDS
+
+2. Import timing:
+    . track_imports() wraps builtins.__import__ until ready(); only modules not yet in sys.modules are timed
+    . Times are inclusive (a package includes everything it imports), like the cumulative column of -X importtime
+    . After ready() the original __import__ is restored, so requests never pay for the wrapper
+
+3. Readiness:
+    . GET /ready serves the report; 503 until the lifespan has finished starting up
+    . benchmarks/bench_startup.py boots real workers and checks boot_ms against the target
+"""
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 from uuid import UUID, uuid4
 from pydantic import BaseModel, EmailStr, Field
 
@@ -27,6 +27,10 @@ class UserInDB(UserBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
+class UserRow(UserInDB):
+    """User read back from the database; the email was validated when the row was written."""
+    email: Optional[str] = None
+    
 class AuthMethod(BaseModel):
     """Model for authentication methods."""
     id: UUID = Field(default_factory=uuid4)
@@ -41,6 +45,20 @@ class AuthMethod(BaseModel):
     email_verification_token: Optional[str] = None
     phone_otp: Optional[str] = None
     
+class UserRegistration(BaseModel):
+    """One registration in a bulk request."""
+    user_data: UserCreate
+    registration_type: str
+    company_data: Optional[Dict[str, Any]] = None
+    auth_provider: Optional[str] = None
+    social_id: Optional[str] = None
+    
+class RegistrationOutcome(BaseModel):
+    """Per-row result of a bulk registration."""
+    index: int
+    user: Optional[UserInDB] = None
+    error: Optional[str] = None
+    
 class Token(BaseModel):
     """Model for authentication tokens."""
     access_token: str
@@ -65,7 +83,16 @@ class Token(BaseModel):
     . id: UUID for unique identification
     . created_at and updated_at timestamps
     
-4. AuthMethod Model:
+4. UserRow Model:
+    . What repositories return: a UserInDB whose email is a plain str
+    . EmailStr validation dominates UserInDB validation (~95% of it) and only needs to run on input
+    . UUIDs and timestamps are still coerced from the row
+    
+5. UserRegistration / RegistrationOutcome Models:
+    . Input and per-row result of AuthService.register_users_bulk
+    . A failed row carries an error message instead of a user
+    
+6. AuthMethod Model:
     . Tracks different authentication methods for a user
     . Supports multiple auth methods (email, phone, social)
     . Stores provider-specific information
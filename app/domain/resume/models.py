@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid4
+from pydantic import BaseModel, Field
+
+
+class Resume(BaseModel):
+    """Text extracted from a user's resume, one row per user."""
+    id: UUID = Field(default_factory=uuid4)
+    user_id: UUID
+    filename: Optional[str] = None
+    content_type: str
+    size_bytes: int
+    page_count: int
+    text: str
+    skills: List[str] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+class ResumePage(BaseModel):
+    """Text of one page (one section for DOCX) as it comes out of the parser."""
+    number: int
+    text: str
+    
+"""
+1. Resume Model:
+    . Keyed by user_id: uploading again replaces the previous resume
+    . text is the page texts joined with blank lines
+    . page_count counts PDF pages, or paragraph sections for DOCX
+    . skills holds the taxonomy skill ids found in text when it was stored (SkillExtractor)
+
+2. ResumePage Model:
+    . Yielded by ResumeService.ingest while the upload is parsed, numbered from 1
+"""
@@ -0,0 +1,28 @@
+from typing import List, Tuple
+from pydantic import BaseModel
+
+
+class Skill(BaseModel):
+    """A canonical skill of the taxonomy and the terms that name it."""
+    id: str
+    name: str
+    category: str
+    aliases: List[str] = []
+    match_name: bool = True
+
+class SkillMatch(BaseModel):
+    """Occurrences of one skill in a document."""
+    skill_id: str
+    name: str
+    category: str
+    count: int
+    offsets: List[Tuple[int, int]]  # [start, end) character offsets into the scanned text
+
+"""
+1. Skill Model:
+    . id is the stable key stored and filtered on; name is for display
+    . aliases are alternative spellings ("golang", "k8s"); match_name=False for names that are also plain words ("Go", "R")
+
+2. SkillMatch Model:
+    . One per skill found, with every non-overlapping occurrence in text order
+"""
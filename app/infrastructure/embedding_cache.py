@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+# Keys per SELECT ... IN (...); stays under SQLite's bound-parameter limit on old builds too
+LOOKUP_BATCH = 500
+
+def content_key(model: str, dimensions: int, text: str) -> bytes:
+    """The cache key of a text's embedding: a SHA-256 of the model, its dimensions and the exact text."""
+    return hashlib.sha256(f"{model}\x00{dimensions}\x00{text}".encode()).digest()
+
+class EmbeddingCache:
+    """
+    Persistent content-hash -> vector store in SQLite.
+
+    Vectors are kept as packed float32. The blocking SQLite calls run on a
+    worker thread (get_many/put_many) so lookups never stall the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Workers on one host share the file; a writer waits for another's transaction instead of failing
+        self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.commit()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0}
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingCache":
+        return cls(settings.EMBEDDING_CACHE_PATH)
+
+    def _get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        found: Dict[bytes, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[start:start + LOOKUP_BATCH]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+        self._counters["hits"] += len(found)
+        self._counters["misses"] += len(keys) - len(found)
+        return found
+
+    def _put_many(self, items: List[Tuple[bytes, List[float]]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in items]
+            )
+            self._db.commit()
+        self._counters["writes"] += len(items)
+
+    async def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, List[float]]:
+        """The cached vectors among keys; absent keys are left out."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def put_many(self, items: List[Tuple[bytes, List[float]]]) -> None:
+        if items:
+            await asyncio.to_thread(self._put_many, items)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+_cache: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    """The process-wide cache at EMBEDDING_CACHE_PATH, opened on first use."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache.from_settings()
+    return _cache
+
+def close_embedding_cache() -> None:
+    """Close the process-wide cache (called on shutdown); the next get_embedding_cache reopens it."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+"""
+1. Keys:
+    . SHA-256 of model + dimensions + text, so identical chunks (shared boilerplate, re-uploads) embed once
+    . A vector is only valid for the model that produced it; a model change simply misses
+
+2. Storage:
+    . One SQLite file (EMBEDDING_CACHE_PATH) in WAL mode, shared by the uvicorn workers on a host
+    . float32 blobs: 6 KB for a 1536-dimension vector, a quarter of its JSON size
+    . Lookups are batched (LOOKUP_BATCH keys per query) and writes go in one transaction per batch
+
+3. The cache is never pruned; at 6 KB per chunk, a million distinct chunks is ~6 GB
+"""
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import math
+import struct
+from typing import List, Protocol
+from app.core.config import settings
+
+class EmbeddingBackend(Protocol):
+    model: str
+    dimensions: int
+    max_batch_size: int  # inputs per request
+    max_batch_tokens: int  # tokens per request, summed over its inputs
+
+    def warm(self) -> None:
+        """Load what the first request would otherwise load (blocking, so call it on a thread)."""
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector per text, in order, raising if the batch could not be embedded."""
+
+class OpenAIEmbeddingBackend:
+    """OpenAI embeddings through langchain-openai, one API request per batch."""
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int,
+        api_key: str,
+        timeout: float,
+        max_batch_size: int,
+        max_batch_tokens: int
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self._client = None
+
+    def warm(self) -> None:
+        # langchain takes about a second to import: loaded here, in the background after startup, never at import time
+        if self._client is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._client = OpenAIEmbeddings(
+                model=self.model,
+                dimensions=self.dimensions,
+                api_key=self.api_key,
+                timeout=self.timeout,
+                # Batches arrive chunked and packed already; stop langchain from re-tokenizing and re-splitting them
+                check_embedding_ctx_length=False,
+                chunk_size=self.max_batch_size
+            )
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._client is None:
+            await asyncio.to_thread(self.warm)
+        return await self._client.aembed_documents(texts)
+
+class FakeEmbeddingBackend:
+    """
+    Deterministic local embedder for tests and benchmarks: no network, no API key.
+
+    The same text always maps to the same unit vector. latency is added per
+    request to stand in for the API round trip.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 256,
+        latency: float = 0.0,
+        max_batch_size: int = 512,
+        max_batch_tokens: int = 100_000
+    ):
+        self.model = f"fake-{dimensions}"
+        self.dimensions = dimensions
+        self.latency = latency
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.requests = 0
+        self.inputs = 0
+
+    def vector(self, text: str) -> List[float]:
+        # Expand a hash of the text into dimensions values in [-1, 1), then normalize
+        values: List[float] = []
+        counter = 0
+        seed = text.encode()
+        while len(values) < self.dimensions:
+            digest = hashlib.blake2b(seed, digest_size=64, salt=counter.to_bytes(8, "little")).digest()
+            values.extend(value / 2 ** 31 for value in struct.unpack("<16i", digest))
+            counter += 1
+        del values[self.dimensions:]
+        norm = math.sqrt(sum(value * value for value in values)) or 1.0
+        return [value / norm for value in values]
+
+    def warm(self) -> None:
+        pass
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        self.inputs += len(texts)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self.vector(text) for text in texts]
+
+def backend_from_settings() -> EmbeddingBackend:
+    """The backend named by EMBEDDING_BACKEND ("openai" or "fake")."""
+    if settings.EMBEDDING_BACKEND == "fake":
+        return FakeEmbeddingBackend(
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+            max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_batch_tokens=settings.EMBEDDING_BATCH_TOKENS
+        )
+    return OpenAIEmbeddingBackend(
+        model=settings.EMBEDDING_MODEL,
+        dimensions=settings.EMBEDDING_DIMENSIONS,
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.EMBEDDING_REQUEST_TIMEOUT,
+        max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_batch_tokens=settings.EMBEDDING_BATCH_TOKENS
+    )
+
+"""
+1. Backends:
+    . Anything with model, dimensions, the two batch limits, warm() and an async embed() is a backend (EmbeddingBackend)
+    . EMBEDDING_BACKEND=openai calls the API through langchain-openai; fake needs no network and is deterministic
+    . model and dimensions are part of the embedding cache key, so switching either never serves stale vectors
+
+2. Batch limits:
+    . The OpenAI embeddings endpoint takes up to 2048 inputs and ~300k tokens per request
+    . The defaults (EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_TOKENS) stay well under both
+"""
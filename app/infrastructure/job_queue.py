@@ -0,0 +1,548 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol
+from uuid import uuid4
+from app.core.config import settings
+from app.core.exceptions import AppException, ServiceUnavailableException
+from app.core.metrics import JOB_DURATION, JOBS_ENQUEUED, JOBS_FINISHED
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "retrying", "succeeded", "dead")
+ACTIVE_STATUSES = ("queued", "running", "retrying")
+
+# Handlers take the job payload as keyword arguments
+JobHandler = Callable[..., Awaitable[Any]]
+
+@dataclass
+class Job:
+    name: str
+    payload: Dict[str, Any]
+    max_attempts: int
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: str = "queued"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    run_at: float = 0.0  # earliest time of the next attempt
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class JobStore(Protocol):
+    """
+    Where jobs live between attempts.
+
+    Active jobs are owned by one queue at a time through a lease that the owner
+    keeps renewing; a job whose lease ran out (its worker crashed or was killed)
+    can be claimed by any queue sharing the store.
+    """
+
+    def add(self, job: Job, owner: str, lease_until: float) -> None: ...
+    def update(self, job: Job) -> None: ...
+    def get(self, job_id: str) -> Optional[Job]: ...
+    def claim(self, owner: str, lease_until: float, now: float, limit: int) -> List[Job]: ...
+    def renew(self, owner: str, lease_until: float) -> None: ...
+    def release(self, owner: str) -> None: ...
+    def list(self, status: Optional[str], limit: int) -> List[Job]: ...
+    def counts(self) -> Dict[str, int]: ...
+    def purge(self, before: float) -> int: ...
+    def close(self) -> None: ...
+
+class MemoryJobStore:
+    """Jobs in a dict: inspectable, but lost with the process. Finished jobs beyond history are dropped oldest first."""
+
+    def __init__(self, history: int = 10000):
+        self.history = history
+        self._jobs: Dict[str, Job] = {}
+        self._leases: Dict[str, tuple] = {}  # job id -> (owner, lease_until)
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, job: Job, owner: str, lease_until: float) -> None:
+        self._jobs[job.id] = job
+        self._leases[job.id] = (owner, lease_until)
+
+    def update(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        if job.status in ACTIVE_STATUSES:
+            if self._finished.pop(job.id, False) is None:
+                self._leases[job.id] = (None, 0.0)  # a dead job retried by an admin, free to claim
+        else:
+            self._leases.pop(job.id, None)
+            self._finished[job.id] = None
+            while len(self._finished) > self.history:
+                self._jobs.pop(self._finished.popitem(last=False)[0], None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def claim(self, owner: str, lease_until: float, now: float, limit: int) -> List[Job]:
+        claimed = []
+        for job_id, (_, expires_at) in list(self._leases.items()):
+            if len(claimed) >= limit:
+                break
+            job = self._jobs[job_id]
+            if expires_at < now and job.run_at <= now:
+                self._leases[job_id] = (owner, lease_until)
+                claimed.append(job)
+        return claimed
+
+    def renew(self, owner: str, lease_until: float) -> None:
+        for job_id, (lease_owner, _) in self._leases.items():
+            if lease_owner == owner:
+                self._leases[job_id] = (owner, lease_until)
+
+    def release(self, owner: str) -> None:
+        for job_id, (lease_owner, _) in self._leases.items():
+            if lease_owner == owner:
+                self._leases[job_id] = (None, 0.0)
+
+    def list(self, status: Optional[str], limit: int) -> List[Job]:
+        jobs = [job for job in self._jobs.values() if status is None or job.status == status]
+        return sorted(jobs, key=lambda job: job.updated_at, reverse=True)[:limit]
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def purge(self, before: float) -> int:
+        purged = [job_id for job_id in self._finished if self._jobs[job_id].updated_at < before]
+        for job_id in purged:
+            del self._finished[job_id]
+            del self._jobs[job_id]
+        return len(purged)
+
+    def close(self) -> None:
+        pass
+
+class SQLiteJobStore:
+    """Jobs in a SQLite file, so they survive restarts; the uvicorn workers on a host can share one file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL, max_attempts INTEGER NOT NULL, last_error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, run_at REAL NOT NULL, "
+            "owner TEXT, lease_until REAL NOT NULL DEFAULT 0"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at)")
+        self._db.commit()
+
+    _COLUMNS = "id, name, payload, status, attempts, max_attempts, last_error, created_at, updated_at, run_at"
+
+    @staticmethod
+    def _job(row: tuple) -> Job:
+        job_id, name, payload, status, attempts, max_attempts, last_error, created_at, updated_at, run_at = row
+        return Job(
+            name=name,
+            payload=json.loads(payload),
+            max_attempts=max_attempts,
+            id=job_id,
+            status=status,
+            attempts=attempts,
+            last_error=last_error,
+            created_at=created_at,
+            updated_at=updated_at,
+            run_at=run_at
+        )
+
+    def add(self, job: Job, owner: str, lease_until: float) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO jobs ({self._COLUMNS}, owner, lease_until) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.name, json.dumps(job.payload), job.status, job.attempts, job.max_attempts,
+                    job.last_error, job.created_at, job.updated_at, job.run_at, owner, lease_until
+                )
+            )
+            self._db.commit()
+
+    def update(self, job: Job) -> None:
+        finished = job.status not in ACTIVE_STATUSES
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, updated_at = ?, run_at = ?"
+                + (", owner = NULL, lease_until = 0" if finished else "")
+                + " WHERE id = ?",
+                (job.status, job.attempts, job.last_error, job.updated_at, job.run_at, job.id)
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def claim(self, owner: str, lease_until: float, now: float, limit: int) -> List[Job]:
+        # One statement, so two workers sharing the file never claim the same job
+        with self._lock:
+            rows = self._db.execute(
+                f"UPDATE jobs SET owner = ?, lease_until = ? WHERE id IN ("
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running', 'retrying') "
+                "AND lease_until < ? AND run_at <= ? ORDER BY run_at LIMIT ?"
+                f") RETURNING {self._COLUMNS}",
+                (owner, lease_until, now, now, limit)
+            ).fetchall()
+            self._db.commit()
+        return [self._job(row) for row in rows]
+
+    def renew(self, owner: str, lease_until: float) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET lease_until = ? WHERE owner = ?", (lease_until, owner))
+            self._db.commit()
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET owner = NULL, lease_until = 0 WHERE owner = ?", (owner,))
+            self._db.commit()
+
+    def list(self, status: Optional[str], limit: int) -> List[Job]:
+        with self._lock:
+            if status is None:
+                rows = self._db.execute(
+                    f"SELECT {self._COLUMNS} FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    f"SELECT {self._COLUMNS} FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {**dict.fromkeys(JOB_STATUSES, 0), **dict(rows)}
+
+    def purge(self, before: float) -> int:
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'dead') AND updated_at < ?", (before,)
+            ).rowcount
+            self._db.commit()
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def job_store_from_settings() -> JobStore:
+    if settings.JOBS_BACKEND == "memory":
+        return MemoryJobStore()
+    if settings.JOBS_BACKEND == "sqlite":
+        return SQLiteJobStore(settings.JOBS_SQLITE_PATH)
+    raise ValueError(f"Unknown JOBS_BACKEND {settings.JOBS_BACKEND!r}, expected 'memory' or 'sqlite'")
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^(attempts - 1))]."""
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether an attempt that raised error may succeed if repeated.
+
+    Handlers report rejections as an AppException with a 4xx status (an invalid
+    phone number, a rate-limited send); a TypeError means the payload does not
+    fit the handler. Both fail the same way every time. Anything else (timeouts,
+    connection errors, 5xx) is worth another attempt.
+    """
+    if isinstance(error, AppException):
+        return not 400 <= error.status_code < 500
+    return not isinstance(error, TypeError)
+
+class JobQueue:
+    """
+    Runs side effects after the request that asked for them has been answered.
+
+    Jobs are written to the store, then handed to a bounded in-memory queue
+    served by a fixed set of worker tasks. A transient failure is retried after
+    a jittered exponential backoff; once max_attempts is used up, or at once for
+    a permanent failure, the job is dead-lettered (status "dead") and kept for
+    inspection. stop() drains the
+    queue for up to drain_timeout seconds; whatever is left stays in the store
+    for the next queue that claims it.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int,
+        max_queue: int,
+        max_attempts: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+        attempt_timeout: float,
+        drain_timeout: float,
+        lease_seconds: float,
+        retention: float
+    ):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.attempt_timeout = attempt_timeout
+        self.drain_timeout = drain_timeout
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self.owner = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._retries: Dict[str, "asyncio.Task[None]"] = {}
+        self._accepting = False
+        self._reserved = 0
+        self._counters = {"enqueued": 0, "rejected": 0, "succeeded": 0, "retried": 0, "dead": 0, "recovered": 0}
+
+    @classmethod
+    def from_settings(cls) -> "JobQueue":
+        return cls(
+            job_store_from_settings(),
+            workers=settings.JOBS_WORKERS,
+            max_queue=settings.JOBS_MAX_QUEUE,
+            max_attempts=settings.JOBS_MAX_ATTEMPTS,
+            retry_base_delay=settings.JOBS_RETRY_BASE_DELAY,
+            retry_max_delay=settings.JOBS_RETRY_MAX_DELAY,
+            attempt_timeout=settings.JOBS_ATTEMPT_TIMEOUT,
+            drain_timeout=settings.JOBS_DRAIN_TIMEOUT,
+            lease_seconds=settings.JOBS_LEASE_SECONDS,
+            retention=settings.JOBS_RETENTION
+        )
+
+    def register(self, name: str, handler: JobHandler) -> None:
+        """Run handler(**payload) for jobs called name. Register every handler before start()."""
+        self._handlers[name] = handler
+
+    async def start(self) -> None:
+        """Start the workers and claim jobs left in the store by earlier or crashed workers."""
+        # Unbounded on purpose: _free_slots() is the only bound, so a put never races a reservation
+        self._queue = asyncio.Queue()
+        self._accepting = True
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        await self._recover()
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        """Stop accepting jobs, let the queued ones finish for up to drain_timeout, then hand the rest back to the store."""
+        self._accepting = False
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Job queue drain timed out with {self._queue.qsize()} jobs left; they stay in the store")
+        tasks = [*self._tasks, *self._retries.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries = {}
+        self._queue = None
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    def close(self) -> None:
+        self.store.close()
+
+    async def enqueue(self, name: str, **payload: Any) -> Job:
+        """Store a job and queue it; raises ServiceUnavailableException when the queue is full or stopping."""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job {name!r}")
+        if not self._accepting or self._free_slots() <= 0:
+            self._counters["rejected"] += 1
+            JOBS_ENQUEUED.labels(name=name, result="rejected").inc()
+            raise ServiceUnavailableException("Too many pending requests, please retry shortly.")
+        job = Job(name=name, payload=payload, max_attempts=self.max_attempts)
+        # Hold the slot while the insert runs on a thread, so concurrent enqueues cannot overfill the queue
+        self._reserved += 1
+        try:
+            await asyncio.to_thread(self.store.add, job, self.owner, time.time() + self.lease_seconds)
+        finally:
+            self._reserved -= 1
+        self._queue.put_nowait(job)
+        self._counters["enqueued"] += 1
+        JOBS_ENQUEUED.labels(name=name, result="accepted").inc()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def list(self, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        return await asyncio.to_thread(self.store.list, status, limit)
+
+    async def retry(self, job_id: str) -> Optional[Job]:
+        """Give a dead-lettered job a fresh set of attempts. None if there is no such dead job."""
+        job = await self.get(job_id)
+        if job is None or job.status != "dead":
+            return None
+        job.status = "queued"
+        job.attempts = 0
+        job.run_at = 0.0
+        job.updated_at = time.time()
+        await asyncio.to_thread(self.store.update, job)
+        # The job is unowned now; the next maintenance round (or this call) claims it
+        await self._recover()
+        return job
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "workers": self.workers,
+            "queued_in_worker": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "retry_scheduled": len(self._retries),
+            "jobs": await asyncio.to_thread(self.store.counts),
+        }
+
+    # Workers
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Only the store can fail here; the job's lease runs out and another round picks it up
+                logger.error(f"Job {job.id} could not be recorded: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.name)
+        job.status = "running"
+        job.attempts += 1
+        job.updated_at = time.time()
+        await asyncio.to_thread(self.store.update, job)
+
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"no handler registered for {job.name!r}")
+            await asyncio.wait_for(handler(**job.payload), self.attempt_timeout)
+        except Exception as e:
+            JOB_DURATION.labels(name=job.name, outcome="error").observe(time.perf_counter() - started)
+            await self._failed(job, e, retry=handler is not None and is_transient(e))
+            return
+        JOB_DURATION.labels(name=job.name, outcome="success").observe(time.perf_counter() - started)
+        job.status = "succeeded"
+        job.last_error = None
+        job.updated_at = time.time()
+        await asyncio.to_thread(self.store.update, job)
+        self._counters["succeeded"] += 1
+        JOBS_FINISHED.labels(name=job.name, status="succeeded").inc()
+
+    async def _failed(self, job: Job, error: Exception, retry: bool) -> None:
+        job.last_error = str(error) or type(error).__name__
+        job.updated_at = time.time()
+        if retry and job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts, self.retry_base_delay, self.retry_max_delay)
+            job.status = "retrying"
+            job.run_at = job.updated_at + delay
+            await asyncio.to_thread(self.store.update, job)
+            self._counters["retried"] += 1
+            self._retries[job.id] = asyncio.create_task(self._requeue_later(job, delay))
+            logger.warning(f"Job {job.name} {job.id} failed (attempt {job.attempts}), retrying in {delay:.2f}s: {job.last_error}")
+            return
+        job.status = "dead"
+        await asyncio.to_thread(self.store.update, job)
+        self._counters["dead"] += 1
+        JOBS_FINISHED.labels(name=job.name, status="dead").inc()
+        reason = f"after {job.attempts} attempts" if retry else f"on a permanent error (attempt {job.attempts})"
+        logger.error(
+            f"Job {job.name} {job.id} dead-lettered {reason}: {job.last_error}",
+            extra={"job_id": job.id, "job_name": job.name, "attempts": job.attempts}
+        )
+
+    async def _requeue_later(self, job: Job, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            self._queue.put_nowait(job)
+        finally:
+            self._retries.pop(job.id, None)
+
+    # Leases and recovery
+
+    def _free_slots(self) -> int:
+        # A scheduled retry keeps its slot while it sleeps
+        return self.max_queue - self._queue.qsize() - self._reserved - len(self._retries)
+
+    async def _recover(self) -> None:
+        free = self._free_slots()
+        if free <= 0:
+            return
+        now = time.time()
+        self._reserved += free
+        try:
+            jobs = await asyncio.to_thread(self.store.claim, self.owner, now + self.lease_seconds, now, free)
+        finally:
+            self._reserved -= free
+        for job in jobs:
+            self._queue.put_nowait(job)
+        if jobs:
+            self._counters["recovered"] += len(jobs)
+            logger.info(f"Claimed {len(jobs)} unfinished jobs")
+
+    async def _maintain(self) -> None:
+        interval = self.lease_seconds / 3
+        last_purge = 0.0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.store.renew, self.owner, time.time() + self.lease_seconds)
+                await self._recover()
+                if time.time() - last_purge > 3600:
+                    last_purge = time.time()
+                    await asyncio.to_thread(self.store.purge, last_purge - self.retention)
+            except Exception as e:
+                logger.error(f"Job queue maintenance failed: {str(e)}")
+
+"""
+1. Lifecycle of a job:
+    . enqueue() writes it to the store (status queued) and puts it on this worker's bounded asyncio queue
+    . A full queue rejects the job with a 503 rather than letting side effects pile up without bound
+    . The bound is JOBS_MAX_QUEUE slots, counted as queued jobs + slots reserved while enqueue() or a recovery
+      round writes to the store + scheduled retries; the asyncio queue itself is unbounded, so a retry or a
+      recovered job never takes a slot enqueue() reserved and put_nowait() never fails after the job is stored
+    . JOBS_WORKERS tasks take jobs off the queue and run handler(**payload) with a per-attempt timeout
+    . Failures are retried after a full-jitter exponential backoff (JOBS_RETRY_BASE_DELAY, capped at JOBS_RETRY_MAX_DELAY)
+    . After JOBS_MAX_ATTEMPTS the job is dead-lettered: status dead with its last error, until an admin retries it
+    . Permanent failures are dead-lettered on the first attempt (is_transient): an AppException with a 4xx status
+      (Supabase Auth rejected the request, e.g. an invalid phone or a rate-limited send) or a payload that does not
+      fit the handler; retrying those only repeats the rejection
+
+2. Persistence (JOBS_BACKEND):
+    . memory: jobs are inspectable but die with the process
+    . sqlite: one file (JOBS_SQLITE_PATH) in WAL mode, shared by the uvicorn workers on a host
+    . Each queue owns its active jobs through a lease it renews every JOBS_LEASE_SECONDS / 3
+    . On start and on every renewal round a queue claims jobs whose lease ran out, so jobs of a crashed or killed
+      worker are picked up by another worker or after a restart; delivery is therefore at least once
+    . Succeeded and dead jobs are purged JOBS_RETENTION seconds after they finished
+
+3. Shutdown:
+    . stop() refuses new jobs, waits up to JOBS_DRAIN_TIMEOUT for the queue to empty, then cancels the workers
+      and pending retries and releases its leases so the next queue can claim what is left immediately
+
+4. Inspection:
+    . GET /admin/jobs/stats, GET /admin/jobs?status=dead, GET /admin/jobs/{id}, POST /admin/jobs/{id}/retry
+    . jobs_enqueued_total{name,result}, jobs_finished_total{name,status} and job_duration_seconds{name,outcome}
+"""
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Protocol
+from app.core.config import settings
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A versioned chat prompt. Bump version whenever the wording changes meaning:
+    the version is part of the response cache key.
+    """
+    name: str
+    version: str
+    system: str
+    user: str  # str.format template
+
+    def render(self, **variables: Any) -> Dict[str, str]:
+        return {"system": self.system, "user": self.user.format(**variables)}
+
+class LLMBackend(Protocol):
+    model: str
+
+    async def complete(self, prompt: Dict[str, str], params: Dict[str, Any]) -> str:
+        """The model's reply to a rendered prompt ({"system": ..., "user": ...})."""
+
+class OpenAIChatBackend:
+    """OpenAI chat completions through langchain-openai."""
+
+    def __init__(self, model: str, api_key: str, timeout: float):
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client = None
+
+    def _chat(self):
+        # Imported on first use: langchain takes about a second to load
+        if self._client is None:
+            from langchain_openai import ChatOpenAI
+            self._client = ChatOpenAI(model=self.model, api_key=self.api_key, timeout=self.timeout)
+        return self._client
+
+    async def complete(self, prompt: Dict[str, str], params: Dict[str, Any]) -> str:
+        client = self._chat()
+        reply = await client.bind(**params).ainvoke([("system", prompt["system"]), ("human", prompt["user"])])
+        return reply.content
+
+class FakeLLMBackend:
+    """
+    Deterministic local LLM for tests and benchmarks: no network, no API key.
+
+    The reply is derived from a hash of the prompt and params, so identical
+    requests get identical replies. latency stands in for the API round trip.
+    A malformed_rate share of calls instead answers the way real models
+    sometimes do: the JSON wrapped in a markdown fence, or cut off mid-reply.
+    """
+
+    def __init__(self, latency: float = 0.0, malformed_rate: float = 0.0, seed: int = 0):
+        self.model = "fake-llm"
+        self.latency = latency
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self.malformed = 0
+        self._random = random.Random(seed)
+
+    async def complete(self, prompt: Dict[str, str], params: Dict[str, Any]) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(json.dumps([prompt, params], sort_keys=True).encode()).hexdigest()
+        reply = json.dumps({
+            "score": int(digest[:2], 16) % 101,
+            "summary": f"Evaluation {digest[:12]} of a {len(prompt['user'])}-character prompt.",
+        })
+        if self.malformed_rate and self._random.random() < self.malformed_rate:
+            self.malformed += 1
+            if self._random.random() < 0.5:
+                return f"```json\n{reply}\n```"
+            return reply[:len(reply) // 2]
+        return reply
+
+def llm_backend_from_settings() -> LLMBackend:
+    """The backend named by LLM_BACKEND ("openai" or "fake")."""
+    if settings.LLM_BACKEND == "fake":
+        return FakeLLMBackend(malformed_rate=settings.LLM_FAKE_MALFORMED_RATE)
+    return OpenAIChatBackend(settings.LLM_MODEL, settings.OPENAI_API_KEY, settings.LLM_REQUEST_TIMEOUT)
+
+"""
+1. Backends:
+    . Anything with a model name and an async complete(prompt, params) is a backend (LLMBackend)
+    . LLM_BACKEND=fake needs no network and answers deterministically, in the JSON shape the prompts ask for
+    . LLM_FAKE_MALFORMED_RATE makes the fake answer that share of calls with fenced or truncated JSON
+
+2. Prompts:
+    . PromptTemplate carries a name and version; CachedLLM (llm_cache.py) keys responses on both
+    . Changing a prompt's meaning without bumping its version would serve answers to the old prompt until they expire
+"""
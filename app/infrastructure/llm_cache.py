@@ -0,0 +1,368 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.metrics import LLM_CACHE_EVICTIONS, LLM_CACHE_LOOKUPS, LLM_REQUEST_DURATION
+from app.infrastructure.llm import LLMBackend, PromptTemplate, llm_backend_from_settings
+from app.utils.cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Eviction frees down to this share of max_bytes, so a full cache does not evict on every write
+EVICT_TO = 0.9
+
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def normalize_text(text: str) -> str:
+    """Text with differences that do not change its meaning removed: Unicode form, line endings, runs of spaces."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+def llm_cache_key(model: str, template: PromptTemplate, params: Dict[str, Any], variables: Dict[str, Any]) -> str:
+    """SHA-256 over a canonical JSON of everything that shapes the reply."""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "template": template.name,
+            "version": template.version,
+            "params": params,
+            "input": variables,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class LLMResponseCache:
+    """
+    Disk-backed key -> reply store in SQLite, bounded by total size and by age.
+
+    Entries expire ttl seconds after they were written. Once the stored
+    replies exceed max_bytes, the least recently used are evicted. The
+    blocking calls run on a worker thread (get/put/delete).
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_responses_last_used ON llm_responses (last_used)")
+        self._db.commit()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evicted": 0, "invalid": 0}
+
+    @classmethod
+    def from_settings(cls) -> "LLMResponseCache":
+        return cls(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL)
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] <= now:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._counters["expired"] += 1
+                LLM_CACHE_EVICTIONS.labels(reason="ttl").inc()
+                row = None
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            # Replies are seconds of API time, so one write per hit to keep the LRU order is cheap
+            self._db.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        self._counters["hits"] += 1
+        return row[0]
+
+    def _put(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(key) + len(value.encode())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, size, created_at, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, size, now, now + self.ttl, now)
+            )
+            self._db.commit()
+            self._counters["writes"] += 1
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            row = self._db.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._bytes -= row[0]
+                self._counters["invalid"] += 1
+                LLM_CACHE_EVICTIONS.labels(reason="invalid").inc()
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock. Expired rows go first; other workers write to the same file,
+        # so the running total is re-read from the table before deciding how much LRU to drop.
+        expired = self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,)).rowcount
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        excess = self._bytes - int(self.max_bytes * EVICT_TO)
+        evicted = 0
+        if excess > 0:
+            keys = []
+            for key, size in self._db.execute("SELECT key, size FROM llm_responses ORDER BY last_used"):
+                keys.append((key,))
+                excess -= size
+                self._bytes -= size
+                if excess <= 0:
+                    break
+            self._db.executemany("DELETE FROM llm_responses WHERE key = ?", keys)
+            evicted = len(keys)
+        self._db.commit()
+        self._counters["expired"] += expired
+        self._counters["evicted"] += evicted
+        LLM_CACHE_EVICTIONS.labels(reason="ttl").inc(expired)
+        LLM_CACHE_EVICTIONS.labels(reason="size").inc(evicted)
+
+    async def get(self, key: str) -> Optional[str]:
+        """The live reply stored under key, or None."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._put, key, value)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries now rather than when they are next read or space is needed."""
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._db.commit()
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        self._counters["expired"] += deleted
+        LLM_CACHE_EVICTIONS.labels(reason="ttl").inc(deleted)
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+@dataclass(frozen=True)
+class LLMResponse:
+    text: str
+    model: str
+    prompt_version: str
+    cached: bool  # True when no upstream call was made for this request
+    parsed: Any = None  # what the caller's parse returned for text
+
+class CachedLLM:
+    """
+    An LLMBackend behind the response cache.
+
+    A request is served from the cache when an identical one (same model,
+    prompt version, params and normalized input) was answered before;
+    concurrent identical misses share one upstream call. Callers that need
+    a particular shape pass parse: a reply it raises on is never stored,
+    and a stored one it raises on is deleted and asked for again.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        cache: LLMResponseCache,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.params = params or {}
+        self.timeout = timeout
+        self._flight = SingleFlight()
+        self._counters = {"requests": 0, "hits": 0, "coalesced": 0, "upstream": 0, "invalid": 0}
+
+    @classmethod
+    def from_settings(cls) -> "CachedLLM":
+        return cls(
+            llm_backend_from_settings(),
+            get_llm_cache(),
+            {"temperature": settings.LLM_TEMPERATURE, "max_tokens": settings.LLM_MAX_TOKENS},
+            settings.LLM_REQUEST_TIMEOUT
+        )
+
+    async def generate(
+        self,
+        template: PromptTemplate,
+        params: Optional[Dict[str, Any]] = None,
+        parse: Optional[Callable[[str], Any]] = None,
+        **variables: Any
+    ) -> LLMResponse:
+        """
+        The reply to template rendered with variables, from the cache when possible.
+
+        parse turns the reply text into what the caller needs (LLMResponse.parsed)
+        and raises when it cannot; only replies it accepts are cached.
+        """
+        params = {**self.params, **(params or {})}
+        # The normalized text is also what gets sent, so the key describes the prompt exactly
+        variables = {name: normalize_text(value) if isinstance(value, str) else value for name, value in variables.items()}
+        key = llm_cache_key(self.backend.model, template, params, variables)
+        self._counters["requests"] += 1
+
+        try:
+            text = await self.cache.get(key)
+        except Exception as e:
+            # The cache only saves money; a broken cache file must not take the feature down
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            text = None
+        if text is not None:
+            try:
+                parsed = parse(text) if parse else None
+            except Exception as e:
+                # Stored before the caller checked it (or by an older parser); drop it and ask again
+                logger.warning(f"Discarding unreadable cached LLM reply: {str(e)}")
+                self._counters["invalid"] += 1
+                try:
+                    await self.cache.delete(key)
+                except Exception as e:
+                    logger.warning(f"LLM cache delete failed: {str(e)}")
+            else:
+                self._counters["hits"] += 1
+                LLM_CACHE_LOOKUPS.labels(result="hit").inc()
+                return LLMResponse(text, self.backend.model, template.version, cached=True, parsed=parsed)
+
+        leader = False
+
+        def call():
+            nonlocal leader
+            leader = True
+            return self._call_upstream(key, template.render(**variables), params, parse)
+
+        text, parsed = await self._flight.do(key, call)
+        if not leader:
+            self._counters["coalesced"] += 1
+        LLM_CACHE_LOOKUPS.labels(result="miss" if leader else "coalesced").inc()
+        return LLMResponse(text, self.backend.model, template.version, cached=not leader, parsed=parsed)
+
+    async def _call_upstream(
+        self,
+        key: str,
+        prompt: Dict[str, str],
+        params: Dict[str, Any],
+        parse: Optional[Callable[[str], Any]]
+    ) -> Tuple[str, Any]:
+        self._counters["upstream"] += 1
+        started = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(self.backend.complete(prompt, params), self.timeout)
+        except Exception as e:
+            LLM_REQUEST_DURATION.labels(outcome="error").observe(time.perf_counter() - started)
+            logger.error(f"LLM request failed: {str(e)}")
+            raise AppException("Failed to get a response from the language model.")
+        try:
+            parsed = parse(text) if parse else None
+        except Exception as e:
+            # Not cached, so the next identical request asks again instead of failing for LLM_CACHE_TTL
+            LLM_REQUEST_DURATION.labels(outcome="invalid").observe(time.perf_counter() - started)
+            self._counters["invalid"] += 1
+            logger.error(f"Unreadable LLM reply: {str(e)}")
+            raise AppException("The language model returned an unreadable response.")
+        LLM_REQUEST_DURATION.labels(outcome="success").observe(time.perf_counter() - started)
+        try:
+            await self.cache.put(key, text)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+        return text, parsed
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._counters["requests"]
+        saved = self._counters["hits"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            # Share of requests answered without an upstream call of their own
+            "hit_rate": round(saved / requests, 4) if requests else None,
+            "cache": self.cache.stats(),
+        }
+
+_cache: Optional[LLMResponseCache] = None
+
+def get_llm_cache() -> LLMResponseCache:
+    """The process-wide cache at LLM_CACHE_PATH, opened on first use."""
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache.from_settings()
+    return _cache
+
+def close_llm_cache() -> None:
+    """Close the process-wide cache (called on shutdown); the next get_llm_cache reopens it."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+"""
+1. Keys:
+    . SHA-256 of canonical JSON (sorted keys) of model, prompt template name and version, params and input variables
+    . String inputs are normalized first (NFC, line endings, runs of spaces, blank lines), so a resume
+      re-uploaded from another editor still hits
+    . Rewording a prompt means bumping its PromptTemplate.version; old replies then simply miss and age out
+
+    Validation:
+    . generate(..., parse=...) stores a reply only once the caller's parse accepted it, so one malformed
+      answer fails one request instead of every identical request for LLM_CACHE_TTL
+    . A cached reply that parse rejects (stored before the check existed, or by an older parser) is deleted
+      and fetched again
+
+2. Storage:
+    . One SQLite file (LLM_CACHE_PATH) in WAL mode, shared by the uvicorn workers on a host
+    . Entries expire LLM_CACHE_TTL seconds after they were written (checked on read and before evicting)
+    . When the stored replies pass LLM_CACHE_MAX_BYTES, least recently used entries are dropped down to 90%
+    . Lookups and writes are best-effort: a cache failure is logged and the request goes upstream
+
+3. Single-flight:
+    . Identical requests that miss at the same time share one upstream call (per worker)
+    . The call is shielded, so a client disconnecting does not cancel the reply the others are waiting for
+
+4. Metrics:
+    . llm_cache_lookups_total{result=hit|miss|coalesced}: hit rate = (hit + coalesced) / all
+    . llm_request_duration_seconds{outcome=success|error|invalid} for upstream calls
+    . llm_cache_evictions_total{reason=ttl|size|invalid}
+    . GET /admin/cache/stats shows the same counters for the worker that answers
+"""
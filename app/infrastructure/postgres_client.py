@@ -0,0 +1,79 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncpg
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def insert_statement(table: str, columns: Dict[str, str]) -> str:
+    """
+    INSERT ... SELECT FROM unnest(...) RETURNING *, taking one array parameter per column.
+
+    The same statement inserts one row or thousands, so it is prepared once per connection.
+    """
+    names = ", ".join(columns)
+    arrays = ", ".join(f"${index}::{pg_type}[]" for index, pg_type in enumerate(columns.values(), start=1))
+    return f"INSERT INTO {table} ({names}) SELECT * FROM unnest({arrays}) RETURNING *"
+
+def column_arrays(columns: Iterable[str], rows: Sequence[Dict[str, Any]]) -> List[List[Any]]:
+    """Transpose row dicts into the per-column arrays insert_statement expects."""
+    return [[row.get(column) for row in rows] for column in columns]
+
+def update_statement(table: str, columns: Iterable[str]) -> Tuple[str, List[str]]:
+    """UPDATE ... SET every given column WHERE id = $1 RETURNING *, and the column order of the parameters."""
+    columns = [column for column in columns if column != "id"]
+    assignments = ", ".join(f"{column} = ${index}" for index, column in enumerate(columns, start=2))
+    return f"UPDATE {table} SET {assignments} WHERE id = $1 RETURNING *", columns
+
+class PostgresClient:
+    """Singleton asyncpg connection pool for the direct Postgres repository backend"""
+    _pool: Optional[asyncpg.Pool] = None
+
+    @classmethod
+    async def connect(cls) -> asyncpg.Pool:
+        """Open the connection pool (called from the FastAPI lifespan)"""
+        if cls._pool:
+            return cls._pool
+        try:
+            cls._pool = await asyncpg.create_pool(
+                dsn=settings.DATABASE_URL,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                command_timeout=settings.DATABASE_COMMAND_TIMEOUT,
+                statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE
+            )
+            return cls._pool
+        except Exception as e:
+            logger.error(f"Failed to connect to Postgres: {str(e)}")
+            raise
+
+    @classmethod
+    def get_pool(cls) -> asyncpg.Pool:
+        """Get the connected pool"""
+        if not cls._pool:
+            raise RuntimeError("Postgres pool is not connected. Call PostgresClient.connect() on startup.")
+        return cls._pool
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close every pooled connection."""
+        pool = cls._pool
+        cls._pool = None
+        if pool:
+            await pool.close()
+
+"""
+1. PostgresClient:
+    . Same singleton shape as SupabaseClient: connect on startup, get_pool per call, close on shutdown
+    . Only used when REPOSITORY_BACKEND is "postgres"; Supabase Auth calls still go through SupabaseClient
+
+2. Prepared statements:
+    . asyncpg prepares every query it runs and keeps it in a per-connection cache (DATABASE_STATEMENT_CACHE_SIZE),
+      so each statement is parsed and planned once per connection, on its first use
+    . Queries are module-level constants with $n parameters, so the cache sees the same few texts over and over
+    . Set DATABASE_STATEMENT_CACHE_SIZE=0 behind PgBouncer in transaction mode
+
+3. Rows:
+    . asyncpg uses the binary protocol: uuid, timestamptz and boolean columns arrive as UUID, datetime and bool
+    . Records are passed straight to the pydantic models, no JSON step in between
+"""
@@ -0,0 +1,442 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+from app.core.metrics import SUPABASE_BREAKER_STATE, SUPABASE_RESILIENCE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+# Upstream answers worth retrying an idempotent read for; anything else is the caller's problem
+RETRYABLE_STATUSES = frozenset((502, 503, 504, 520))
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while a service's circuit is open."""
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised when one attempt takes longer than its operation's timeout."""
+
+class RetriesExhausted(httpx.TransportError):
+    """
+    Raised instead of returning the last 5xx of an idempotent request once no retry is left.
+
+    postgrest-py retries GETs answered with 503/520 on its own, sleeping 1, 2
+    and 4 seconds outside any budget; raising keeps retries in this layer.
+    """
+
+class CircuitBreaker:
+    """
+    Fails calls fast while a service is unhealthy.
+
+    Outcomes are counted in one-second buckets over the last `window` seconds.
+    Once at least min_requests were seen and the share of failures reaches
+    error_rate, the circuit opens and every call is rejected for open_seconds.
+    It then lets half_open_probes calls through: a success closes it again,
+    a failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_rate: float,
+        min_requests: int,
+        window: float,
+        open_seconds: float,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._buckets: Deque[List[int]] = deque()  # [second, requests, failures]
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters = {"opened": 0, "rejected": 0}
+        self._gauge = SUPABASE_BREAKER_STATE.labels(service=name)
+        self._gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        if self._state == "open" and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition("half_open")
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. Every allowed call must end in record() or abandon()."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self._counters["rejected"] += 1
+        return False
+
+    def record(self, ok: bool) -> None:
+        if self._state == "half_open":
+            self._probes = max(0, self._probes - 1)
+            if ok:
+                self._buckets.clear()
+                self._transition("closed")
+            else:
+                self._open()
+            return
+        requests, failures = self._count(0 if ok else 1)
+        if self._state == "closed" and requests >= self.min_requests and failures / requests >= self.error_rate:
+            self._open()
+
+    def abandon(self) -> None:
+        """An allowed call was cancelled before it had an outcome (e.g. the losing half of a hedge)."""
+        if self._state == "half_open":
+            self._probes = max(0, self._probes - 1)
+
+    def _count(self, failure: int) -> Tuple[int, int]:
+        now = int(self._clock())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if self._buckets and self._buckets[-1][0] == now:
+            self._buckets[-1][1] += 1
+            self._buckets[-1][2] += failure
+        else:
+            self._buckets.append([now, 1, failure])
+        return sum(bucket[1] for bucket in self._buckets), sum(bucket[2] for bucket in self._buckets)
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._probes = 0
+        self._counters["opened"] += 1
+        self._transition("open")
+        logger.warning(f"Circuit for {self.name} opened; failing fast for {self.open_seconds}s")
+
+    def _transition(self, state: str) -> None:
+        if state != self._state and state == "closed":
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = state
+        self._gauge.set(BREAKER_STATES[state])
+
+    def stats(self) -> Dict[str, Any]:
+        cutoff = int(self._clock()) - self.window
+        buckets = [bucket for bucket in self._buckets if bucket[0] > cutoff]
+        requests = sum(bucket[1] for bucket in buckets)
+        failures = sum(bucket[2] for bucket in buckets)
+        return {
+            **self._counters,
+            "state": self.state,
+            "window_requests": requests,
+            "window_error_rate": round(failures / requests, 4) if requests else None,
+        }
+
+class RetryBudget:
+    """
+    Caps retries and hedges at a share of first attempts.
+
+    Every first attempt deposits `ratio` tokens, every extra attempt withdraws
+    one; the balance never exceeds `reserve`. Over time extra attempts stay
+    under ratio * requests (plus the reserve), so retries cannot multiply load
+    on a struggling upstream.
+    """
+
+    def __init__(self, ratio: float, reserve: float):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+        self._counters = {"granted": 0, "denied": 0}
+
+    def deposit(self) -> None:
+        self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self._counters["granted"] += 1
+            return True
+        self._counters["denied"] += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "tokens": round(self._tokens, 2), "ratio": self.ratio}
+
+class LatencyTracker:
+    """Recent latencies of successful point reads, for the hedging delay."""
+
+    def __init__(self, percentile: float, samples: int = 1000, min_samples: int = 50, refresh_every: int = 50):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.refresh_every = refresh_every
+        self._samples: Deque[float] = deque(maxlen=samples)
+        self._since_refresh = 0
+        self._value: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if len(self._samples) >= self.min_samples and (self._value is None or self._since_refresh >= self.refresh_every):
+            ordered = sorted(self._samples)
+            self._value = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
+            self._since_refresh = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        """The percentile over the recent samples, None until min_samples were seen."""
+        return self._value
+
+def classify(request: httpx.Request) -> Tuple[str, str]:
+    """(service, operation) of a Supabase request: rest/read, rest/write, auth/auth or other/other."""
+    path = request.url.path
+    if "/rest/v1/" in path:
+        return "rest", "read" if request.method in ("GET", "HEAD") else "write"
+    if "/auth/v1/" in path:
+        return "auth", "auth"
+    return "other", "other"
+
+def is_point_read(request: httpx.Request) -> bool:
+    """A PostgREST GET filtered by eq/in and not ordered: a lookup by key rather than a listing or scan."""
+    params = request.url.params
+    if "order" in params or "offset" in params:
+        return False
+    return any(value.startswith(("eq.", "in.")) for key, value in params.multi_items() if key not in ("select", "limit"))
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that puts timeouts, circuit breakers, retries and hedging
+    in front of another transport.
+
+    Every attempt gets the timeout of its operation (read, write, auth) and is
+    refused while its service's breaker is open. Idempotent requests (GET/HEAD)
+    that fail with a network error, a timeout or a 502/503/504 are retried
+    with jittered backoff, as far as the retry budget allows. With hedging on,
+    a point read that has not answered after the recent p95 latency is sent a
+    second time and the first answer wins.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        timeouts: Dict[str, float],
+        breaker_error_rate: float,
+        breaker_min_requests: int,
+        breaker_window: float,
+        breaker_open_seconds: float,
+        max_attempts: int,
+        retry_budget: RetryBudget,
+        retry_backoff: float = 0.05,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 0.005
+    ):
+        self.transport = transport
+        self.timeouts = timeouts
+        self.max_attempts = max_attempts
+        self.budget = retry_budget
+        self.retry_backoff = retry_backoff
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breakers = {
+            service: CircuitBreaker(
+                service, breaker_error_rate, breaker_min_requests, breaker_window, breaker_open_seconds
+            )
+            for service in ("rest", "auth", "other")
+        }
+        self.latency = LatencyTracker(hedge_percentile)
+        self._counters: Dict[str, int] = {
+            "requests": 0, "timeouts": 0, "retries": 0, "rejected": 0, "hedges": 0, "hedges_won": 0
+        }
+        self._events: Dict[Tuple[str, str], Any] = {}
+
+    @classmethod
+    def from_settings(cls, transport: httpx.AsyncBaseTransport) -> "ResilientTransport":
+        return cls(
+            transport,
+            timeouts=settings.SUPABASE_OPERATION_TIMEOUTS,
+            breaker_error_rate=settings.SUPABASE_BREAKER_ERROR_RATE,
+            breaker_min_requests=settings.SUPABASE_BREAKER_MIN_REQUESTS,
+            breaker_window=settings.SUPABASE_BREAKER_WINDOW,
+            breaker_open_seconds=settings.SUPABASE_BREAKER_OPEN_SECONDS,
+            max_attempts=settings.SUPABASE_RETRY_MAX_ATTEMPTS,
+            retry_budget=RetryBudget(settings.SUPABASE_RETRY_BUDGET_RATIO, settings.SUPABASE_RETRY_BUDGET_RESERVE),
+            retry_backoff=settings.SUPABASE_RETRY_BACKOFF,
+            hedge=settings.SUPABASE_HEDGE_ENABLED,
+            hedge_percentile=settings.SUPABASE_HEDGE_PERCENTILE,
+            hedge_min_delay=settings.SUPABASE_HEDGE_MIN_DELAY
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service, operation = classify(request)
+        breaker = self.breakers[service]
+        timeout = self.timeouts.get(operation)
+        idempotent = request.method in ("GET", "HEAD")
+        point_read = idempotent and service == "rest" and is_point_read(request)
+        self._counters["requests"] += 1
+        self.budget.deposit()
+
+        attempt = 1
+        while True:
+            retryable = idempotent and attempt < self.max_attempts
+            try:
+                if point_read and self.hedge and attempt == 1:
+                    response = await self._hedged(request, service, breaker, timeout)
+                else:
+                    response = await self._attempt(request, service, breaker, timeout, point_read)
+            except CircuitOpenError:
+                raise
+            except httpx.TransportError:
+                if not (retryable and self.budget.withdraw()):
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    return response
+                if not (retryable and self.budget.withdraw()):
+                    if idempotent:
+                        raise RetriesExhausted(
+                            f"Supabase {service} answered {response.status_code} after {attempt} attempts", request=request
+                        )
+                    return response
+            self._event(service, "retries")
+            await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** (attempt - 1)))
+            attempt += 1
+
+    async def _attempt(
+        self,
+        request: httpx.Request,
+        service: str,
+        breaker: CircuitBreaker,
+        timeout: Optional[float],
+        point_read: bool
+    ) -> httpx.Response:
+        if not breaker.allow():
+            self._event(service, "rejected")
+            raise CircuitOpenError(f"Circuit for Supabase {service} is open", request=request)
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self._send(request), timeout)
+        except asyncio.TimeoutError:
+            breaker.record(False)
+            self._event(service, "timeouts")
+            raise DeadlineExceeded(f"Supabase {service} request exceeded {timeout}s", request=request)
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record(False)
+            raise
+        ok = response.status_code < 500
+        breaker.record(ok)
+        if ok and point_read:
+            self.latency.observe(time.perf_counter() - started)
+        return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        # The body is read inside the attempt, so the timeout covers the whole response and not just its headers.
+        # It is kept as it came off the wire (still gzip- or br-encoded): the client decodes it once, as it would
+        # have without this transport, so Content-Encoding and Content-Length stay true.
+        response = await self.transport.handle_async_request(request)
+        try:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=httpx.ByteStream(raw),
+            extensions=response.extensions
+        )
+
+    async def _hedged(
+        self,
+        request: httpx.Request,
+        service: str,
+        breaker: CircuitBreaker,
+        timeout: Optional[float]
+    ) -> httpx.Response:
+        delay = self.latency.value
+        primary = asyncio.ensure_future(self._attempt(request, service, breaker, timeout, True))
+        if delay is None:
+            return await primary
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=max(delay, self.hedge_min_delay))
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self.budget.withdraw():
+            return await primary
+
+        self._event(service, "hedges")
+        hedge = asyncio.ensure_future(self._attempt(request, service, breaker, timeout, True))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Collect every finished attempt's error first, so none is left unretrieved
+                errors = {task: task.exception() for task in done}
+                for task, task_error in errors.items():
+                    if task_error is None:
+                        if task is hedge:
+                            self._event(service, "hedges_won")
+                        return task.result()
+                    error = error or task_error
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _event(self, service: str, event: str) -> None:
+        self._counters[event] += 1
+        child = self._events.get((service, event))
+        if child is None:
+            child = self._events[(service, event)] = SUPABASE_RESILIENCE_EVENTS.labels(service=service, event=event)
+        child.inc()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        hedge_delay = self.latency.value
+        return {
+            **self._counters,
+            "breakers": {service: breaker.stats() for service, breaker in self.breakers.items()},
+            "retry_budget": self.budget.stats(),
+            "hedging": self.hedge,
+            "hedge_delay_ms": round(max(hedge_delay, self.hedge_min_delay) * 1000, 2) if hedge_delay is not None else None,
+        }
+
+"""
+1. Where it sits:
+    . SupabaseClient builds the shared httpx client on a ResilientTransport wrapping the pooled HTTP transport
+    . Every PostgREST and Auth round trip of every repository passes through it, after the repositories' own
+      BatchLoader/SingleFlight coalescing, so a hedge is a real second request rather than a wait on the same future
+    . The asyncpg backend is not covered; it has DATABASE_COMMAND_TIMEOUT
+
+2. Timeouts:
+    . SUPABASE_OPERATION_TIMEOUTS per operation: read (PostgREST GET), write (other PostgREST methods), auth
+    . The timeout covers the whole response body; a timed-out attempt raises DeadlineExceeded (an httpx timeout)
+    . The body is buffered still content-encoded and decoded once by the client, so gzip answers pass through intact
+
+3. Circuit breakers (one each for rest and auth):
+    . Open once SUPABASE_BREAKER_MIN_REQUESTS were seen in SUPABASE_BREAKER_WINDOW seconds and the failure share
+      reaches SUPABASE_BREAKER_ERROR_RATE; failures are network errors, timeouts and 5xx answers
+    . While open, requests fail at once with CircuitOpenError; after SUPABASE_BREAKER_OPEN_SECONDS one probe is let through
+    . State is exported as supabase_breaker_state{service} (0 closed, 1 half open, 2 open)
+
+4. Retries and hedging, for idempotent reads only:
+    . GET/HEAD are retried on network errors, timeouts and 502/503/504/520, up to SUPABASE_RETRY_MAX_ATTEMPTS attempts
+    . When they give up on a 5xx they raise RetriesExhausted rather than return it, so postgrest-py's own
+      unbudgeted retry loop (1-4 s sleeps on 503/520) never runs on top
+    . Retries and hedges share a budget: SUPABASE_RETRY_BUDGET_RATIO extra attempts per request, at most
+      SUPABASE_RETRY_BUDGET_RESERVE banked, so a failing upstream sees little more than its normal load
+    . With SUPABASE_HEDGE_ENABLED, a point read (filtered by eq/in, not ordered) still unanswered after the recent
+      SUPABASE_HEDGE_PERCENTILE latency is sent again; the first answer wins and the other is cancelled
+
+5. Inspection:
+    . GET /admin/supabase/resilience, and supabase_resilience_events_total{service,event}
+"""
@@ -1,44 +1,145 @@
 import logging
-from supabase import Client, create_client
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 from app.core.config import settings
+from app.infrastructure.resilience import ResilientTransport
 
 logger = logging.getLogger(__name__)
 
+class RoundTripCounter:
+    """Counts the Supabase HTTP requests made while it is active."""
+    def __init__(self):
+        self.count = 0
+
+_round_trip_counter: ContextVar[Optional[RoundTripCounter]] = ContextVar("supabase_round_trips", default=None)
+
+@contextmanager
+def track_round_trips() -> Iterator[RoundTripCounter]:
+    """Count Supabase requests made by this task and the tasks it spawns."""
+    counter = RoundTripCounter()
+    token = _round_trip_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _round_trip_counter.reset(token)
+
+async def _count_round_trip(request: httpx.Request) -> None:
+    counter = _round_trip_counter.get()
+    if counter is not None:
+        counter.count += 1
+
 class SupabaseClient:
-    """Singleton class for supabase client"""
-    _instance: Client = None
-    
+    """Singleton class for the async supabase client"""
+    _instance: Optional[AsyncClient] = None
+    _http_client: Optional[httpx.AsyncClient] = None
+    _resilience: Optional[ResilientTransport] = None
+
     @classmethod
-    def get_instance(cls) -> Client:
-        """Create or get supabase client"""
+    async def connect(cls) -> AsyncClient:
+        """Open the pooled HTTP client and create the supabase client"""
+        if cls._instance:
+            return cls._instance
         try:
-            if not cls._instance:
-                cls._instance = create_client(
-                    supabase_url=settings.SUPABASE_URL,
-                    supabase_key=settings.SUPABASE_ANON_KEY
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+                http2=settings.SUPABASE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY
                 )
+            )
+            if settings.SUPABASE_RESILIENCE_ENABLED:
+                transport = cls._resilience = ResilientTransport.from_settings(transport)
+            cls._http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(
+                    settings.SUPABASE_READ_TIMEOUT,
+                    connect=settings.SUPABASE_CONNECT_TIMEOUT,
+                    pool=settings.SUPABASE_POOL_TIMEOUT
+                ),
+                event_hooks={"request": [_count_round_trip]}
+            )
+            cls._instance = await acreate_client(
+                supabase_url=settings.SUPABASE_URL,
+                supabase_key=settings.SUPABASE_ANON_KEY,
+                options=AsyncClientOptions(
+                    httpx_client=cls._http_client,
+                    auto_refresh_token=False,
+                    persist_session=False
+                )
+            )
             return cls._instance
         except Exception as e:
-            logger.error(f"Failed to initialize Redis client: {str(e)}")
+            logger.error(f"Failed to initialize Supabase client: {str(e)}")
+            await cls.close()
             raise
-    
+
+    @classmethod
+    def get_instance(cls) -> AsyncClient:
+        """Get the connected supabase client"""
+        if not cls._instance:
+            raise RuntimeError("Supabase client is not connected. Call SupabaseClient.connect() on startup.")
+        return cls._instance
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """Get the pooled HTTP client shared by all supabase sub-clients"""
+        if not cls._http_client:
+            raise RuntimeError("Supabase client is not connected. Call SupabaseClient.connect() on startup.")
+        return cls._http_client
+
+    @classmethod
+    def get_resilience(cls) -> Optional[ResilientTransport]:
+        """The timeout/breaker/retry layer under the HTTP client, None when SUPABASE_RESILIENCE_ENABLED is off"""
+        return cls._resilience
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close pooled connections and drop the client instance."""
+        http_client = cls._http_client
+        cls.clear_instance()
+        if http_client:
+            await http_client.aclose()
+
     @classmethod
     def clear_instance(cls) -> None:
         """Reset the client instance (useful for testing)."""
         cls._instance = None
-        
+        cls._http_client = None
+        cls._resilience = None
+
 """
 1. SupabaseClient Class:
     . Implements the Singleton pattern
-    . Ensures only one Supabase client instance exists
+    . Ensures only one async Supabase client exists per worker
     . Uses settings from our config
-    
+
 2. Methods:
-    . get_instance: Creates or returns existing client
-    . reset_instance: Useful for testing or reconnection
-    
-3. The @classmethod decorator is used here because:
+    . connect: Opens the HTTP pool and creates the client (called from the FastAPI lifespan)
+    . get_instance: Returns the connected client
+    . close: Closes pooled connections on shutdown
+    . clear_instance: Useful for testing or reconnection
+
+3. Connection pooling:
+    . A single httpx.AsyncClient is shared by the PostgREST and Auth sub-clients
+    . Connections are kept alive and reused, and HTTP/2 multiplexes requests over them
+    . Pool size and timeouts come from the SUPABASE_POOL_* and SUPABASE_*_TIMEOUT settings
+    . Every call is awaited, so a slow round trip never blocks the event loop
+
+4. Resilience:
+    . With SUPABASE_RESILIENCE_ENABLED the pooled transport is wrapped in a ResilientTransport (app/infrastructure/resilience.py)
+    . It adds per-operation timeouts, circuit breakers, budgeted retries of reads and optional hedged point reads
+
+5. Round-trip tracking:
+    . Every request on the shared pool passes through the _count_round_trip hook
+    . Inside a track_round_trips() block the hook counts requests for the current task (and tasks it spawns)
+    . Batched loader queries are counted once, for the request that started the batch
+
+6. The @classmethod decorator is used here because:
     . It allows us to call the method without creating an instance of the class (e.g., SupabaseClient.get_instance())
     . It has access to the class itself through the cls parameter, which is needed to maintain the singleton instance
     . It's more appropriate than @staticmethod because we need to access the class variable _instance
-"""
\ No newline at end of file
+"""
@@ -0,0 +1,325 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+# Ids are stored as fixed-width ASCII (a UUID string is 36 characters)
+ID_BYTES = 36
+# Rows kept free at the end of a snapshot, so appends after loading it do not reallocate straight away
+MIN_HEADROOM = 1024
+# Snapshot generations kept on disk; older ones are removed after a save
+KEEP_SNAPSHOTS = 2
+# Below this share of candidate rows, scoring gathers just the candidates instead of scoring every row
+GATHER_FRACTION = 0.25
+NO_VALUE = -1
+
+def _normalized(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(array))
+    if norm == 0.0:
+        raise ValueError("Cannot index a zero vector.")
+    return array / norm
+
+class VectorIndex:
+    """
+    Cosine top-k over a contiguous float32 matrix of unit vectors, with attribute pre-filters.
+
+    Rows are appended as entities arrive and updated in place. Deletes only
+    mark a row dead (tombstone); compact() drops dead rows once enough have
+    piled up. Snapshots are .npy files that load as copy-on-write memory maps,
+    so every worker maps the same pages and starts without reading the matrix.
+    """
+
+    def __init__(self, dimensions: int, attributes: Sequence[str], capacity: int = MIN_HEADROOM):
+        self.dimensions = dimensions
+        self.attributes = tuple(attributes)
+        self._vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        # One contiguous row of codes per attribute, so a filter scans memory sequentially
+        self._codes = np.full((len(self.attributes), capacity), NO_VALUE, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids = np.zeros(capacity, dtype=f"S{ID_BYTES}")
+        self._count = 0
+        self._dead = 0
+        # Attribute value -> small int code, per attribute; filters compare codes, never strings
+        self._vocab: List[Dict[str, int]] = [{} for _ in self.attributes]
+        # id -> row of every live row; only read or replaced under _lock
+        self._slots: Dict[str, int] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count - self._dead
+
+    @property
+    def dead_ratio(self) -> float:
+        return self._dead / self._count if self._count else 0.0
+
+    @staticmethod
+    def _build_slots(ids: np.ndarray, alive: np.ndarray) -> Dict[str, int]:
+        """The id -> row map of the live rows; O(rows), so callers run it off the event loop."""
+        rows = np.flatnonzero(alive)
+        return dict(zip(np.char.decode(ids[rows]).tolist(), rows.tolist()))
+
+    def _code(self, position: int, value: Optional[str]) -> int:
+        if value is None:
+            return NO_VALUE
+        vocab = self._vocab[position]
+        code = vocab.get(value)
+        if code is None:
+            code = vocab[value] = len(vocab)
+        return code
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = len(self._alive)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        codes = np.full((len(self.attributes), capacity), NO_VALUE, dtype=np.int32)
+        alive = np.zeros(capacity, dtype=bool)
+        ids = np.zeros(capacity, dtype=f"S{ID_BYTES}")
+        count = self._count
+        vectors[:count] = self._vectors[:count]
+        codes[:, :count] = self._codes[:, :count]
+        alive[:count] = self._alive[:count]
+        ids[:count] = self._ids[:count]
+        self._vectors, self._codes, self._alive, self._ids = vectors, codes, alive, ids
+
+    def upsert(self, id: str, vector: Sequence[float], attributes: Mapping[str, Optional[str]]) -> None:
+        """Add the entity's vector, or replace it (and its attributes) if id is indexed already."""
+        if len(id) > ID_BYTES:
+            raise ValueError(f"Ids are limited to {ID_BYTES} characters.")
+        vector = _normalized(vector)
+        if vector.shape[0] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions} dimensions, got {vector.shape[0]}.")
+        codes = [self._code(position, attributes.get(name)) for position, name in enumerate(self.attributes)]
+        with self._lock:
+            slots = self._slots
+            slot = slots.get(id)
+            if slot is None:
+                self._ensure_capacity(self._count + 1)
+                slot = slots[id] = self._count
+                self._ids[slot] = id.encode()
+                self._alive[slot] = True
+                self._count += 1
+            self._vectors[slot] = vector
+            self._codes[:, slot] = codes
+            self._version += 1
+
+    def delete(self, id: str) -> bool:
+        """Tombstone the entity's row; it stops matching at once and is dropped by the next compact()."""
+        with self._lock:
+            slot = self._slots.pop(id, None)
+            if slot is None:
+                return False
+            self._alive[slot] = False
+            self._dead += 1
+            self._version += 1
+            return True
+
+    def get(self, id: str) -> Optional[np.ndarray]:
+        """The indexed (unit) vector of id."""
+        with self._lock:
+            slot = self._slots.get(id)
+            return None if slot is None else np.array(self._vectors[slot])
+
+    def __contains__(self, id: str) -> bool:
+        with self._lock:
+            return id in self._slots
+
+    def _filter_mask(self, codes: np.ndarray, alive: np.ndarray, filters: Mapping[str, Iterable[str]]) -> Optional[np.ndarray]:
+        mask = alive.copy()
+        for name, values in filters.items():
+            position = self.attributes.index(name)
+            wanted = [self._vocab[position][value] for value in values if value in self._vocab[position]]
+            if not wanted:
+                return None
+            column = codes[position]
+            matches = column == wanted[0]
+            # A few equality passes beat np.isin's sort-based path for the short value lists filters use
+            for code in wanted[1:]:
+                matches |= column == code
+            mask &= matches
+        return mask
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        filters: Optional[Mapping[str, Iterable[str]]] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        The k live entities most similar to query (cosine), best first, as (id, score).
+
+        filters maps attribute names to accepted values (OR within an attribute,
+        AND across attributes) and is applied before scoring.
+        """
+        query = _normalized(query)
+        # Take one consistent set of arrays; a growth or compaction swapping them meanwhile does not affect this search
+        with self._lock:
+            count, vectors, codes, alive, ids = self._count, self._vectors, self._codes, self._alive, self._ids
+            excluded = self._slots.get(exclude) if exclude is not None else None
+        mask = self._filter_mask(codes[:, :count], alive[:count], filters or {})
+        if mask is None:
+            return []
+        if excluded is not None and excluded < count:
+            mask[excluded] = False
+        candidates = np.flatnonzero(mask)
+        if not len(candidates) or k <= 0:
+            return []
+
+        if len(candidates) < count * GATHER_FRACTION:
+            scores = vectors[candidates] @ query
+        else:
+            scores = (vectors[:count] @ query)[candidates]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[candidates[position]].decode(), float(scores[position])) for position in top]
+
+    def compact(self) -> bool:
+        """
+        Drop tombstoned rows. Safe to run on a thread while the event loop keeps reading and writing.
+
+        Returns False (and changes nothing) if a write landed while the
+        compacted copy was being built; the caller just tries again later.
+        """
+        version = self._version
+        count = self._count
+        keep = np.flatnonzero(self._alive[:count])
+        capacity = len(keep) + max(len(keep) // 4, MIN_HEADROOM)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        codes = np.full((len(self.attributes), capacity), NO_VALUE, dtype=np.int32)
+        alive = np.zeros(capacity, dtype=bool)
+        ids = np.zeros(capacity, dtype=f"S{ID_BYTES}")
+        vectors[:len(keep)] = self._vectors[keep]
+        codes[:, :len(keep)] = self._codes[:, keep]
+        alive[:len(keep)] = True
+        ids[:len(keep)] = self._ids[keep]
+        # Built here, on the compacting thread, so neither the swap nor the next write rebuilds it on the event loop
+        slots = self._build_slots(ids[:len(keep)], alive[:len(keep)])
+        with self._lock:
+            if version != self._version:
+                return False
+            self._vectors, self._codes, self._alive, self._ids = vectors, codes, alive, ids
+            self._count = len(keep)
+            self._dead = 0
+            self._slots = slots
+            self._version += 1
+        return True
+
+    def save(self, directory: str) -> str:
+        """Write a snapshot generation under directory and point CURRENT at it; returns its path."""
+        os.makedirs(directory, exist_ok=True)
+        # Saves from several processes take turns, so none prunes a generation another is writing
+        with open(os.path.join(directory, "LOCK"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            return self._save(directory)
+
+    def _save(self, directory: str) -> str:
+        with self._lock:
+            count = self._count
+            capacity = count + max(count // 4, MIN_HEADROOM)
+            path = os.path.join(directory, str(time.time_ns()))
+            os.makedirs(path)
+            for name, array, shape in (
+                ("vectors", self._vectors, (capacity, self.dimensions)),
+                ("codes", self._codes, (len(self.attributes), capacity)),
+                ("alive", self._alive, (capacity,)),
+                ("ids", self._ids, (capacity,)),
+            ):
+                mapped = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode="w+", dtype=array.dtype, shape=shape)
+                if name == "codes":
+                    mapped[:] = NO_VALUE
+                    mapped[:, :count] = array[:, :count]
+                else:
+                    mapped[:count] = array[:count]
+                mapped.flush()
+                del mapped
+            meta = {
+                "dimensions": self.dimensions,
+                "attributes": list(self.attributes),
+                "count": count,
+                "dead": self._dead,
+                "vocab": self._vocab,
+            }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        pointer = os.path.join(directory, "CURRENT")
+        with open(f"{pointer}.tmp", "w") as f:
+            f.write(os.path.basename(path))
+        os.replace(f"{pointer}.tmp", pointer)
+
+        generations = sorted(name for name in os.listdir(directory) if name.isdigit())
+        for name in generations[:-KEEP_SNAPSHOTS]:
+            if name == os.path.basename(path):
+                continue
+            # Workers still mapping an old generation keep their pages; unlinking only frees the names
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        return path
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["VectorIndex"]:
+        """The snapshot CURRENT points at, memory-mapped copy-on-write; None if there is none yet."""
+        try:
+            with open(os.path.join(directory, "CURRENT")) as f:
+                path = os.path.join(directory, f.read().strip())
+        except FileNotFoundError:
+            return None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        index = cls(meta["dimensions"], meta["attributes"], capacity=0)
+        # mmap_mode="c": pages are shared with every other process mapping the file until this one writes to them
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="c")
+        index._codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="c")
+        index._alive = np.load(os.path.join(path, "alive.npy"), mmap_mode="c")
+        index._ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="c")
+        index._count = meta["count"]
+        index._dead = meta["dead"]
+        index._vocab = meta["vocab"]
+        # Built by whoever loads (a thread at startup), never lazily on the event loop
+        index._slots = cls._build_slots(index._ids[:index._count], index._alive[:index._count])
+        return index
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "live": len(self),
+            "dead": self._dead,
+            "capacity": len(self._alive),
+            "dimensions": self.dimensions,
+            "memory_mapped": isinstance(self._vectors, np.memmap),
+        }
+
+"""
+1. Layout:
+    . vectors: (capacity, dimensions) float32, rows normalized on insert so cosine similarity is a dot product
+    . codes: (attributes, capacity) int32, each attribute value interned to a small int (-1 for None)
+    . alive: tombstone flags; ids: fixed-width ASCII ids
+    . Capacity doubles when full, so appends are amortized O(dimensions)
+
+2. Search:
+    . Pre-filter: alive & one equality pass per accepted value over each filtered attribute's codes
+    . Selective filters gather just the candidate rows; broad ones score all rows with one matrix-vector product
+    . Top-k with argpartition (O(n)), then only the k winners are sorted
+
+3. Deletes and compaction:
+    . delete() tombstones the row, so it is O(1) and the row stops matching immediately
+    . compact() builds the compacted arrays without holding the lock and swaps them in only if no write landed
+      meanwhile; run it on a thread when dead_ratio gets high
+
+4. Snapshots:
+    . Each save() writes a new generation directory of .npy files plus meta.json, then atomically repoints CURRENT
+    . save() holds an exclusive flock on directory/LOCK from writing to pruning, so concurrent writers take turns
+    . load() maps the files with mmap_mode="c": workers share the page cache, start without reading the matrix, and
+      their own later writes stay private to them
+    . Snapshots carry headroom rows so the first appends after loading do not copy the whole matrix
+    . load() builds the id -> row map while loading (on the thread that loads), compact() builds the new one on its
+      own thread before the swap; the map is only read or replaced under the lock, never rebuilt on the event loop
+"""
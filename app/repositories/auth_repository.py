@@ -1,86 +1,153 @@
+import asyncio
+from functools import partial
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 import logging
+from supabase import AsyncClient
 from app.infrastructure.supabase_client import SupabaseClient
-from app.repositories.base import BaseRepository
-from app.domain.auth.models import AuthMethod, UserInDB
+from app.repositories.base import BaseRepository, Page, encode_cursor, keyset_filter, rows_adapter
+from app.repositories.loader import BatchLoader
+from app.domain.auth.models import AuthMethod, UserInDB, UserRow
+from app.core.config import settings
 from app.core.exceptions import AppException
 
 logger = logging.getLogger(__name__)
 
+USER_ROWS = rows_adapter(UserRow)
+AUTH_METHOD_ROWS = rows_adapter(AuthMethod)
+
 class AuthRepository(BaseRepository[UserInDB]):
     """Repository for handling user authentication data."""
     
     def __init__(self):
-        self.client = SupabaseClient.get_instance()
         self.users_table = "users"
         self.auth_method_table = "auth_methods"
         self.social_accounts_table = "social_accounts"
+        self._loaders = {
+            column: BatchLoader(
+                partial(self._load_users_by, column),
+                window=settings.REPOSITORY_BATCH_WINDOW,
+                max_batch_size=settings.REPOSITORY_BATCH_MAX_SIZE
+            )
+            for column in ("id", "email", "phone")
+        }
+    
+    @property
+    def client(self) -> AsyncClient:
+        """The shared async supabase client, resolved once the app has started."""
+        return SupabaseClient.get_instance()
     
     async def create(self, user: UserInDB) -> UserInDB:
         """Create a new user in the database."""
         try:
-            data = user.model_dump()
-            result = self.client.table(self.users_table).insert(data).execute()
-            return UserInDB(**result.data[0])
+            data = user.model_dump(mode="json")
+            result = await self.client.table(self.users_table).insert(data).execute()
+            created = UserRow.model_validate(result.data[0])
         except Exception as e:
             logger.error(f"Failed to create user: {str(e)}")
             raise AppException("Failed to create user.")
+        self._notify_saved([created])
+        return created
+    
+    async def create_many(self, users: List[UserInDB]) -> List[UserInDB]:
+        """Create several users with a single array insert."""
+        if not users:
+            return []
+        try:
+            data = [user.model_dump(mode="json") for user in users]
+            result = await self.client.table(self.users_table).insert(data).execute()
+            created = USER_ROWS.validate_python(result.data)
+        except Exception as e:
+            logger.error(f"Failed to create users: {str(e)}")
+            raise AppException("Failed to create users.")
+        self._notify_saved(created)
+        return created
     
     async def get_by_id(self, id: UUID) -> Optional[UserInDB]:
         """Retrieve a user by their ID"""
         try:
-            result = self.client.table(self.users_table)\
-                .select('*')\
-                .eq('id', str(id))\
-                .execute()
-            return UserInDB(**result.data[0]) if result.data else None
+            return await self._loaders['id'].load(str(id))
         except Exception as e:
             logger.error(f"Failed to get user by ID: {str(e)}")
             raise AppException("Failed to get user by ID.")
     
+    async def _load_users_by(self, column: str, keys: List[str]) -> Dict[str, UserInDB]:
+        """Batch function behind the point-lookup loaders: one `in` query per batch."""
+        result = await self.client.table(self.users_table)\
+            .select('*')\
+            .in_(column, keys)\
+            .execute()
+        return {str(getattr(user, column)): user for user in USER_ROWS.validate_python(result.data)}
+    
+    def loader_stats(self) -> Dict[str, Any]:
+        """Batching counters of the point-lookup loaders."""
+        return {column: loader.stats() for column, loader in self._loaders.items()}
+    
     async def get_all(self) -> List[UserInDB]:
         """Retrieve all users"""
         try:
-            result = self.client.table(self.users_table).select('*').execute()
-            return [UserInDB(**user) for user in result.data]
+            result = await self.client.table(self.users_table).select('*').execute()
+            return USER_ROWS.validate_python(result.data)
         except Exception as e:
             logger.error(f"Failed to get all users: {str(e)}")
             raise AppException("Failed to get all users.")
     
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[UserInDB]:
+        """Retrieve one page of users in (created_at, id) order"""
+        try:
+            query = self.client.table(self.users_table)\
+                .select('*')\
+                .order('created_at')\
+                .order('id')\
+                .limit(limit)
+            if cursor:
+                query = query.or_(keyset_filter(cursor))
+            result = await query.execute()
+            
+            next_cursor = None
+            if len(result.data) == limit:
+                last = result.data[-1]
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+            return Page(items=USER_ROWS.validate_python(result.data), next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to get page of users: {str(e)}")
+            raise AppException("Failed to get page of users.")
+    
     async def update(self, id: UUID, user: UserInDB) -> Optional[UserInDB]:
         """Update an existing user"""
         try:
-            data = user.model_dump()
-            result = self.client.table(self.users_table)\
+            data = user.model_dump(mode="json")
+            result = await self.client.table(self.users_table)\
                 .update(data)\
                 .eq('id', str(id))\
                 .execute()
-            return UserInDB(**result.data[0]) if result.data else None
+            updated = UserRow.model_validate(result.data[0]) if result.data else None
         except Exception as e:
             logger.error(f"Failed to update user: {str(e)}")
             raise AppException("Failed to update user.")
+        if updated:
+            self._notify_saved([updated])
+        return updated
     
     async def delete(self, id: UUID) -> bool:
         """Delete an existing user by their ID"""
         try:
-            result = self.client.table(self.users_table)\
+            result = await self.client.table(self.users_table)\
                 .delete()\
                 .eq('id', str(id))\
                 .execute()
-            return bool(result.data)
+            deleted = bool(result.data)
         except Exception as e:
             logger.error(f"Failed to delete user: {str(e)}")
             raise AppException("Failed to delete user.")
+        if deleted:
+            self._notify_deleted(id)
+        return deleted
     
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         """Retrieve a user by their email"""
         try:
-            result = self.client.table(self.users_table)\
-                .select('*')\
-                .eq('email', email)\
-                .execute()
-            return UserInDB(**result.data[0]) if result.data else None
+            return await self._loaders['email'].load(email)
         except Exception as e:
             logger.error(f"Failed to get user by email: {str(e)}")
             raise AppException("Failed to get user by email.")
@@ -88,11 +155,7 @@ class AuthRepository(BaseRepository[UserInDB]):
     async def get_by_phone(self, phone: str) -> Optional[UserInDB]:
         """Retrieve a user by their phone number"""
         try:
-            result = self.client.table(self.users_table)\
-                .select('*')\
-                .eq('phone', phone)\
-                .execute()
-            return UserInDB(**result.data[0]) if result.data else None
+            return await self._loaders['phone'].load(phone)
         except Exception as e:
             logger.error(f"Failed to get user by phone: {str(e)}")
             raise AppException("Failed to get user by phone.")
@@ -100,21 +163,18 @@ class AuthRepository(BaseRepository[UserInDB]):
     async def get_by_social_id(self, provider: str, social_id: str) -> Optional[UserInDB]:
         """Retrieve a user by their social account"""
         try:
-            social_result = self.client.table(self.social_accounts_table)\
-                .select("user_id")\
+            # Embed the users row through the social_accounts.user_id foreign key: one round trip
+            result = await self.client.table(self.social_accounts_table)\
+                .select("user:users(*)")\
                 .eq("provider", provider)\
                 .eq("social_id", social_id)\
+                .limit(1)\
                 .execute()
             
-            if not social_result.data:
+            if not result.data or not result.data[0].get("user"):
                 return None
             
-            user_result = self.client.table(self.users_table)\
-                .select('*')\
-                .eq("id", social_result.data[0]["user_id"])\
-                .execute()
-            
-            return UserInDB(**user_result.data[0]) if user_result.data else None
+            return UserRow.model_validate(result.data[0]["user"])
         except Exception as e:
             logger.error(f"Failed to get user by social account: {str(e)}")
             raise AppException("Failed to get user by social account.")
@@ -122,25 +182,50 @@ class AuthRepository(BaseRepository[UserInDB]):
     async def create_auth_method(self, auth_method: AuthMethod) -> AuthMethod:
         """Create a new auth method for a user"""
         try:
-            data = auth_method.model_dump()
-            result = self.client.table(self.auth_method_table).insert(data).execute()
-            return AuthMethod(**result.data[0])
+            data = auth_method.model_dump(mode="json")
+            result = await self.client.table(self.auth_method_table).insert(data).execute()
+            return AuthMethod.model_validate(result.data[0])
         except Exception as e:
             logger.error(f"Failed to create auth method: {str(e)}")
             raise AppException("Failed to create auth method in DB.")
     
+    async def create_auth_methods(self, auth_methods: List[AuthMethod]) -> List[AuthMethod]:
+        """Create several auth methods with a single array insert"""
+        if not auth_methods:
+            return []
+        try:
+            data = [auth_method.model_dump(mode="json") for auth_method in auth_methods]
+            result = await self.client.table(self.auth_method_table).insert(data).execute()
+            return AUTH_METHOD_ROWS.validate_python(result.data)
+        except Exception as e:
+            logger.error(f"Failed to create auth methods: {str(e)}")
+            raise AppException("Failed to create auth methods in DB.")
+    
     async def get_auth_methods(self, user_id: UUID) -> List[AuthMethod]:
         """Retrieve all authentication methods for a user"""
         try:
-            result = self.client.table(self.auth_method_table)\
+            result = await self.client.table(self.auth_method_table)\
                 .select('*')\
                 .eq('user_id', str(user_id))\
                 .execute()
-            return [AuthMethod(**auth_method) for auth_method in result.data]
+            return AUTH_METHOD_ROWS.validate_python(result.data)
         except Exception as e:
             logger.error(f"Failed to get auth methods: {str(e)}")
             raise AppException("Failed to get auth methods.")
     
+    async def update_password_hash(self, auth_method_id: UUID, password_hash: str, previous_hash: str) -> bool:
+        """Replace an auth method's password hash, unless it changed since previous_hash was read"""
+        try:
+            result = await self.client.table(self.auth_method_table)\
+                .update({"password_hash": password_hash})\
+                .eq("id", str(auth_method_id))\
+                .eq("password_hash", previous_hash)\
+                .execute()
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Failed to update password hash: {str(e)}")
+            raise AppException("Failed to update password hash.")
+    
     async def link_social_accounts(self, user_id: UUID, provider: str, social_id: str, email: Optional[str] = None) -> None:
         """Link a social account to a user"""
         try:
@@ -151,40 +236,45 @@ class AuthRepository(BaseRepository[UserInDB]):
                 "email": email
             }
             
-            self.client.table(self.social_accounts_table).insert(social_data).execute()
+            await self.client.table(self.social_accounts_table).insert(social_data).execute()
         except Exception as e:
             logger.error(f"Failed to link social account: {str(e)}")
             raise AppException("Failed to link social account.")
     
-    async def verify_password(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+    async def verify_password(self, email: str, password: str) -> Optional[UserInDB]:
         """Verify user password using Supabase Auth."""
         try:
-            response = self.client.auth.sign_in_with_password({
-                "email": email,
-                "password": password
-            })
+            # Fetch the profile alongside the sign-in so the login costs one round trip of latency
+            response, user = await asyncio.gather(
+                self.client.auth.sign_in_with_password({
+                    "email": email,
+                    "password": password
+                }),
+                self.get_by_email(email)
+            )
             
             if not response.user:
                 return None
             
-            user = await self.get_by_email(email)
             return user
         except Exception as e:
             logger.error(f"Failed to verify password: {str(e)}")
             raise AppException("Failed to verify password.")
     
-    async def verify_otp(self, phone: str, otp: str) -> Optional[Dict[str, Any]]:
+    async def verify_otp(self, phone: str, otp: str) -> Optional[UserInDB]:
         """Verify OTP for phone login using Supabase Auth."""
         try:
-            response = self.client.auth.verify_otp({
-                "phone": phone,
-                "token": otp
-            })
+            response, user = await asyncio.gather(
+                self.client.auth.verify_otp({
+                    "phone": phone,
+                    "token": otp
+                }),
+                self.get_by_phone(phone)
+            )
             
             if not response.user:
                 return None
             
-            user = await self.get_by_phone(phone)
             return user
         except Exception as e:
             logger.error(f"Failed to verify OTP: {str(e)}")
@@ -193,41 +283,74 @@ class AuthRepository(BaseRepository[UserInDB]):
     async def send_otp(self, phone: str) -> None:
         """Send OTP using Supabase Auth."""
         try:
-            self.client.auth.sign_in_with_otp({
+            await self.client.auth.sign_in_with_otp({
                 "phone": phone
             })
         except Exception as e:
             logger.error(f"Failed to send OTP: {str(e)}")
-            raise AppException("Failed to send OTP.")
+            raise AppException("Failed to send OTP.", _auth_error_status(e))
     
     async def reset_password(self, email: str) -> None:
         """Send password reset email using Supabase Auth."""
         try:
-            self.client.auth.reset_password_for_email(email)
+            await self.client.auth.reset_password_for_email(email)
         except Exception as e:
             logger.error(f"Failed to send password reset email: {str(e)}")
-            raise AppException("Failed to send password reset email.")
+            raise AppException("Failed to send password reset email.", _auth_error_status(e))
+    
+    async def resend_verification_email(self, email: str) -> None:
+        """Resend the signup confirmation email using Supabase Auth."""
+        try:
+            await self.client.auth.resend({"type": "signup", "email": email})
+        except Exception as e:
+            logger.error(f"Failed to resend verification email: {str(e)}")
+            raise AppException("Failed to resend verification email.", _auth_error_status(e))
+
+def _auth_error_status(error: Exception) -> int:
+    """
+    The status for an AppException wrapping a Supabase Auth error: its own when Auth
+    rejected the request (4xx: invalid phone, rate-limited send), else 500.
+
+    The job queue does not retry 4xx failures, since the same request would be rejected again.
+    """
+    status = getattr(error, "status", None)
+    return status if isinstance(status, int) and 400 <= status < 500 else 500
     
 """
 1. Class Structure:
     . Implements BaseRepository with UserInDB type
-    . Uses Supabase client for database operations
+    . Uses the async Supabase client for database operations
     . Manages both users and auth_methods tables
     
 2. Core Methods (inherited from BaseRepository):
     . create: Creates new user
     . get_by_id: Gets user by UUID
     . get_all: Lists all users
+    . get_page / iter_all: Keyset-paginated listing for exports
     . update: Updates user info
     . delete: Removes user
     
 3. Auth-Specific Methods:
+    . create_many: Creates a batch of users in one insert
     . get_by_email: Finds user by email
     . get_by_phone: Finds user by phone
     . create_auth_method: Adds auth method
+    . create_auth_methods: Adds a batch of auth methods in one insert
     . get_auth_methods: Lists user's auth methods
+    . update_password_hash: Swaps a stored hash for one at the current bcrypt cost (compare-and-set on the old hash)
+    . send_otp / reset_password / resend_verification_email: Supabase Auth dispatch, run as background jobs by AuthService;
+      a 4xx rejection from Auth keeps its status on the AppException, which tells the job queue not to retry
+    
+4. Point lookups:
+    . get_by_id, get_by_email and get_by_phone go through a BatchLoader per column
+    . Concurrent lookups are coalesced into one `in` query per event-loop tick
+    
+5. Login paths:
+    . verify_password / verify_otp run the Supabase Auth check and the profile query concurrently
+    . get_by_social_id embeds the users row in the social_accounts query
+    . Each login therefore waits on a single round trip of latency
     
-4. The BaseRepository class defines the common CRUD operations that all repositories should implement.
+6. The BaseRepository class defines the common CRUD operations that all repositories should implement.
    The auth-specific methods like get_by_email, get_by_phone, etc., are specific to the AuthRepository 
    and don't belong in the base class.
    This follows the Interface Segregation Principle - we don't want to force all repositories to implement methods 
@@ -1,12 +1,64 @@
+import base64
+import json
+import logging
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, TypeVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Generic, List, Optional, Protocol, Tuple, Type, TypeVar
 from uuid import UUID
+from pydantic import BaseModel, TypeAdapter
+from app.core.metrics import instrument_repository_methods
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Max values per PostgREST `in` filter, keeps the query string well under URL limits
+IN_FILTER_CHUNK_SIZE = 200
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(created_at: Any, id: Any) -> str:
+    """Encode the (created_at, id) key of the last row of a page as an opaque cursor."""
+    raw = json.dumps([str(created_at), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor."""
+    created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return created_at, id
+
+def keyset_filter(cursor: str) -> str:
+    """PostgREST `or` filter selecting rows strictly after the cursor in (created_at, id) order."""
+    created_at, id = decode_cursor(cursor)
+    return f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{id})'
+
+@lru_cache(maxsize=None)
+def rows_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter validating a list of rows into `model` in one core call, built once per model."""
+    return TypeAdapter(List[model])
+
+class RepositoryListener(Protocol[T]):
+    """Told about writes once they have succeeded; must return quickly and never block."""
+
+    def saved(self, entities: List[T]) -> None:
+        """Entities were created or updated (as stored)."""
+
+    def deleted(self, id: UUID) -> None:
+        """The entity with this id was deleted."""
+
 class BaseRepository(Generic[T], ABC):
     """Base repository interface for common operations."""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every concrete repository method reports its latency to /metrics
+        instrument_repository_methods(cls)
+    
     @abstractmethod
     async def create(self, entity: T) -> T:
         """Create an entity in the database."""
@@ -22,6 +74,22 @@ class BaseRepository(Generic[T], ABC):
         """Retrieve all entities"""
         pass
     
+    @abstractmethod
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[T]:
+        """Retrieve up to `limit` entities ordered by (created_at, id), starting after `cursor`."""
+        pass
+    
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[T]:
+        """Yield every entity, fetching one page at a time so memory stays constant."""
+        cursor = None
+        while True:
+            page = await self.get_page(batch_size, cursor)
+            for entity in page.items:
+                yield entity
+            if not page.next_cursor:
+                return
+            cursor = page.next_cursor
+    
     @abstractmethod
     async def update(self, id: UUID, entity: T) -> Optional[T]:
         """Update an existing entity"""
@@ -31,6 +99,26 @@ class BaseRepository(Generic[T], ABC):
     async def delete(self, id: UUID) -> bool:
         """Delete an existing entity by ID"""
         pass
+    
+    def add_listener(self, listener: RepositoryListener[T]) -> None:
+        """Register a listener for this repository's successful writes."""
+        if "_listeners" not in self.__dict__:
+            self._listeners: List[RepositoryListener[T]] = []
+        self._listeners.append(listener)
+    
+    def _notify_saved(self, entities: List[T]) -> None:
+        for listener in self.__dict__.get("_listeners", ()):
+            try:
+                listener.saved(entities)
+            except Exception as e:
+                logger.error(f"Repository listener failed: {str(e)}")
+    
+    def _notify_deleted(self, id: UUID) -> None:
+        for listener in self.__dict__.get("_listeners", ()):
+            try:
+                listener.deleted(id)
+            except Exception as e:
+                logger.error(f"Repository listener failed: {str(e)}")
         
     
 """
@@ -47,6 +135,20 @@ class BaseRepository(Generic[T], ABC):
     . create: Create new entities
     . get_by_id: Retrieve by UUID
     . get_all: List all entities
+    . get_page: Keyset pagination on (created_at, id); the cursor encodes the last row's key
+    . iter_all: Async generator over every entity, one page in memory at a time
     . update: Modify existing entities
     . delete: Remove entities
-"""
\ No newline at end of file
+
+4. Metrics:
+    . __init_subclass__ wraps the public async methods of each repository subclass
+    . Their latency lands in repository_call_duration_seconds{repository, method, outcome}
+
+5. rows_adapter:
+    . Cached TypeAdapter(List[Model]) so a result set is validated in one pydantic-core call
+    . Built lazily and once per model; building an adapter costs far more than using it
+
+6. Listeners:
+    . add_listener subscribes to successful create/update/delete calls (e.g. to keep search indexes current)
+    . Listeners run inline after the write, so they only record or schedule work; their errors are logged, never raised
+"""
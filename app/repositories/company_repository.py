@@ -1,39 +1,248 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import logging
+from supabase import AsyncClient
 from app.domain.company.models import Company
 from app.infrastructure.supabase_client import SupabaseClient
-from app.repositories.base import BaseRepository
+from app.repositories.base import IN_FILTER_CHUNK_SIZE, BaseRepository, Page, encode_cursor, keyset_filter, rows_adapter
+from app.repositories.loader import BatchLoader
+from app.core.config import settings
 from app.core.exceptions import AppException
+from app.utils.cache import MISSING, SingleFlight, TTLCache
 
 logger = logging.getLogger(__name__)
 
+COMPANY_ROWS = rows_adapter(Company)
+
 class CompanyRepository(BaseRepository[Company]):
+    # Shared by every instance so all services in the worker see the same cache
+    _by_name: TTLCache[str, Company] = TTLCache(
+        settings.COMPANY_CACHE_SIZE, settings.COMPANY_CACHE_TTL, settings.COMPANY_CACHE_NEGATIVE_TTL
+    )
+    _by_id: TTLCache[str, Company] = TTLCache(
+        settings.COMPANY_CACHE_SIZE, settings.COMPANY_CACHE_TTL, settings.COMPANY_CACHE_NEGATIVE_TTL
+    )
+    _flights = SingleFlight()
+    
     def __init__(self):
-        self.client = SupabaseClient.get_instance()
         self.table = "companies"
-        
+        self._id_loader = BatchLoader(
+            self._load_by_ids,
+            window=settings.REPOSITORY_BATCH_WINDOW,
+            max_batch_size=settings.REPOSITORY_BATCH_MAX_SIZE
+        )
+    
+    @property
+    def client(self) -> AsyncClient:
+        """The shared async supabase client, resolved once the app has started."""
+        return SupabaseClient.get_instance()
+    
+    @classmethod
+    def _remember(cls, company: Company) -> None:
+        cls._by_name.set(company.company_name, company)
+        cls._by_id.set(str(company.id), company)
+    
+    @classmethod
+    def _forget(cls, company_id: UUID) -> None:
+        cached = cls._by_id.peek(str(company_id))
+        if cached is not MISSING and cached:
+            cls._by_name.invalidate(cached.company_name)
+        cls._by_id.invalidate(str(company_id))
+    
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the company caches."""
+        return {
+            "by_name": cls._by_name.stats(),
+            "by_id": cls._by_id.stats(),
+            "single_flight": cls._flights.stats(),
+        }
+    
     async def create(self, company: Company) -> Company:
+        created = await self._insert(company)
+        self._remember(created)
+        return created
+    
+    async def create_many(self, companies: List[Company]) -> List[Company]:
+        """Create several companies with a single array insert"""
+        created = await self._insert_many(companies)
+        for company in created:
+            self._remember(company)
+        return created
+    
+    async def get_or_create(self, company: Company) -> Company:
+        """
+        Return the company with this name, creating it if it does not exist yet.
+        
+        Concurrent calls for the same name share a single lookup and a single insert.
+        """
+        async def get_or_create() -> Company:
+            existing = await self.get_by_name(company.company_name)
+            return existing or await self.create(company)
+        
+        return await self._flights.do(("get_or_create", company.company_name), get_or_create)
+    
+    async def get_by_name(self, company_name: str) -> Optional[Company]:
+        cached = self._by_name.get(company_name)
+        if cached is not MISSING:
+            return cached
+        
+        async def fetch() -> Optional[Company]:
+            company = await self._fetch_by_name(company_name)
+            if company:
+                self._remember(company)
+            else:
+                self._by_name.set(company_name, None)
+            return company
+        
+        return await self._flights.do(("name", company_name), fetch)
+    
+    async def get_by_names(self, company_names: List[str]) -> Dict[str, Company]:
+        """Retrieve companies by name, serving what it can from cache"""
+        companies = {}
+        missing = []
+        for company_name in dict.fromkeys(company_names):
+            cached = self._by_name.get(company_name)
+            if cached is MISSING:
+                missing.append(company_name)
+            elif cached:
+                companies[company_name] = cached
+        
+        fetched = await self._fetch_by_names(missing) if missing else {}
+        for company_name in missing:
+            company = fetched.get(company_name)
+            if company:
+                self._remember(company)
+                companies[company_name] = company
+            else:
+                self._by_name.set(company_name, None)
+        return companies
+    
+    async def get_by_id(self, company_id: UUID) -> Optional[Company]:
+        cached = self._by_id.get(str(company_id))
+        if cached is not MISSING:
+            return cached
+        
+        async def fetch() -> Optional[Company]:
+            company = await self._fetch_by_id(company_id)
+            if company:
+                self._remember(company)
+            else:
+                self._by_id.set(str(company_id), None)
+            return company
+        
+        return await self._flights.do(("id", str(company_id)), fetch)
+    
+    async def _insert(self, company: Company) -> Company:
         try:
-            data = company.model_dump()
-            result = self.client.table(self.table).insert(data).execute()
-            return Company(**result.data[0])
+            data = company.model_dump(mode="json")
+            result = await self.client.table(self.table).insert(data).execute()
+            return Company.model_validate(result.data[0])
         except Exception as e:
             logger.error(f"Failed to create company: {str(e)}")
             raise AppException("Failed to create company in DB.")
     
-    async def get_by_name(self, company_name: str) -> Optional[Company]:
+    async def _insert_many(self, companies: List[Company]) -> List[Company]:
+        if not companies:
+            return []
         try:
-            result = self.client.table(self.table).select('*').eq('company_name', company_name).execute()
-            return Company(**result.data[0]) if result.data else None
+            data = [company.model_dump(mode="json") for company in companies]
+            result = await self.client.table(self.table).insert(data).execute()
+            return COMPANY_ROWS.validate_python(result.data)
+        except Exception as e:
+            logger.error(f"Failed to create companies: {str(e)}")
+            raise AppException("Failed to create companies in DB.")
+    
+    async def _fetch_by_name(self, company_name: str) -> Optional[Company]:
+        try:
+            result = await self.client.table(self.table).select('*').eq('company_name', company_name).execute()
+            return Company.model_validate(result.data[0]) if result.data else None
         except Exception as e:
             logger.error(f"Failed to get company by name: {str(e)}")
             raise AppException("Failed to get company by name.")
     
-    async def get_by_id(self, company_id: UUID) -> Optional[Company]:
+    async def _fetch_by_names(self, company_names: List[str]) -> Dict[str, Company]:
+        """One `in` query per chunk of names"""
+        companies = {}
+        try:
+            for start in range(0, len(company_names), IN_FILTER_CHUNK_SIZE):
+                chunk = company_names[start:start + IN_FILTER_CHUNK_SIZE]
+                result = await self.client.table(self.table).select('*').in_('company_name', chunk).execute()
+                for company in COMPANY_ROWS.validate_python(result.data):
+                    companies.setdefault(company.company_name, company)
+            return companies
+        except Exception as e:
+            logger.error(f"Failed to get companies by name: {str(e)}")
+            raise AppException("Failed to get companies by name.")
+    
+    async def _fetch_by_id(self, company_id: UUID) -> Optional[Company]:
         try:
-            result = self.client.table(self.table).select('*').eq('id', str(company_id)).execute()
-            return Company(**result.data[0]) if result.data else None
+            return await self._id_loader.load(str(company_id))
         except Exception as e:
             logger.error(f"Failed to get company by id: {str(e)}")
-            raise AppException("Failed to get company by id.")
\ No newline at end of file
+            raise AppException("Failed to get company by id.")
+    
+    async def _load_by_ids(self, company_ids: List[str]) -> Dict[str, Company]:
+        """Batch function behind the id loader: one `in` query per batch"""
+        result = await self.client.table(self.table).select('*').in_('id', company_ids).execute()
+        return {str(company.id): company for company in COMPANY_ROWS.validate_python(result.data)}
+    
+    async def get_all(self) -> List[Company]:
+        try:
+            result = await self.client.table(self.table).select('*').execute()
+            return COMPANY_ROWS.validate_python(result.data)
+        except Exception as e:
+            logger.error(f"Failed to get all companies: {str(e)}")
+            raise AppException("Failed to get all companies.")
+    
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[Company]:
+        try:
+            query = self.client.table(self.table).select('*').order('created_at').order('id').limit(limit)
+            if cursor:
+                query = query.or_(keyset_filter(cursor))
+            result = await query.execute()
+            
+            next_cursor = None
+            if len(result.data) == limit:
+                last = result.data[-1]
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+            return Page(items=COMPANY_ROWS.validate_python(result.data), next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to get page of companies: {str(e)}")
+            raise AppException("Failed to get page of companies.")
+    
+    async def update(self, company_id: UUID, company: Company) -> Optional[Company]:
+        try:
+            data = company.model_dump(mode="json")
+            result = await self.client.table(self.table).update(data).eq('id', str(company_id)).execute()
+            self._forget(company_id)
+            self._by_name.invalidate(company.company_name)
+            return Company.model_validate(result.data[0]) if result.data else None
+        except Exception as e:
+            logger.error(f"Failed to update company: {str(e)}")
+            raise AppException("Failed to update company.")
+    
+    async def delete(self, company_id: UUID) -> bool:
+        try:
+            result = await self.client.table(self.table).delete().eq('id', str(company_id)).execute()
+            self._forget(company_id)
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Failed to delete company: {str(e)}")
+            raise AppException("Failed to delete company.")
+
+"""
+1. Caching:
+    . get_by_name and get_by_id are read-through: a miss queries PostgREST and fills the cache
+    . Entries are LRU-evicted beyond COMPANY_CACHE_SIZE and expire after COMPANY_CACHE_TTL
+    . Unknown names/ids are cached as negative entries for the shorter COMPANY_CACHE_NEGATIVE_TTL
+    . create/create_many overwrite the entries (including negative ones); update/delete invalidate them
+
+2. Single flight:
+    . Concurrent misses for the same key share one query
+    . get_or_create lets concurrent registrations for an unseen company do exactly one lookup and one insert
+    . This only coordinates callers inside one worker; the database must still enforce unique company names
+
+3. The underscored _insert/_fetch_* methods are the uncached storage calls;
+   _fetch_by_id goes through a BatchLoader so concurrent misses share one `in` query
+"""
@@ -0,0 +1,30 @@
+from app.core.config import settings
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.company_repository import CompanyRepository
+
+def uses_postgres() -> bool:
+    """True when repositories talk to Postgres directly instead of through PostgREST."""
+    return settings.REPOSITORY_BACKEND == "postgres"
+
+def create_auth_repository() -> AuthRepository:
+    """AuthRepository for the configured REPOSITORY_BACKEND"""
+    if uses_postgres():
+        from app.repositories.postgres_auth_repository import PostgresAuthRepository
+        return PostgresAuthRepository()
+    return AuthRepository()
+
+def create_company_repository() -> CompanyRepository:
+    """CompanyRepository for the configured REPOSITORY_BACKEND"""
+    if uses_postgres():
+        from app.repositories.postgres_company_repository import PostgresCompanyRepository
+        return PostgresCompanyRepository()
+    return CompanyRepository()
+
+"""
+1. REPOSITORY_BACKEND:
+    . "postgrest" (default): tables are reached through the Supabase REST API
+    . "postgres": tables are reached directly through the asyncpg pool at DATABASE_URL
+    . Supabase Auth is used for sign-in and OTP in both cases
+
+2. The Postgres modules are imported lazily so asyncpg is only loaded when that backend is selected
+"""
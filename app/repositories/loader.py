@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class BatchLoader(Generic[K, V]):
+    """
+    Coalesces point lookups into batched queries, DataLoader style.
+
+    Keys requested within the same event-loop tick (or within `window` seconds)
+    are handed to batch_fn together, which must return a dict of the keys it found.
+    Concurrent requests for a key that is already pending or in flight share its result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        window: float = 0.0,
+        max_batch_size: int = 100
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._queue: List[K] = []
+        self._handle: Optional[asyncio.Handle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._counters = {"loads": 0, "deduplicated": 0, "batches": 0, "keys": 0}
+
+    async def load(self, key: K) -> Optional[V]:
+        """Return the value for key, or None if batch_fn did not find it."""
+        self._counters["loads"] += 1
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if len(self._queue) >= self.max_batch_size:
+                self._dispatch()
+            elif self._handle is None:
+                self._handle = loop.call_later(self.window, self._dispatch) if self.window else loop.call_soon(self._dispatch)
+        else:
+            self._counters["deduplicated"] += 1
+        # Shielded so one cancelled caller does not cancel the lookup for everyone sharing it
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        keys, self._queue = self._queue, []
+        if not keys:
+            return
+        task = asyncio.ensure_future(self._run(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: List[K]) -> None:
+        self._counters["batches"] += 1
+        self._counters["keys"] += len(keys)
+        error: Optional[Exception] = None
+        try:
+            results = await self.batch_fn(keys)
+            for key in keys:
+                value = results.get(key)
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_result(value)
+        except Exception as e:
+            error = e
+        finally:
+            # Whatever ended the batch (an error, a malformed result, cancellation), no waiter is left hanging
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is None or future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._counters["batches"]
+        return {
+            **self._counters,
+            "pending": len(self._futures),
+            "mean_batch_size": round(self._counters["keys"] / batches, 2) if batches else 0.0,
+        }
+
+"""
+1. Why:
+    . Every point lookup used to be its own PostgREST round trip
+    . Under load, dozens of different keys for the same table arrive within a millisecond
+    . BatchLoader turns those into a single `in` query and fans the rows back out
+
+2. Flow:
+    . load() registers a future per key and schedules a dispatch on the next loop tick (or after window)
+    . Hitting max_batch_size dispatches immediately; a batch size of 1 disables batching
+    . batch_fn runs once per batch; missing keys resolve to None, errors propagate to every waiter
+    . If the batch task is cancelled (e.g. on shutdown), its waiters are cancelled and their keys released, so a
+      later load() for the same key starts a fresh lookup instead of awaiting a future nobody will resolve
+"""
@@ -0,0 +1,234 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+import logging
+import asyncpg
+from app.infrastructure.postgres_client import (
+    PostgresClient,
+    column_arrays,
+    insert_statement,
+    update_statement
+)
+from app.repositories.auth_repository import AUTH_METHOD_ROWS, USER_ROWS, AuthRepository
+from app.repositories.base import Page, decode_cursor, encode_cursor
+from app.domain.auth.models import AuthMethod, UserInDB, UserRow
+from app.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+USER_COLUMNS = {
+    "id": "uuid",
+    "email": "text",
+    "phone": "text",
+    "first_name": "text",
+    "last_name": "text",
+    "country": "text",
+    "user_type": "text",
+    "is_active": "boolean",
+    "is_verified": "boolean",
+    "work_status": "text",
+    "company_id": "uuid",
+    "created_at": "timestamptz",
+    "updated_at": "timestamptz",
+}
+
+AUTH_METHOD_COLUMNS = {
+    "id": "uuid",
+    "user_id": "uuid",
+    "auth_type": "text",
+    "auth_provider": "text",
+    "auth_id": "text",
+    "is_primary": "boolean",
+    "created_at": "timestamptz",
+    "last_used": "timestamptz",
+    "password_hash": "text",
+    "email_verification_token": "text",
+    "phone_otp": "text",
+}
+
+INSERT_USERS = insert_statement("users", USER_COLUMNS)
+INSERT_AUTH_METHODS = insert_statement("auth_methods", AUTH_METHOD_COLUMNS)
+UPDATE_USER, UPDATE_USER_COLUMNS = update_statement("users", USER_COLUMNS)
+SELECT_USERS_BY = {
+    column: f"SELECT * FROM users WHERE {column} = ANY($1::{USER_COLUMNS[column]}[])"
+    for column in ("id", "email", "phone")
+}
+SELECT_USER_BY_SOCIAL_ID = (
+    "SELECT users.* FROM social_accounts JOIN users ON users.id = social_accounts.user_id "
+    "WHERE social_accounts.provider = $1 AND social_accounts.social_id = $2 LIMIT 1"
+)
+UPDATE_PASSWORD_HASH = (
+    "UPDATE auth_methods SET password_hash = $1 WHERE id = $2 AND password_hash = $3 RETURNING id"
+)
+SELECT_USERS_PAGE = "SELECT * FROM users ORDER BY created_at, id LIMIT $1"
+SELECT_USERS_PAGE_AFTER = "SELECT * FROM users WHERE (created_at, id) > ($1, $2) ORDER BY created_at, id LIMIT $3"
+
+class PostgresAuthRepository(AuthRepository):
+    """
+    AuthRepository whose table operations talk to Postgres directly through asyncpg.
+
+    Supabase Auth calls (verify_password, verify_otp, send_otp, reset_password, resend_verification_email) are inherited unchanged.
+    """
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        return PostgresClient.get_pool()
+
+    async def create(self, user: UserInDB) -> UserInDB:
+        """Create a new user in the database."""
+        try:
+            created = (await self._insert_users([user]))[0]
+        except Exception as e:
+            logger.error(f"Failed to create user: {str(e)}")
+            raise AppException("Failed to create user.")
+        self._notify_saved([created])
+        return created
+
+    async def create_many(self, users: List[UserInDB]) -> List[UserInDB]:
+        """Create several users with a single unnest insert."""
+        if not users:
+            return []
+        try:
+            created = await self._insert_users(users)
+        except Exception as e:
+            logger.error(f"Failed to create users: {str(e)}")
+            raise AppException("Failed to create users.")
+        self._notify_saved(created)
+        return created
+
+    async def _insert_users(self, users: List[UserInDB]) -> List[UserInDB]:
+        rows = [user.model_dump() for user in users]
+        records = await self.pool.fetch(INSERT_USERS, *column_arrays(USER_COLUMNS, rows))
+        return USER_ROWS.validate_python(map(dict, records))
+
+    async def _load_users_by(self, column: str, keys: List[str]) -> Dict[str, UserInDB]:
+        """Batch function behind the point-lookup loaders: one prepared `= ANY` query per batch."""
+        records = await self.pool.fetch(SELECT_USERS_BY[column], keys)
+        return {str(getattr(user, column)): user for user in USER_ROWS.validate_python(map(dict, records))}
+
+    async def get_all(self) -> List[UserInDB]:
+        """Retrieve all users"""
+        try:
+            records = await self.pool.fetch("SELECT * FROM users")
+            return USER_ROWS.validate_python(map(dict, records))
+        except Exception as e:
+            logger.error(f"Failed to get all users: {str(e)}")
+            raise AppException("Failed to get all users.")
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[UserInDB]:
+        """Retrieve one page of users in (created_at, id) order"""
+        try:
+            if cursor:
+                created_at, id = decode_cursor(cursor)
+                records = await self.pool.fetch(
+                    SELECT_USERS_PAGE_AFTER, datetime.fromisoformat(created_at), UUID(id), limit
+                )
+            else:
+                records = await self.pool.fetch(SELECT_USERS_PAGE, limit)
+
+            next_cursor = None
+            if len(records) == limit:
+                next_cursor = encode_cursor(records[-1]["created_at"].isoformat(), records[-1]["id"])
+            return Page(items=USER_ROWS.validate_python(map(dict, records)), next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to get page of users: {str(e)}")
+            raise AppException("Failed to get page of users.")
+
+    async def update(self, id: UUID, user: UserInDB) -> Optional[UserInDB]:
+        """Update an existing user"""
+        try:
+            data = user.model_dump()
+            record = await self.pool.fetchrow(UPDATE_USER, id, *(data[column] for column in UPDATE_USER_COLUMNS))
+            updated = UserRow(**record) if record else None
+        except Exception as e:
+            logger.error(f"Failed to update user: {str(e)}")
+            raise AppException("Failed to update user.")
+        if updated:
+            self._notify_saved([updated])
+        return updated
+
+    async def delete(self, id: UUID) -> bool:
+        """Delete an existing user by their ID"""
+        try:
+            record = await self.pool.fetchrow("DELETE FROM users WHERE id = $1 RETURNING id", id)
+            deleted = record is not None
+        except Exception as e:
+            logger.error(f"Failed to delete user: {str(e)}")
+            raise AppException("Failed to delete user.")
+        if deleted:
+            self._notify_deleted(id)
+        return deleted
+
+    async def get_by_social_id(self, provider: str, social_id: str) -> Optional[UserInDB]:
+        """Retrieve a user by their social account"""
+        try:
+            record = await self.pool.fetchrow(SELECT_USER_BY_SOCIAL_ID, provider, social_id)
+            return UserRow(**record) if record else None
+        except Exception as e:
+            logger.error(f"Failed to get user by social account: {str(e)}")
+            raise AppException("Failed to get user by social account.")
+
+    async def create_auth_method(self, auth_method: AuthMethod) -> AuthMethod:
+        """Create a new auth method for a user"""
+        try:
+            return (await self._insert_auth_methods([auth_method]))[0]
+        except Exception as e:
+            logger.error(f"Failed to create auth method: {str(e)}")
+            raise AppException("Failed to create auth method in DB.")
+
+    async def create_auth_methods(self, auth_methods: List[AuthMethod]) -> List[AuthMethod]:
+        """Create several auth methods with a single unnest insert"""
+        if not auth_methods:
+            return []
+        try:
+            return await self._insert_auth_methods(auth_methods)
+        except Exception as e:
+            logger.error(f"Failed to create auth methods: {str(e)}")
+            raise AppException("Failed to create auth methods in DB.")
+
+    async def _insert_auth_methods(self, auth_methods: List[AuthMethod]) -> List[AuthMethod]:
+        rows = [auth_method.model_dump() for auth_method in auth_methods]
+        records = await self.pool.fetch(INSERT_AUTH_METHODS, *column_arrays(AUTH_METHOD_COLUMNS, rows))
+        return AUTH_METHOD_ROWS.validate_python(map(dict, records))
+
+    async def get_auth_methods(self, user_id: UUID) -> List[AuthMethod]:
+        """Retrieve all authentication methods for a user"""
+        try:
+            records = await self.pool.fetch("SELECT * FROM auth_methods WHERE user_id = $1", user_id)
+            return AUTH_METHOD_ROWS.validate_python(map(dict, records))
+        except Exception as e:
+            logger.error(f"Failed to get auth methods: {str(e)}")
+            raise AppException("Failed to get auth methods.")
+
+    async def update_password_hash(self, auth_method_id: UUID, password_hash: str, previous_hash: str) -> bool:
+        """Replace an auth method's password hash, unless it changed since previous_hash was read"""
+        try:
+            record = await self.pool.fetchrow(UPDATE_PASSWORD_HASH, password_hash, auth_method_id, previous_hash)
+            return record is not None
+        except Exception as e:
+            logger.error(f"Failed to update password hash: {str(e)}")
+            raise AppException("Failed to update password hash.")
+
+    async def link_social_accounts(self, user_id: UUID, provider: str, social_id: str, email: Optional[str] = None) -> None:
+        """Link a social account to a user"""
+        try:
+            await self.pool.execute(
+                "INSERT INTO social_accounts (user_id, provider, social_id, email) VALUES ($1, $2, $3, $4)",
+                user_id, provider, social_id, email
+            )
+        except Exception as e:
+            logger.error(f"Failed to link social account: {str(e)}")
+            raise AppException("Failed to link social account.")
+
+"""
+1. Why:
+    . The PostgREST path pays an HTTP hop, JSON encoding on both sides and URL-built filters per call
+    . Here each call is one message on a pooled Postgres connection with binary-encoded parameters and rows
+
+2. Statements:
+    . Point lookups keep the BatchLoader from AuthRepository; each batch runs a prepared `= ANY($1)` query
+    . get_by_social_id is a single prepared join
+    . Inserts use INSERT ... SELECT FROM unnest(...), so one statement covers a single row and a bulk batch
+
+3. Selected with REPOSITORY_BACKEND=postgres (see app/repositories/factory.py)
+"""
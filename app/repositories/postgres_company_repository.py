@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+import logging
+import asyncpg
+from app.domain.company.models import Company
+from app.infrastructure.postgres_client import (
+    PostgresClient,
+    column_arrays,
+    insert_statement,
+    update_statement
+)
+from app.repositories.base import Page, decode_cursor, encode_cursor
+from app.repositories.company_repository import COMPANY_ROWS, CompanyRepository
+from app.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+COMPANY_COLUMNS = {
+    "id": "uuid",
+    "company_name": "text",
+    "registration_number": "text",
+    "country": "text",
+    "created_at": "timestamptz",
+    "updated_at": "timestamptz",
+}
+
+INSERT_COMPANIES = insert_statement("companies", COMPANY_COLUMNS)
+UPDATE_COMPANY, UPDATE_COMPANY_COLUMNS = update_statement("companies", COMPANY_COLUMNS)
+SELECT_COMPANY_BY_NAME = "SELECT * FROM companies WHERE company_name = $1"
+SELECT_COMPANIES_BY_NAMES = "SELECT * FROM companies WHERE company_name = ANY($1::text[])"
+SELECT_COMPANIES_BY_IDS = "SELECT * FROM companies WHERE id = ANY($1::uuid[])"
+SELECT_COMPANIES_PAGE = "SELECT * FROM companies ORDER BY created_at, id LIMIT $1"
+SELECT_COMPANIES_PAGE_AFTER = "SELECT * FROM companies WHERE (created_at, id) > ($1, $2) ORDER BY created_at, id LIMIT $3"
+
+class PostgresCompanyRepository(CompanyRepository):
+    """CompanyRepository whose storage calls talk to Postgres directly; caching and single flight are inherited."""
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        return PostgresClient.get_pool()
+
+    async def _insert(self, company: Company) -> Company:
+        try:
+            return (await self._insert_rows([company]))[0]
+        except Exception as e:
+            logger.error(f"Failed to create company: {str(e)}")
+            raise AppException("Failed to create company in DB.")
+
+    async def _insert_many(self, companies: List[Company]) -> List[Company]:
+        if not companies:
+            return []
+        try:
+            return await self._insert_rows(companies)
+        except Exception as e:
+            logger.error(f"Failed to create companies: {str(e)}")
+            raise AppException("Failed to create companies in DB.")
+
+    async def _insert_rows(self, companies: List[Company]) -> List[Company]:
+        rows = [company.model_dump() for company in companies]
+        records = await self.pool.fetch(INSERT_COMPANIES, *column_arrays(COMPANY_COLUMNS, rows))
+        return COMPANY_ROWS.validate_python(map(dict, records))
+
+    async def _fetch_by_name(self, company_name: str) -> Optional[Company]:
+        try:
+            record = await self.pool.fetchrow(SELECT_COMPANY_BY_NAME, company_name)
+            return Company(**record) if record else None
+        except Exception as e:
+            logger.error(f"Failed to get company by name: {str(e)}")
+            raise AppException("Failed to get company by name.")
+
+    async def _fetch_by_names(self, company_names: List[str]) -> Dict[str, Company]:
+        """One prepared `= ANY` query; no URL length limit to chunk around"""
+        try:
+            records = await self.pool.fetch(SELECT_COMPANIES_BY_NAMES, company_names)
+            return {company.company_name: company for company in COMPANY_ROWS.validate_python(map(dict, records))}
+        except Exception as e:
+            logger.error(f"Failed to get companies by name: {str(e)}")
+            raise AppException("Failed to get companies by name.")
+
+    async def _load_by_ids(self, company_ids: List[str]) -> Dict[str, Company]:
+        """Batch function behind the id loader: one prepared `= ANY` query per batch"""
+        records = await self.pool.fetch(SELECT_COMPANIES_BY_IDS, company_ids)
+        return {str(company.id): company for company in COMPANY_ROWS.validate_python(map(dict, records))}
+
+    async def get_all(self) -> List[Company]:
+        try:
+            records = await self.pool.fetch("SELECT * FROM companies")
+            return COMPANY_ROWS.validate_python(map(dict, records))
+        except Exception as e:
+            logger.error(f"Failed to get all companies: {str(e)}")
+            raise AppException("Failed to get all companies.")
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[Company]:
+        try:
+            if cursor:
+                created_at, id = decode_cursor(cursor)
+                records = await self.pool.fetch(
+                    SELECT_COMPANIES_PAGE_AFTER, datetime.fromisoformat(created_at), UUID(id), limit
+                )
+            else:
+                records = await self.pool.fetch(SELECT_COMPANIES_PAGE, limit)
+
+            next_cursor = None
+            if len(records) == limit:
+                next_cursor = encode_cursor(records[-1]["created_at"].isoformat(), records[-1]["id"])
+            return Page(items=COMPANY_ROWS.validate_python(map(dict, records)), next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to get page of companies: {str(e)}")
+            raise AppException("Failed to get page of companies.")
+
+    async def update(self, company_id: UUID, company: Company) -> Optional[Company]:
+        try:
+            data = company.model_dump()
+            record = await self.pool.fetchrow(
+                UPDATE_COMPANY, company_id, *(data[column] for column in UPDATE_COMPANY_COLUMNS)
+            )
+            self._forget(company_id)
+            self._by_name.invalidate(company.company_name)
+            return Company(**record) if record else None
+        except Exception as e:
+            logger.error(f"Failed to update company: {str(e)}")
+            raise AppException("Failed to update company.")
+
+    async def delete(self, company_id: UUID) -> bool:
+        try:
+            record = await self.pool.fetchrow("DELETE FROM companies WHERE id = $1 RETURNING id", company_id)
+            self._forget(company_id)
+            return record is not None
+        except Exception as e:
+            logger.error(f"Failed to delete company: {str(e)}")
+            raise AppException("Failed to delete company.")
+
+"""
+1. Only the uncached storage calls are replaced:
+    . _insert/_insert_many, _fetch_by_name/_fetch_by_names and the id loader's batch function
+    . get_or_create, the TTL caches and single flight come from CompanyRepository unchanged
+
+2. _fetch_by_name is the prepared hot lookup behind get_or_create during registration
+"""
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+import logging
+from supabase import AsyncClient
+from app.domain.resume.models import Resume
+from app.infrastructure.supabase_client import SupabaseClient
+from app.repositories.base import IN_FILTER_CHUNK_SIZE, BaseRepository, Page, encode_cursor, keyset_filter, rows_adapter
+from app.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+RESUME_ROWS = rows_adapter(Resume)
+
+class ResumeRepository(BaseRepository[Resume]):
+    """Extracted resume text, one row per user (unique user_id)."""
+
+    def __init__(self):
+        self.table = "resumes"
+
+    @property
+    def client(self) -> AsyncClient:
+        """The shared async supabase client, resolved once the app has started."""
+        return SupabaseClient.get_instance()
+
+    async def create(self, resume: Resume) -> Resume:
+        try:
+            data = resume.model_dump(mode="json")
+            result = await self.client.table(self.table).insert(data).execute()
+            created = Resume.model_validate(result.data[0])
+        except Exception as e:
+            logger.error(f"Failed to create resume: {str(e)}")
+            raise AppException("Failed to create resume.")
+        self._notify_saved([created])
+        return created
+
+    async def upsert_for_user(self, resume: Resume) -> Resume:
+        """Insert the resume, replacing the one already stored for its user."""
+        try:
+            data = resume.model_dump(mode="json", exclude={"id", "created_at"})
+            result = await self.client.table(self.table)\
+                .upsert(data, on_conflict="user_id")\
+                .execute()
+            stored = Resume.model_validate(result.data[0])
+        except Exception as e:
+            logger.error(f"Failed to store resume: {str(e)}")
+            raise AppException("Failed to store resume.")
+        self._notify_saved([stored])
+        return stored
+
+    async def get_by_user_id(self, user_id: UUID) -> Optional[Resume]:
+        try:
+            result = await self.client.table(self.table).select('*').eq('user_id', str(user_id)).limit(1).execute()
+            return Resume.model_validate(result.data[0]) if result.data else None
+        except Exception as e:
+            logger.error(f"Failed to get resume by user: {str(e)}")
+            raise AppException("Failed to get resume by user.")
+
+    async def get_by_user_ids(self, user_ids: List[UUID]) -> Dict[UUID, Resume]:
+        """The resumes of several users, keyed by user id, in one `in` query per IN_FILTER_CHUNK_SIZE ids."""
+        try:
+            resumes: Dict[UUID, Resume] = {}
+            keys = [str(user_id) for user_id in user_ids]
+            for start in range(0, len(keys), IN_FILTER_CHUNK_SIZE):
+                result = await self.client.table(self.table)\
+                    .select('*')\
+                    .in_('user_id', keys[start:start + IN_FILTER_CHUNK_SIZE])\
+                    .execute()
+                resumes.update((resume.user_id, resume) for resume in RESUME_ROWS.validate_python(result.data))
+            return resumes
+        except Exception as e:
+            logger.error(f"Failed to get resumes by user: {str(e)}")
+            raise AppException("Failed to get resumes by user.")
+
+    async def get_skills_by_user_ids(self, user_ids: List[UUID]) -> Dict[UUID, List[str]]:
+        """Only the stored skill ids of several users' resumes, keyed by user id (no resume text is fetched)."""
+        try:
+            skills: Dict[UUID, List[str]] = {}
+            keys = [str(user_id) for user_id in user_ids]
+            for start in range(0, len(keys), IN_FILTER_CHUNK_SIZE):
+                result = await self.client.table(self.table)\
+                    .select('user_id,skills')\
+                    .in_('user_id', keys[start:start + IN_FILTER_CHUNK_SIZE])\
+                    .execute()
+                skills.update((UUID(row['user_id']), row.get('skills') or []) for row in result.data)
+            return skills
+        except Exception as e:
+            logger.error(f"Failed to get resume skills by user: {str(e)}")
+            raise AppException("Failed to get resume skills by user.")
+
+    async def get_by_id(self, id: UUID) -> Optional[Resume]:
+        try:
+            result = await self.client.table(self.table).select('*').eq('id', str(id)).limit(1).execute()
+            return Resume.model_validate(result.data[0]) if result.data else None
+        except Exception as e:
+            logger.error(f"Failed to get resume by ID: {str(e)}")
+            raise AppException("Failed to get resume by ID.")
+
+    async def get_all(self) -> List[Resume]:
+        try:
+            result = await self.client.table(self.table).select('*').execute()
+            return RESUME_ROWS.validate_python(result.data)
+        except Exception as e:
+            logger.error(f"Failed to get all resumes: {str(e)}")
+            raise AppException("Failed to get all resumes.")
+
+    async def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[Resume]:
+        try:
+            query = self.client.table(self.table).select('*').order('created_at').order('id').limit(limit)
+            if cursor:
+                query = query.or_(keyset_filter(cursor))
+            result = await query.execute()
+
+            next_cursor = None
+            if len(result.data) == limit:
+                last = result.data[-1]
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+            return Page(items=RESUME_ROWS.validate_python(result.data), next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to get page of resumes: {str(e)}")
+            raise AppException("Failed to get page of resumes.")
+
+    async def update(self, id: UUID, resume: Resume) -> Optional[Resume]:
+        try:
+            data = resume.model_dump(mode="json")
+            result = await self.client.table(self.table).update(data).eq('id', str(id)).execute()
+            updated = Resume.model_validate(result.data[0]) if result.data else None
+        except Exception as e:
+            logger.error(f"Failed to update resume: {str(e)}")
+            raise AppException("Failed to update resume.")
+        if updated:
+            self._notify_saved([updated])
+        return updated
+
+    async def delete(self, id: UUID) -> bool:
+        try:
+            result = await self.client.table(self.table).delete().eq('id', str(id)).execute()
+            deleted = bool(result.data)
+        except Exception as e:
+            logger.error(f"Failed to delete resume: {str(e)}")
+            raise AppException("Failed to delete resume.")
+        if deleted:
+            self._notify_deleted(id)
+        return deleted
+
+"""
+1. One resume per user:
+    . resumes.user_id is unique; upsert_for_user writes with on_conflict=user_id so a new upload replaces the old text
+    . id and created_at are left out of the upsert so a replacement keeps the row's original values
+
+2. Resumes always go through PostgREST, also with REPOSITORY_BACKEND=postgres: they are written once per
+   upload and read rarely, so they are not worth a second implementation
+"""
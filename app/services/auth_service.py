@@ -1,16 +1,56 @@
+import asyncio
+import logging
 from datetime import datetime
-from uuid import uuid4
-from app.domain.auth.models import AuthMethod, UserCreate, UserInDB
+from typing import Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+from uuid import UUID, uuid4
+from app.domain.auth.models import AuthMethod, RegistrationOutcome, UserCreate, UserInDB, UserRegistration
 from app.domain.company.models import Company
 from app.repositories.auth_repository import AuthRepository
 from app.repositories.company_repository import CompanyRepository
-from app.core.exceptions import ValidationException, AppException
-from app.utils.password_utils import hash_password, validate_password
+from app.repositories.factory import create_auth_repository, create_company_repository
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException, ValidationException, AppException
+from app.infrastructure.job_queue import JobQueue
+from app.utils.cache import TTLCache
+from app.utils.password_utils import (
+    hash_password_if_valid_async,
+    needs_rehash,
+    password_executor,
+    rehash_password_if_needed_async
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 class AuthService:
-    def __init__(self):
-        self.auth_repo = AuthRepository()
-        self.company_repo = CompanyRepository()
+    def __init__(
+        self,
+        auth_repo: Optional[AuthRepository] = None,
+        company_repo: Optional[CompanyRepository] = None,
+        jobs: Optional[JobQueue] = None
+    ):
+        self.auth_repo = auth_repo or create_auth_repository()
+        self.company_repo = company_repo or create_company_repository()
+        # Outbound SMS/email dispatch: run by the job queue after the request is answered, or inline without one
+        self.jobs = jobs
+        self._side_effects = {
+            "auth.send_otp": (self.auth_repo.send_otp, "Failed to send OTP"),
+            "auth.reset_password": (self.auth_repo.reset_password, "Failed to send password reset email"),
+            "auth.resend_verification_email": (
+                self.auth_repo.resend_verification_email, "Failed to resend verification email"
+            ),
+        }
+        if jobs is not None:
+            for name, (handler, _) in self._side_effects.items():
+                jobs.register(name, handler)
+        # Rehash checks started after logins; referenced here so they are not garbage-collected mid-flight
+        self._rehashes: Set[asyncio.Task] = set()
+        self._rehashing = 0
+        # Users whose stored hash was found at (or brought to) a cost, so their next logins skip the lookup
+        self._hash_checked: TTLCache[UUID, Optional[int]] = TTLCache(
+            settings.PASSWORD_REHASH_CHECK_CACHE_SIZE, settings.PASSWORD_REHASH_CHECK_TTL
+        )
     
     async def register_user(
         self, 
@@ -20,40 +60,224 @@ class AuthService:
         auth_provider: str = None, 
         social_id: str = None
     ) -> UserInDB:
+        registration = UserRegistration(
+            user_data=user_data,
+            registration_type=registration_type,
+            company_data=company_data,
+            auth_provider=auth_provider,
+            social_id=social_id
+        )
+        self._validate_registration(registration)
         user_id = uuid4()
         now = datetime.utcnow()
         
+        password_hash = None
+        if registration_type == "email":
+            password_hash = await hash_password_if_valid_async(user_data.password)
+            if not password_hash:
+                raise ValidationException("Password does not meet security requirements.")
+        
         company_id = None
-        if user_data.user_type.lower() == "client":
-            if not company_data or not company_data.get("company_name"):
-                raise ValidationException("Company information is required for client registration.")
-            
-            company = await self.company_repo.get_by_name(company_data["company_name"])
-            if not company:
-                company = Company(
-                    company_name=company_data["company_name"],
-                    registration_number=company_data["registration_number"],
-                    country=company_data["country"]
-                )
-                company = await self.company_repo.create(company)
-            
+        if self._is_client(registration):
+            company = await self.company_repo.get_or_create(self._build_company(company_data))
             company_id = company.id
         
-        password_hash = None
-        if registration_type == "email":
-            if not user_data.password:
+        user = self._build_user(user_data, user_id, company_id, now)
+        created_user = await self.auth_repo.create(user)
+        
+        auth_method = self._build_auth_method(registration, user_id, password_hash, now)
+        await self.auth_repo.create_auth_method(auth_method)
+        
+        return created_user
+    
+    async def register_users_bulk(self, registrations: List[UserRegistration]) -> List[RegistrationOutcome]:
+        """
+        Register many users at once.
+        
+        Companies are resolved with one lookup and one insert for the whole batch,
+        users and auth methods are each written with one array insert, and
+        passwords are hashed in parallel on the password pool. A failing row
+        does not fail the batch: every row gets its own outcome.
+        """
+        now = datetime.utcnow()
+        outcomes = [RegistrationOutcome(index=index) for index in range(len(registrations))]
+        pending: Dict[int, UserRegistration] = {}
+        seen_identities = set()
+        for index, registration in enumerate(registrations):
+            try:
+                self._validate_registration(registration)
+                identities = {
+                    (field, value) for field, value in (
+                        ("email", registration.user_data.email),
+                        ("phone", registration.user_data.phone)
+                    ) if value
+                }
+                duplicate = next((field for field, _ in identities & seen_identities), None)
+                if duplicate:
+                    raise ValidationException(f"Duplicate {duplicate} in batch.")
+                seen_identities |= identities
+                pending[index] = registration
+            except ValidationException as e:
+                outcomes[index].error = e.message
+        
+        password_hashes = await self._hash_passwords_bulk(pending, outcomes)
+        company_ids = await self._resolve_companies_bulk(pending, outcomes)
+        
+        user_ids = {index: uuid4() for index in pending}
+        users = {
+            index: self._build_user(
+                registration.user_data,
+                user_ids[index],
+                company_ids.get(registration.company_data["company_name"]) if self._is_client(registration) else None,
+                now
+            )
+            for index, registration in pending.items()
+        }
+        created_users = await self._insert_bulk(
+            users, self.auth_repo.create_many, self.auth_repo.create, outcomes
+        )
+        
+        auth_methods = {
+            index: self._build_auth_method(pending[index], user_ids[index], password_hashes.get(index), now)
+            for index in created_users
+        }
+        created_methods = await self._insert_bulk(
+            auth_methods, self.auth_repo.create_auth_methods, self.auth_repo.create_auth_method, outcomes
+        )
+        
+        for index in created_methods:
+            outcomes[index].user = created_users[index]
+        return outcomes
+    
+    async def _hash_passwords_bulk(
+        self, 
+        pending: Dict[int, UserRegistration], 
+        outcomes: List[RegistrationOutcome]
+    ) -> Dict[int, str]:
+        """Validate and hash all email passwords in parallel, dropping rows that fail."""
+        # Stay within the pool's concurrency so a big batch queues here instead of tripping its backpressure.
+        semaphore = asyncio.Semaphore(password_executor.max_concurrency)
+        
+        async def hash_row(index: int, password: str) -> None:
+            async with semaphore:
+                try:
+                    password_hash = await hash_password_if_valid_async(password)
+                except AppException as e:
+                    outcomes[index].error = e.message
+                    return
+            if password_hash:
+                password_hashes[index] = password_hash
+            else:
+                outcomes[index].error = "Password does not meet security requirements."
+        
+        password_hashes: Dict[int, str] = {}
+        await asyncio.gather(*(
+            hash_row(index, registration.user_data.password)
+            for index, registration in pending.items()
+            if registration.registration_type == "email"
+        ))
+        for index, registration in list(pending.items()):
+            if registration.registration_type == "email" and index not in password_hashes:
+                del pending[index]
+        return password_hashes
+    
+    async def _resolve_companies_bulk(
+        self, 
+        pending: Dict[int, UserRegistration], 
+        outcomes: List[RegistrationOutcome]
+    ) -> Dict[str, UUID]:
+        """Find or create every company in the batch, dropping rows whose company failed."""
+        company_data = {}
+        for registration in pending.values():
+            if self._is_client(registration):
+                company_data.setdefault(registration.company_data["company_name"], registration.company_data)
+        if not company_data:
+            return {}
+        
+        error = "Failed to create company in DB."
+        # Company rows that cannot even be built fail only the rows naming that company
+        errors: Dict[str, str] = {}
+        try:
+            companies = await self.company_repo.get_by_names(list(company_data))
+            missing = []
+            for name, data in company_data.items():
+                if name in companies:
+                    continue
+                try:
+                    missing.append(self._build_company(data))
+                except Exception as e:
+                    logger.warning(f"Invalid company in bulk registration: {str(e)}")
+                    errors[name] = "Invalid company information."
+            for company in await self.company_repo.create_many(missing):
+                companies[company.company_name] = company
+        except AppException as e:
+            companies = {}
+            error = e.message
+        
+        for index, registration in list(pending.items()):
+            if self._is_client(registration) and registration.company_data["company_name"] not in companies:
+                outcomes[index].error = errors.get(registration.company_data["company_name"], error)
+                del pending[index]
+        return {name: company.id for name, company in companies.items()}
+    
+    async def _insert_bulk(
+        self,
+        rows: Dict[int, T],
+        insert_many: Callable[[List[T]], Awaitable[List[T]]],
+        insert_one: Callable[[T], Awaitable[T]],
+        outcomes: List[RegistrationOutcome]
+    ) -> Dict[int, T]:
+        """Insert rows with one array insert, falling back to row-by-row inserts to isolate failures."""
+        if not rows:
+            return {}
+        try:
+            created = await insert_many(list(rows.values()))
+            return dict(zip(rows, created))
+        except AppException:
+            # PostgREST array inserts are atomic, so one bad row rejects them all.
+            results = await asyncio.gather(*(insert_one(row) for row in rows.values()), return_exceptions=True)
+        
+        created_rows = {}
+        for index, result in zip(rows, results):
+            if isinstance(result, AppException):
+                outcomes[index].error = result.message
+            elif isinstance(result, Exception):
+                outcomes[index].error = str(result)
+            else:
+                created_rows[index] = result
+        return created_rows
+    
+    @staticmethod
+    def _is_client(registration: UserRegistration) -> bool:
+        return registration.user_data.user_type.lower() == "client"
+    
+    def _validate_registration(self, registration: UserRegistration) -> None:
+        """Check the request-level rules shared by single and bulk registration."""
+        if self._is_client(registration):
+            if not registration.company_data or not registration.company_data.get("company_name"):
+                raise ValidationException("Company information is required for client registration.")
+            if not registration.company_data.get("country"):
+                raise ValidationException("Company country is required for client registration.")
+        
+        if registration.registration_type == "email":
+            if not registration.user_data.password:
                 raise ValidationException("Password is required for email registration.")
-            
-            if not validate_password(user_data.password):
-                raise ValidationException("Password does not meet security requirements.")
-            
-            password_hash = hash_password(user_data.password)
         
-        if registration_type not in ["email", "phone"]:
-            if not social_id:
+        if registration.registration_type not in ["email", "phone"]:
+            if not registration.social_id:
                 raise ValidationException("Social registration requires social_id and auth_provider.")
-        
-        user = UserInDB(
+    
+    @staticmethod
+    def _build_company(company_data: dict) -> Company:
+        return Company(
+            company_name=company_data["company_name"],
+            registration_number=company_data.get("registration_number"),
+            country=company_data["country"]
+        )
+    
+    @staticmethod
+    def _build_user(user_data: UserCreate, user_id: UUID, company_id: Optional[UUID], now: datetime) -> UserInDB:
+        return UserInDB(
             id=user_id,
             email=user_data.email,
             phone=user_data.phone,
@@ -68,23 +292,27 @@ class AuthService:
             created_at=now,
             updated_at=now
         )
-        
-        created_user = await self.auth_repo.create(user)
-        
-        auth_method = AuthMethod(
-            id=user_id,
+    
+    @staticmethod
+    def _build_auth_method(
+        registration: UserRegistration, 
+        user_id: UUID, 
+        password_hash: Optional[str], 
+        now: datetime
+    ) -> AuthMethod:
+        user_data = registration.user_data
+        registration_type = registration.registration_type
+        return AuthMethod(
+            user_id=user_id,
             auth_type=registration_type,
-            auth_provider=auth_provider,
+            auth_provider=registration.auth_provider,
             auth_id=user_data.email if registration_type == "email" else (
-                user_data.phone if registration_type == "phone" else social_id
+                user_data.phone if registration_type == "phone" else registration.social_id
             ),
             password_hash=password_hash,
             is_primary=True,
             created_at=now
         )
-        await self.auth_repo.create_auth_method(auth_method)
-        
-        return created_user
     
     async def login_user(
         self,
@@ -102,6 +330,10 @@ class AuthService:
             # Email/Password login
             if email and password:
                 user = await self.auth_repo.verify_password(email, password)
+                if user and settings.PASSWORD_REHASH_ON_LOGIN and self._hash_checked.get(user.id) != password_executor.rounds:
+                    task = asyncio.create_task(self._rehash_password(user.id, password))
+                    self._rehashes.add(task)
+                    task.add_done_callback(self._rehashes.discard)
             
             # Phone/OTP login
             elif phone and otp:
@@ -121,16 +353,59 @@ class AuthService:
         except Exception as e:
             raise AppException(f"Failed to login user: {str(e)}")
     
-    async def send_otp(self, phone: str) -> None:
-        """Send OTP for phone verification."""
+    async def _rehash_password(self, user_id: UUID, password: str) -> None:
+        """
+        Bring the stored email password hash to the current bcrypt cost, after the login was answered.
+
+        Not a job: the payload would have to carry the password. A rehash lost
+        to a restart or a busy pool is simply retried at the next login.
+        """
         try:
-            await self.auth_repo.send_otp(phone)
+            auth_methods = await self.auth_repo.get_auth_methods(user_id)
+            auth_method = next((method for method in auth_methods if method.auth_type == "email" and method.password_hash), None)
+            if auth_method is None or not needs_rehash(auth_method.password_hash):
+                self._hash_checked.set(user_id, password_executor.rounds)
+                return
+            # Capped so a login burst after a cost change cannot crowd registrations off the password pool;
+            # users over the cap are rehashed at a later login
+            if self._rehashing >= settings.PASSWORD_REHASH_MAX_CONCURRENCY:
+                return
+            self._rehashing += 1
+            try:
+                password_hash = await rehash_password_if_needed_async(password, auth_method.password_hash)
+            finally:
+                self._rehashing -= 1
+            if password_hash is not None:
+                await self.auth_repo.update_password_hash(auth_method.id, password_hash, auth_method.password_hash)
+            self._hash_checked.set(user_id, password_executor.rounds)
         except Exception as e:
-            raise AppException(f"Failed to send OTP: {str(e)}")
+            logger.warning(f"Failed to rehash password: {str(e)}")
     
-    async def reset_password(self, email: str) -> None:
-        """Send password reset email."""
+    async def send_otp(self, phone: str) -> Optional[str]:
+        """Queue an OTP for phone verification; returns the job id."""
+        return await self._dispatch("auth.send_otp", phone=phone)
+    
+    async def reset_password(self, email: Optional[str]) -> Optional[str]:
+        """Queue a password reset email; returns the job id."""
+        # Checked before queueing: a job without an address could only fail, after the 202 was sent
+        if not email:
+            raise ValidationException("Password reset by phone is not supported; provide the account email.")
+        return await self._dispatch("auth.reset_password", email=email)
+    
+    async def resend_verification_email(self, email: str) -> Optional[str]:
+        """Queue another signup confirmation email; returns the job id."""
+        return await self._dispatch("auth.resend_verification_email", email=email)
+    
+    async def _dispatch(self, name: str, **payload) -> Optional[str]:
+        """Enqueue a side effect (None when it ran inline because the service has no job queue)."""
+        handler, error = self._side_effects[name]
         try:
-            await self.auth_repo.reset_password(email)
+            if self.jobs is not None:
+                job = await self.jobs.enqueue(name, **payload)
+                return job.id
+            await handler(**payload)
+            return None
+        except ServiceUnavailableException:
+            raise
         except Exception as e:
-            raise AppException(f"Failed to send password reset email: {str(e)}")
\ No newline at end of file
+            raise AppException(f"{error}: {str(e)}")
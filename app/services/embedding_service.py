@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.metrics import EMBEDDING_INPUTS, EMBEDDING_REQUEST_DURATION, EMBEDDING_TOKENS
+from app.domain.auth.models import UserInDB
+from app.domain.resume.models import Resume
+from app.infrastructure.embedding_cache import EmbeddingCache, content_key, get_embedding_cache
+from app.infrastructure.embeddings import EmbeddingBackend, backend_from_settings
+from app.utils.text_chunks import TextChunk, chunk_text, get_encoder
+
+logger = logging.getLogger(__name__)
+
+Vector = List[float]
+
+def pack_batches(items: Sequence[Tuple[int, int]], max_size: int, max_tokens: int) -> List[List[int]]:
+    """
+    Group (position, tokens) items into batches of at most max_size items and max_tokens tokens.
+
+    Items keep their order; an item larger than max_tokens gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for position, tokens in items:
+        if current and (len(current) >= max_size or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def mean_vector(vectors: Sequence[Vector], weights: Sequence[int]) -> Vector:
+    """The weighted mean of vectors, normalized to unit length."""
+    total = [0.0] * len(vectors[0])
+    for vector, weight in zip(vectors, weights):
+        for dimension, value in enumerate(vector):
+            total[dimension] += value * weight
+    norm = math.sqrt(sum(value * value for value in total)) or 1.0
+    return [value / norm for value in total]
+
+def profile_text(user: UserInDB) -> str:
+    """The parts of a user's profile worth embedding."""
+    return "\n".join(str(part) for part in (
+        f"{user.first_name} {user.last_name}",
+        user.user_type,
+        user.work_status,
+        user.country
+    ) if part)
+
+class EmbeddingService:
+    """
+    Embeds documents through a pluggable backend with chunking, caching and batching.
+
+    Documents are split into token-bounded chunks, chunks already in the
+    content-hash cache are not sent again, the rest are packed into as few
+    requests as the backend's limits allow, and at most
+    EMBEDDING_MAX_CONCURRENCY requests run at once.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EmbeddingBackend] = None,
+        cache: Optional[EmbeddingCache] = None,
+        encoding: Optional[str] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        self.backend = backend or backend_from_settings()
+        self.cache = cache or get_embedding_cache()
+        self.encoding = encoding or settings.EMBEDDING_ENCODING
+        self.chunk_tokens = chunk_tokens or settings.EMBEDDING_CHUNK_TOKENS
+        self.chunk_overlap = settings.EMBEDDING_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY)
+
+    async def warm(self) -> None:
+        """Load the tokenizer and the backend client off the event loop so the first request does not pay for them."""
+        try:
+            await asyncio.to_thread(get_encoder, self.encoding)
+            await asyncio.to_thread(self.backend.warm)
+        except Exception as e:
+            logger.warning(f"Failed to warm up embeddings: {str(e)}")
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        return chunk_text(text, get_encoder(self.encoding), self.chunk_tokens, self.chunk_overlap)
+
+    async def embed_chunks(self, chunks: Sequence[TextChunk]) -> List[Vector]:
+        """One vector per chunk, in order, from the cache where possible."""
+        keys = [content_key(self.backend.model, self.backend.dimensions, chunk.text) for chunk in chunks]
+        # The same text is embedded once even when it repeats within the call
+        unique: Dict[bytes, TextChunk] = {}
+        for key, chunk in zip(keys, chunks):
+            unique.setdefault(key, chunk)
+        try:
+            vectors = await self.cache.get_many(unique)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+            vectors = {}
+        missing = [(key, chunk) for key, chunk in unique.items() if key not in vectors]
+        EMBEDDING_INPUTS.labels("hit").inc(len(unique) - len(missing))
+        EMBEDDING_INPUTS.labels("miss").inc(len(missing))
+
+        if missing:
+            batches = pack_batches(
+                [(position, chunk.tokens) for position, (_, chunk) in enumerate(missing)],
+                self.backend.max_batch_size,
+                self.backend.max_batch_tokens
+            )
+            results = await asyncio.gather(*(
+                self._embed_batch([missing[position] for position in batch]) for batch in batches
+            ))
+            for batch in results:
+                vectors.update(batch)
+        return [vectors[key] for key in keys]
+
+    async def _embed_batch(self, batch: List[Tuple[bytes, TextChunk]]) -> Dict[bytes, Vector]:
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                embedded = await self.backend.embed([chunk.text for _, chunk in batch])
+            except Exception as e:
+                EMBEDDING_REQUEST_DURATION.labels("error").observe(time.perf_counter() - started)
+                logger.error(f"Failed to embed a batch of {len(batch)} chunks: {str(e)}")
+                raise AppException("Failed to embed texts.")
+            EMBEDDING_REQUEST_DURATION.labels("ok").observe(time.perf_counter() - started)
+        EMBEDDING_TOKENS.inc(sum(chunk.tokens for _, chunk in batch))
+        items = [(key, vector) for (key, _), vector in zip(batch, embedded)]
+        try:
+            await self.cache.put_many(items)
+        except Exception as e:
+            logger.warning(f"Failed to cache {len(items)} embeddings: {str(e)}")
+        return dict(items)
+
+    async def embed_documents(self, texts: Sequence[str]) -> List[List[Tuple[TextChunk, Vector]]]:
+        """
+        Chunk and embed several documents together, returning each one's (chunk, vector) pairs.
+
+        Chunks from all documents share batches, so many short documents cost a few requests.
+        """
+        encoder = await asyncio.to_thread(get_encoder, self.encoding)
+        chunked = await asyncio.to_thread(
+            lambda: [chunk_text(text, encoder, self.chunk_tokens, self.chunk_overlap) for text in texts]
+        )
+        flat = [chunk for chunks in chunked for chunk in chunks]
+        vectors = iter(await self.embed_chunks(flat))
+        return [[(chunk, next(vectors)) for chunk in chunks] for chunks in chunked]
+
+    async def embed_document(self, text: str) -> Optional[Vector]:
+        """A single vector for a document: the token-weighted mean of its chunk vectors (None if it is empty)."""
+        [pairs] = await self.embed_documents([text])
+        if not pairs:
+            return None
+        return mean_vector([vector for _, vector in pairs], [chunk.tokens for chunk, _ in pairs])
+
+    async def embed_resume(self, resume: Resume) -> Optional[Vector]:
+        return await self.embed_document(resume.text)
+
+    async def embed_profile(self, user: UserInDB) -> Optional[Vector]:
+        return await self.embed_document(profile_text(user))
+
+"""
+1. Pipeline:
+    . chunk: token-aware chunks of EMBEDDING_CHUNK_TOKENS with EMBEDDING_CHUNK_OVERLAP, cut with the model's tiktoken encoding
+    . dedupe: chunks are keyed by content hash; repeats within a call and chunks seen before (EmbeddingCache) are not sent
+    . pack: misses go into batches bounded by the backend's max_batch_size and max_batch_tokens
+    . send: batches run concurrently, at most EMBEDDING_MAX_CONCURRENCY per worker, and are cached as they return
+
+2. Event loop:
+    . Tokenizing and the SQLite cache run on threads (tiktoken releases the GIL while encoding)
+    . The encoder is loaded once per process; warm() does it in the background after startup
+
+3. Documents vs chunks:
+    . embed_documents returns every chunk's vector, for callers that index chunks
+    . embed_document/embed_resume/embed_profile pool them into one unit vector per document
+
+4. Failures:
+    . A failed batch raises AppException; batches that already succeeded stay cached, so a retry only sends what is missing
+    . The cache is best-effort: if SQLite fails, lookups miss and writes are skipped, with a warning
+"""
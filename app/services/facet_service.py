@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.domain.auth.models import UserInDB
+from app.domain.resume.models import Resume
+from app.infrastructure.facet_index import ITERATE_FACETS_BELOW, FacetIndex, Query
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.resume_repository import ResumeRepository
+
+logger = logging.getLogger(__name__)
+
+# UserInDB attributes indexed as facets; "skills" comes from the user's resume
+USER_FIELDS = ("country", "user_type", "work_status")
+FACET_FIELDS = USER_FIELDS + ("skills",)
+
+class _UserListener:
+    def __init__(self, facets: "CandidateFacetService"):
+        self.facets = facets
+
+    def saved(self, users: List[UserInDB]) -> None:
+        self.facets.index_users(users)
+
+    def deleted(self, id: UUID) -> None:
+        self.facets.unindex(id)
+
+class _ResumeListener:
+    def __init__(self, facets: "CandidateFacetService"):
+        self.facets = facets
+
+    def saved(self, resumes: List[Resume]) -> None:
+        self.facets.index_skills(resumes)
+
+    def deleted(self, id: UUID) -> None:
+        # Only the resume id is known here; the user's skills are replaced by their next upload
+        pass
+
+class CandidateFacetService:
+    """
+    Boolean filtering and facet counts over users by country, user_type, work_status and resume skills.
+
+    The FacetIndex is loaded from the database in the background on startup,
+    into a fresh index built on a worker thread so bulk inserts never hold the
+    event loop, and follows the repositories afterwards: user creates and
+    updates and resume uploads are applied as they happen.
+    """
+
+    def __init__(self, auth_repo: AuthRepository, resume_repo: ResumeRepository, index: Optional[FacetIndex] = None):
+        self.auth_repo = auth_repo
+        self.resume_repo = resume_repo
+        self.index = index or FacetIndex(FACET_FIELDS)
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        # True while a load attempt is reading the database
+        self._loading = False
+        # Fields written through the listeners during that attempt; replayed over the loaded index before it is swapped in
+        self._touched: Dict[str, Set[str]] = {}
+        auth_repo.add_listener(_UserListener(self))
+        resume_repo.add_listener(_ResumeListener(self))
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start loading the index; queries answer 503 until it is loaded."""
+        self._task = asyncio.create_task(self._load_until_ready())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _load_until_ready(self) -> None:
+        """Load the index, retrying with exponential backoff until one attempt succeeds."""
+        attempt = 0
+        while not await self._load():
+            attempt += 1
+            delay = min(settings.FACET_INDEX_RETRY_MAX_DELAY, settings.FACET_INDEX_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            delay = random.uniform(delay / 2, delay)
+            logger.warning(f"Retrying the candidate facet load in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    async def _load(self) -> bool:
+        started = time.perf_counter()
+        # Only this task touches the new index until it is swapped in, so its bulk inserts can run on a thread
+        loaded = FacetIndex(FACET_FIELDS)
+        # Writes that landed before this attempt are already in the rows it reads; only later ones need replaying
+        self._touched.clear()
+        self._loading = True
+        try:
+            batch: List[UserInDB] = []
+            documents: List[Tuple[str, Dict[str, object]]] = []
+            async for user in self.auth_repo.iter_all(settings.FACET_INDEX_BATCH_SIZE):
+                batch.append(user)
+                if len(batch) == settings.FACET_INDEX_BATCH_SIZE:
+                    documents += await self._documents(batch)
+                    batch = []
+                if len(documents) >= settings.FACET_INDEX_FLUSH_SIZE:
+                    await asyncio.to_thread(loaded.upsert_many, documents)
+                    documents = []
+            documents += await self._documents(batch)
+            await asyncio.to_thread(loaded.upsert_many, documents)
+        except Exception as e:
+            logger.error(f"Failed to load candidate facets: {str(e)}")
+            self._touched.clear()
+            return False
+        finally:
+            self._loading = False
+        # No await from here on: the replay and the swap happen before any other write can land
+        self._replay(loaded)
+        self.index = loaded
+        self.ready = True
+        self._touched.clear()
+        logger.info(f"Candidate facets loaded: {len(self.index)} users in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def _replay(self, loaded: FacetIndex) -> None:
+        """Copy the fields written through the listeners during the load from the live index onto loaded."""
+        for id, fields in self._touched.items():
+            values = self.index.document(id)
+            if values is None:
+                loaded.delete(id)
+            else:
+                loaded.upsert(id, {name: values.get(name, []) for name in fields})
+
+    async def _documents(self, users: Sequence[UserInDB]) -> List[Tuple[str, Dict[str, object]]]:
+        active = [user for user in users if user.is_active]
+        if not active:
+            return []
+        skills = await self.resume_repo.get_skills_by_user_ids([user.id for user in active])
+        documents = []
+        for user in active:
+            id = str(user.id)
+            values = {name: getattr(user, name) for name in USER_FIELDS}
+            values["skills"] = skills.get(user.id, [])
+            touched = self._touched.get(id)
+            if touched:
+                values = {name: value for name, value in values.items() if name not in touched}
+            documents.append((id, values))
+        return documents
+
+    # Index maintenance
+
+    def _touch(self, id: str, fields: Sequence[str]) -> None:
+        if self._loading:
+            self._touched.setdefault(id, set()).update(fields)
+
+    def index_users(self, users: Sequence[UserInDB]) -> None:
+        documents = []
+        for user in users:
+            if not user.is_active:
+                self.unindex(user.id)
+                continue
+            documents.append((str(user.id), {name: getattr(user, name) for name in USER_FIELDS}))
+            self._touch(str(user.id), USER_FIELDS)
+        self.index.upsert_many(documents)
+
+    def index_skills(self, resumes: Sequence[Resume]) -> None:
+        for resume in resumes:
+            self._touch(str(resume.user_id), ("skills",))
+        self.index.upsert_many((str(resume.user_id), {"skills": resume.skills}) for resume in resumes)
+
+    def unindex(self, user_id: UUID) -> None:
+        self._touch(str(user_id), FACET_FIELDS)
+        self.index.delete(str(user_id))
+
+    # Queries
+
+    async def search(
+        self,
+        query: Optional[Query],
+        offset: int,
+        limit: int
+    ) -> Tuple[int, List[UserInDB], Dict[str, List[Tuple[str, int]]]]:
+        """Total matches, one page of matching users (newest first) and facet counts over all matches."""
+        if not self.ready:
+            raise ServiceUnavailableException("Candidate search is still loading, please retry shortly.")
+        matches = self.index.evaluate(query)
+        ids = self.index.ids(matches, offset, limit)
+        if matches.bit_count() >= ITERATE_FACETS_BELOW:
+            # One AND + popcount per posting over a broad result takes milliseconds; keep it off the event loop
+            facets = await asyncio.to_thread(self.index.facets, matches, FACET_FIELDS, settings.FACET_VALUES_LIMIT)
+        else:
+            facets = self.index.facets(matches, FACET_FIELDS, settings.FACET_VALUES_LIMIT)
+        # Point lookups coalesce in the repository's loader into one query
+        users = await asyncio.gather(*(self.auth_repo.get_by_id(UUID(id)) for id in ids))
+        return matches.bit_count(), [user for user in users if user is not None], facets
+
+"""
+1. Index contents:
+    . One document per active user: country, user_type, work_status and the skill ids stored with their resume
+    . Loaded page by page on startup (FACET_INDEX_BATCH_SIZE users, skills fetched without resume text) and
+      bulk-inserted FACET_INDEX_FLUSH_SIZE users at a time; each worker holds its own copy
+    . The load fills a fresh FacetIndex whose inserts run on a worker thread, then swaps it in, so a
+      FACET_INDEX_FLUSH_SIZE insert (hundreds of ms) never stalls requests on the event loop
+
+2. Staying current:
+    . AuthRepository create/create_many/update/delete and ResumeRepository upserts reach the index through listeners
+    . A write that lands while the index is still loading goes to the live index and is recorded in _touched;
+      those fields are copied onto the loaded index just before the swap, so they win over older rows
+    . _touched is only kept while a load attempt runs: it is cleared when an attempt starts or fails
+    . A failed load (a Supabase error, a timeout) is retried after FACET_INDEX_RETRY_BASE_DELAY seconds, doubling
+      up to FACET_INDEX_RETRY_MAX_DELAY, so the route recovers from a transient outage without a restart
+    . Writes made through other workers are not seen until that worker restarts
+
+3. Queries:
+    . Routes build a Term/And/Or/Not tree; FacetIndex plans ANDs by posting cardinality
+    . Facet counts cover all matches, not just the page returned; over ITERATE_FACETS_BELOW matches they are
+      counted on a worker thread, which FacetIndex allows alongside writes from the event loop
+"""
@@ -0,0 +1,80 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.exceptions import AppException, NotFoundException
+from app.infrastructure.llm import PromptTemplate
+from app.infrastructure.llm_cache import CachedLLM
+from app.repositories.resume_repository import ResumeRepository
+
+logger = logging.getLogger(__name__)
+
+RESUME_EVALUATION_PROMPT = PromptTemplate(
+    name="resume_evaluation",
+    version="1",
+    system=(
+        "You are an experienced technical recruiter. Evaluate the resume for the target role. "
+        'Reply with JSON only: {"score": <integer 0-100>, "summary": "<at most five sentences on strengths and gaps>"}.'
+    ),
+    user="Target role: {role}\n\nResume:\n{resume}"
+)
+
+def parse_evaluation(text: str) -> Dict[str, Any]:
+    """The score and summary in a resume evaluation reply; raises ValueError when they are missing or out of range."""
+    text = text.strip()
+    # Models sometimes wrap the JSON in a markdown code fence despite the instruction
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    verdict = json.loads(text)
+    if not isinstance(verdict, dict):
+        raise ValueError("reply is not a JSON object")
+    score, summary = int(verdict["score"]), str(verdict["summary"])
+    if not 0 <= score <= 100:
+        raise ValueError(f"score {score} is outside 0-100")
+    return {"score": score, "summary": summary}
+
+class ResumeEvaluationService:
+    """AI evaluation of stored resumes, answered from the LLM response cache when the resume and role are unchanged."""
+
+    def __init__(self, resume_repo: Optional[ResumeRepository] = None, llm: Optional[CachedLLM] = None):
+        self.resume_repo = resume_repo or ResumeRepository()
+        self.llm = llm or CachedLLM.from_settings()
+
+    async def evaluate(self, user_id: UUID, role: str) -> Dict[str, Any]:
+        """Score and summary of the user's resume for a target role."""
+        resume = await self.resume_repo.get_by_user_id(user_id)
+        if resume is None:
+            raise NotFoundException("No resume uploaded yet.")
+        try:
+            # Unreadable replies raise here and are never cached, so asking again gets a fresh answer
+            response = await self.llm.generate(
+                RESUME_EVALUATION_PROMPT,
+                parse=parse_evaluation,
+                role=role,
+                resume=resume.text[:settings.LLM_MAX_INPUT_CHARS]
+            )
+        except AppException as e:
+            logger.error(f"Resume evaluation failed: {e.message}")
+            raise AppException("Failed to evaluate resume.")
+        return {
+            **response.parsed,
+            "model": response.model,
+            "prompt_version": response.prompt_version,
+            "cached": response.cached,
+        }
+
+"""
+1. Cost:
+    . An evaluation is one chat completion, by far the slowest and most expensive call the API makes
+    . CachedLLM keys it on model, RESUME_EVALUATION_PROMPT.version, params and the normalized role and resume text,
+      so evaluating an unchanged resume for the same role again is a cache hit
+
+2. Replies:
+    . parse_evaluation accepts the JSON bare or inside a markdown fence and checks score and summary
+    . CachedLLM only stores replies it accepts, so a malformed answer fails that request and the next one asks again
+
+3. Changing the prompt:
+    . Bump RESUME_EVALUATION_PROMPT.version with any change to its wording; earlier verdicts then stop being served
+"""
@@ -0,0 +1,409 @@
+import asyncio
+import io
+import logging
+import os
+import tempfile
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, List, Optional
+from uuid import UUID
+from fastapi import Request
+from app.core.config import settings
+from app.core.exceptions import (
+    AppException,
+    PayloadTooLargeException,
+    UnsupportedMediaTypeException,
+    ValidationException
+)
+from app.core.metrics import RESUME_PAGES_PARSED, RESUME_PARSE_DURATION, RESUME_UPLOAD_REJECTIONS
+from app.domain.resume.models import Resume, ResumePage
+from app.repositories.resume_repository import ResumeRepository
+from app.services.skill_service import get_skill_extractor
+from app.utils.document_text import Source, count_pdf_pages, extract_docx_sections, extract_pdf_pages
+from app.utils.process_pool import BoundedProcessPool
+
+logger = logging.getLogger(__name__)
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+SUPPORTED_TYPES = (PDF, DOCX)
+
+# libmagic needs the first few KB to tell an OOXML document from a plain zip
+SNIFF_BYTES = 4096
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+DOCX_PARAGRAPHS_PER_SECTION = 40
+
+class SpooledUpload:
+    """
+    An upload body held in memory up to memory_bytes, then spilled to a named temp file.
+
+    Writing past max_bytes raises PayloadTooLargeException, so an oversized
+    upload is cut off as soon as it crosses the limit rather than after it
+    has been read completely.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        memory_bytes: int,
+        tmp_dir: Optional[str] = None,
+        filename: Optional[str] = None
+    ):
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.tmp_dir = tmp_dir
+        self.filename = filename
+        self.size = 0
+        self.head = b""
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file = None
+
+    @classmethod
+    def from_settings(cls, filename: Optional[str] = None) -> "SpooledUpload":
+        return cls(settings.RESUME_MAX_BYTES, settings.RESUME_SPOOL_MEMORY_BYTES, settings.RESUME_TMP_DIR, filename)
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PayloadTooLargeException(f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB.")
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+        if self._buffer is not None and self.size > self.memory_bytes:
+            self._file = tempfile.NamedTemporaryFile(dir=self.tmp_dir, prefix="upload-", delete=False)
+            self._file.write(self._buffer.getvalue())
+            self._buffer = None
+        (self._buffer or self._file).write(chunk)
+
+    @property
+    def in_memory(self) -> bool:
+        return self._buffer is not None
+
+    def source(self) -> Source:
+        """The content as the parser jobs take it: bytes while in memory, else the temp file path."""
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        self._file.flush()
+        return self._file.name
+
+    def open(self):
+        """A readable binary file object over the content."""
+        if self._buffer is not None:
+            return io.BytesIO(self._buffer.getvalue())
+        self._file.flush()
+        return open(self._file.name, "rb")
+
+    def close(self) -> None:
+        self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class _MultipartSpooler:
+    """python-multipart callbacks that stream the first file part of a form into a SpooledUpload."""
+
+    def __init__(self, boundary: bytes, max_body_bytes: int):
+        from python_multipart.multipart import MultipartParser
+        self.max_body_bytes = max_body_bytes
+        self.received = 0
+        self.upload: Optional[SpooledUpload] = None
+        self._target: Optional[SpooledUpload] = None
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk: bytes) -> None:
+        self.received += len(chunk)
+        if self.received > self.max_body_bytes:
+            raise PayloadTooLargeException(f"Upload exceeds {settings.RESUME_MAX_BYTES // (1024 * 1024)} MB.")
+        self._parser.write(chunk)
+
+    def finalize(self) -> None:
+        self._parser.finalize()
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        from python_multipart.multipart import parse_options_header
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # Only the first file part is kept; plain form fields and later files are skipped
+        if b"filename" in options and self.upload is None:
+            filename = options[b"filename"].decode("utf-8", "replace")
+            self.upload = self._target = SpooledUpload.from_settings(os.path.basename(filename) or None)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._target is not None:
+            self._target.write(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._target = None
+
+async def spool_request(request: Request) -> SpooledUpload:
+    """
+    Stream the request body into a SpooledUpload, enforcing RESUME_MAX_BYTES while reading.
+
+    Accepts multipart/form-data (the first file part is used) or the raw file as
+    the body, with an optional filename in the X-Filename header.
+    """
+    content_type = request.headers.get("content-type", "")
+    multipart = content_type.startswith("multipart/form-data")
+    limit = settings.RESUME_MAX_BYTES + (MULTIPART_OVERHEAD_BYTES if multipart else 0)
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > limit:
+        RESUME_UPLOAD_REJECTIONS.labels("too_large").inc()
+        raise PayloadTooLargeException(f"Upload exceeds {settings.RESUME_MAX_BYTES // (1024 * 1024)} MB.")
+
+    try:
+        if not multipart:
+            upload = SpooledUpload.from_settings(request.headers.get("x-filename"))
+            try:
+                async for chunk in request.stream():
+                    upload.write(chunk)
+            except Exception:
+                upload.close()
+                raise
+            return upload
+
+        from python_multipart.multipart import parse_options_header
+        _, options = parse_options_header(content_type)
+        if b"boundary" not in options:
+            raise ValidationException("Multipart upload without a boundary.")
+        spooler = _MultipartSpooler(options[b"boundary"], limit)
+        try:
+            async for chunk in request.stream():
+                spooler.feed(chunk)
+            spooler.finalize()
+        except Exception:
+            if spooler.upload:
+                spooler.upload.close()
+            raise
+        if spooler.upload is None:
+            raise ValidationException("The form has no file part.")
+        return spooler.upload
+    except PayloadTooLargeException:
+        RESUME_UPLOAD_REJECTIONS.labels("too_large").inc()
+        raise
+
+@lru_cache(maxsize=None)
+def _libmagic():
+    """python-magic, or None where it (or the libmagic it wraps) is not installed."""
+    try:
+        import magic
+        return magic
+    except ImportError:
+        logger.warning("python-magic unavailable, sniffing uploads by signature only")
+        return None
+
+def _is_docx(upload: SpooledUpload) -> bool:
+    try:
+        with upload.open() as f, zipfile.ZipFile(f) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+def sniff_content_type(upload: SpooledUpload) -> str:
+    """The content type read from the upload's first bytes; the client's Content-Type is not trusted."""
+    magic = _libmagic()
+    detected = magic.from_buffer(upload.head, mime=True) if magic else None
+    if detected in SUPPORTED_TYPES:
+        return detected
+    if upload.head.startswith(b"%PDF-"):
+        return PDF
+    # A DOCX is a zip; older libmagic (or none) only reports the container
+    if upload.head.startswith(b"PK\x03\x04") and _is_docx(upload):
+        return DOCX
+    return detected or "application/octet-stream"
+
+class DocumentParserPool(BoundedProcessPool):
+    """Process pool for document text extraction, separate from the password pool."""
+    busy_message = "Resume parsing is busy, please retry shortly."
+
+    @classmethod
+    def from_settings(cls) -> "DocumentParserPool":
+        workers = settings.RESUME_PARSE_WORKERS or os.cpu_count() or 1
+        return cls(
+            workers=workers,
+            max_concurrency=settings.RESUME_PARSE_MAX_CONCURRENCY or workers,
+            max_queue=settings.RESUME_PARSE_MAX_QUEUE
+        )
+
+    def _on_rejected(self) -> None:
+        RESUME_UPLOAD_REJECTIONS.labels("busy").inc()
+
+document_parser_pool = DocumentParserPool.from_settings()
+
+class ResumeService:
+    def __init__(
+        self,
+        resume_repo: Optional[ResumeRepository] = None,
+        parser_pool: Optional[DocumentParserPool] = None
+    ):
+        self.resume_repo = resume_repo or ResumeRepository()
+        self.parser_pool = parser_pool or document_parser_pool
+
+    async def extract_pages(self, upload: SpooledUpload, content_type: str) -> AsyncIterator[ResumePage]:
+        """
+        Yield the upload's text page by page (section by section for DOCX) as the pool extracts it.
+
+        PDF pages are split into jobs of RESUME_PAGES_PER_JOB pages that run in
+        parallel on the pool; pages are still yielded in order.
+        """
+        source = upload.source()
+        if content_type == DOCX:
+            sections = await self.parser_pool.run(extract_docx_sections, source, DOCX_PARAGRAPHS_PER_SECTION)
+            for number, text in enumerate(sections[:settings.RESUME_MAX_PAGES], start=1):
+                yield ResumePage(number=number, text=text)
+            return
+
+        page_count = await self.parser_pool.run(count_pdf_pages, source)
+        if page_count > settings.RESUME_MAX_PAGES:
+            RESUME_UPLOAD_REJECTIONS.labels("too_many_pages").inc()
+            raise ValidationException(f"Resumes are limited to {settings.RESUME_MAX_PAGES} pages.")
+        step = settings.RESUME_PAGES_PER_JOB
+        starts = iter(range(0, page_count, step))
+        # At most one job per worker is outstanding for this upload; jobs finish in any order but are yielded in page order
+        window: Deque[asyncio.Future] = deque()
+
+        def submit_next() -> None:
+            start = next(starts, None)
+            if start is not None:
+                window.append(asyncio.ensure_future(
+                    self.parser_pool.run(extract_pdf_pages, source, start, min(start + step, page_count))
+                ))
+
+        for _ in range(self.parser_pool.workers):
+            submit_next()
+        try:
+            number = 0
+            while window:
+                texts = await window[0]
+                window.popleft()
+                submit_next()
+                for text in texts:
+                    number += 1
+                    yield ResumePage(number=number, text=text)
+        finally:
+            for job in window:
+                job.cancel()
+
+    def check_upload(self, upload: SpooledUpload) -> str:
+        """The upload's sniffed content type; raises unless it is a non-empty PDF or DOCX."""
+        if upload.size == 0:
+            raise ValidationException("The upload is empty.")
+        content_type = sniff_content_type(upload)
+        if content_type not in SUPPORTED_TYPES:
+            RESUME_UPLOAD_REJECTIONS.labels("unsupported_type").inc()
+            raise UnsupportedMediaTypeException(f"Resumes must be PDF or DOCX, got {content_type}.")
+        return content_type
+
+    async def _parse(self, upload: SpooledUpload, content_type: str) -> AsyncIterator[ResumePage]:
+        started = time.perf_counter()
+        pages = 0
+        try:
+            async for page in self.extract_pages(upload, content_type):
+                pages += 1
+                yield page
+        except AppException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to parse resume: {str(e)}")
+            RESUME_UPLOAD_REJECTIONS.labels("unreadable").inc()
+            raise ValidationException("The file could not be read as a resume.")
+        RESUME_PARSE_DURATION.labels(content_type).observe(time.perf_counter() - started)
+        RESUME_PAGES_PARSED.labels(content_type).inc(pages)
+
+    async def _store(self, user_id: UUID, upload: SpooledUpload, content_type: str, texts: List[str]) -> Resume:
+        now = datetime.utcnow()
+        text = "\n\n".join(text for text in texts if text)
+        return await self.resume_repo.upsert_for_user(Resume(
+            user_id=user_id,
+            filename=upload.filename,
+            content_type=content_type,
+            size_bytes=upload.size,
+            page_count=len(texts),
+            text=text,
+            # One automaton pass, a few ms; stored so facet search never has to rescan resumes
+            skills=sorted(get_skill_extractor().find(text[:settings.SKILL_MAX_TEXT_CHARS])),
+            created_at=now,
+            updated_at=now
+        ))
+
+    async def ingest(self, user_id: UUID, upload: SpooledUpload) -> AsyncIterator[ResumePage]:
+        """
+        Parse and store an upload as the user's resume, yielding pages as they are extracted.
+
+        The resume is stored after the last page; the caller owns (and closes) the upload.
+        """
+        content_type = self.check_upload(upload)
+        texts: List[str] = []
+        async for page in self._parse(upload, content_type):
+            texts.append(page.text)
+            yield page
+        await self._store(user_id, upload, content_type, texts)
+
+    async def upload_resume(self, user_id: UUID, upload: SpooledUpload) -> Resume:
+        """Parse and store an upload as the user's resume, returning the stored resume."""
+        content_type = self.check_upload(upload)
+        texts = [page.text async for page in self._parse(upload, content_type)]
+        return await self._store(user_id, upload, content_type, texts)
+
+    async def get_resume(self, user_id: UUID) -> Optional[Resume]:
+        return await self.resume_repo.get_by_user_id(user_id)
+
+"""
+1. Upload:
+    . spool_request reads the body as a stream; nothing is buffered by the framework first
+    . The first RESUME_SPOOL_MEMORY_BYTES stay in memory, the rest goes to a temp file in RESUME_TMP_DIR
+    . RESUME_MAX_BYTES is checked against Content-Length up front and against the bytes actually received while reading
+    . multipart/form-data is parsed incrementally with python-multipart; the first file part is the resume
+
+2. Type detection:
+    . From the first SNIFF_BYTES with libmagic (python-magic), falling back to the %PDF- / zip signatures
+    . A zip only counts as DOCX if it contains word/document.xml
+
+3. Parsing (DocumentParserPool, a BoundedProcessPool):
+    . pdfplumber and python-docx are CPU-bound and hold the GIL, so they run in worker processes
+    . A PDF is split into jobs of RESUME_PAGES_PER_JOB pages, at most one per worker outstanding per upload
+    . In-memory uploads are sent to the workers as bytes, spooled ones as a path, so large files are never pickled
+    . Pages are yielded in order as their job finishes, so a caller can stream them out
+    . Too many waiting jobs -> 503 (ServiceUnavailableException) instead of an unbounded queue
+
+4. Storage:
+    . One resume per user id, replaced by the next upload (ResumeRepository.upsert_for_user)
+    . The taxonomy skill ids found in the text are stored with it (Resume.skills) for facet search
+"""
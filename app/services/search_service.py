@@ -0,0 +1,246 @@
+import asyncio
+import logging
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+from app.core.config import settings
+from app.core.exceptions import NotFoundException
+from app.domain.auth.models import UserInDB
+from app.domain.resume.models import Resume
+from app.infrastructure.vector_index import VectorIndex
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.resume_repository import ResumeRepository
+from app.services.embedding_service import EmbeddingService, mean_vector, profile_text
+
+logger = logging.getLogger(__name__)
+
+# UserInDB fields the index can pre-filter on
+FILTER_ATTRIBUTES = ("country", "user_type", "work_status")
+
+class _UserListener:
+    def __init__(self, search: "CandidateSearchService"):
+        self.search = search
+
+    def saved(self, users: List[UserInDB]) -> None:
+        for user in users:
+            self.search.schedule(user.id, user)
+
+    def deleted(self, id: UUID) -> None:
+        self.search.unindex(id)
+
+class _ResumeListener:
+    def __init__(self, search: "CandidateSearchService"):
+        self.search = search
+
+    def saved(self, resumes: List[Resume]) -> None:
+        for resume in resumes:
+            self.search.schedule(resume.user_id)
+
+    def deleted(self, id: UUID) -> None:
+        # Only the resume id is known here; the profile is re-embedded on the user's next change
+        pass
+
+class CandidateSearchService:
+    """
+    Skills-based candidate discovery over a VectorIndex of profile embeddings.
+
+    A user's vector embeds their profile together with their resume text. The
+    index follows the repositories: registrations, profile updates and resume
+    uploads queue the user for re-embedding, which a background task does in
+    batches; deletes take effect at once.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        auth_repo: AuthRepository,
+        resume_repo: ResumeRepository,
+        index: Optional[VectorIndex] = None
+    ):
+        self.embedding_service = embedding_service
+        self.auth_repo = auth_repo
+        self.resume_repo = resume_repo
+        self.index = index or VectorIndex(embedding_service.backend.dimensions, FILTER_ATTRIBUTES)
+        self._pending: Dict[UUID, Optional[UserInDB]] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        auth_repo.add_listener(_UserListener(self))
+        resume_repo.add_listener(_ResumeListener(self))
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Map the last snapshot (if any) and start the indexing and compaction tasks."""
+        if settings.VECTOR_INDEX_PATH:
+            try:
+                loaded = await asyncio.to_thread(VectorIndex.load, settings.VECTOR_INDEX_PATH)
+            except Exception as e:
+                logger.error(f"Failed to load vector index: {str(e)}")
+                loaded = None
+            if loaded is not None and loaded.dimensions == self.index.dimensions:
+                self.index = loaded
+                logger.info(f"Vector index loaded with {len(loaded)} profiles")
+            elif loaded is not None:
+                logger.warning("Vector index snapshot has other dimensions than the embedding model; starting empty")
+        self._tasks = [asyncio.create_task(self._index_pending()), asyncio.create_task(self._compact_periodically())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if settings.VECTOR_INDEX_PATH and settings.VECTOR_INDEX_SAVE_ON_SHUTDOWN:
+            try:
+                await self.save()
+            except Exception as e:
+                logger.error(f"Failed to save vector index: {str(e)}")
+
+    async def save(self) -> str:
+        return await asyncio.to_thread(self.index.save, settings.VECTOR_INDEX_PATH)
+
+    # Index maintenance
+
+    def schedule(self, user_id: UUID, user: Optional[UserInDB] = None) -> None:
+        """Queue a user for (re-)embedding; the user is fetched first if not given."""
+        if user is not None or user_id not in self._pending:
+            self._pending[user_id] = user
+        self._wakeup.set()
+
+    def unindex(self, user_id: UUID) -> None:
+        self._pending.pop(user_id, None)
+        self.index.delete(str(user_id))
+
+    async def _index_pending(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch = dict(list(self._pending.items())[:settings.VECTOR_INDEX_BATCH_SIZE])
+                for user_id in batch:
+                    del self._pending[user_id]
+                try:
+                    missing = [user_id for user_id, user in batch.items() if user is None]
+                    fetched = await asyncio.gather(*(self.auth_repo.get_by_id(user_id) for user_id in missing))
+                    batch.update(zip(missing, fetched))
+                    for user_id in [user_id for user_id, user in batch.items() if user is None]:
+                        self.unindex(user_id)
+                    await self.index_users([user for user in batch.values() if user is not None])
+                except Exception as e:
+                    logger.error(f"Failed to index {len(batch)} profiles: {str(e)}")
+
+    async def index_users(self, users: Sequence[UserInDB]) -> None:
+        """Embed the users' profiles and resumes in one batched call and upsert them."""
+        active = [user for user in users if user.is_active]
+        for user in users:
+            if not user.is_active:
+                self.index.delete(str(user.id))
+        if not active:
+            return
+        resumes = await self.resume_repo.get_by_user_ids([user.id for user in active])
+        documents = [
+            "\n\n".join(filter(None, (profile_text(user), resumes[user.id].text if user.id in resumes else None)))
+            for user in active
+        ]
+        vectors = await self.embedding_service.embed_documents(documents)
+        for user, pairs in zip(active, vectors):
+            if not pairs:
+                continue
+            self.index.upsert(
+                str(user.id),
+                mean_vector([vector for _, vector in pairs], [chunk.tokens for chunk, _ in pairs]),
+                {name: getattr(user, name) for name in FILTER_ATTRIBUTES}
+            )
+
+    async def rebuild(self) -> int:
+        """Re-embed every user page by page (unchanged profiles only cost cache lookups) and save a snapshot."""
+        self.index = VectorIndex(self.index.dimensions, FILTER_ATTRIBUTES)
+        batch: List[UserInDB] = []
+        async for user in self.auth_repo.iter_all(settings.VECTOR_INDEX_BATCH_SIZE):
+            batch.append(user)
+            if len(batch) == settings.VECTOR_INDEX_BATCH_SIZE:
+                await self.index_users(batch)
+                batch = []
+        await self.index_users(batch)
+        if settings.VECTOR_INDEX_PATH:
+            await self.save()
+        return len(self.index)
+
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.VECTOR_INDEX_COMPACT_INTERVAL)
+            if self.index.dead_ratio >= settings.VECTOR_INDEX_COMPACT_RATIO:
+                try:
+                    await asyncio.to_thread(self.index.compact)
+                except Exception as e:
+                    logger.error(f"Failed to compact vector index: {str(e)}")
+
+    # Queries
+
+    async def search(self, query: str, k: int, filters: Mapping[str, Sequence[str]]) -> List[Tuple[UserInDB, float]]:
+        """The k users whose profile and resume best match a free-text query."""
+        vector = await self.embedding_service.embed_document(query)
+        if vector is None:
+            return []
+        return await self._top_users(vector, k, filters)
+
+    async def similar(self, user_id: UUID, k: int, filters: Mapping[str, Sequence[str]]) -> List[Tuple[UserInDB, float]]:
+        """The k users closest to an indexed user, excluding that user."""
+        vector = self.index.get(str(user_id))
+        if vector is None:
+            raise NotFoundException("User is not in the search index.")
+        return await self._top_users(vector, k, filters, exclude=str(user_id))
+
+    async def _top_users(
+        self,
+        vector,
+        k: int,
+        filters: Mapping[str, Sequence[str]],
+        exclude: Optional[str] = None
+    ) -> List[Tuple[UserInDB, float]]:
+        # A full scan of a large index is tens of ms of numpy work, which releases the GIL on a thread
+        hits = await asyncio.to_thread(self.index.search, vector, k, filters, exclude)
+        # Point lookups coalesce in the repository's loader into one query
+        users = await asyncio.gather(*(self.auth_repo.get_by_id(UUID(id)) for id, _ in hits))
+        # A snapshot can predate a deactivation made through another worker
+        return [(user, score) for user, (_, score) in zip(users, hits) if user is not None and user.is_active]
+
+async def rebuild_index() -> int:
+    """Rebuild the index from the database and write a snapshot to VECTOR_INDEX_PATH (run as a scheduled job)."""
+    from app.infrastructure.embedding_cache import close_embedding_cache
+    from app.infrastructure.supabase_client import SupabaseClient
+    from app.repositories.factory import create_auth_repository, uses_postgres
+    await SupabaseClient.connect()
+    if uses_postgres():
+        from app.infrastructure.postgres_client import PostgresClient
+        await PostgresClient.connect()
+    try:
+        search = CandidateSearchService(EmbeddingService(), create_auth_repository(), ResumeRepository())
+        return await search.rebuild()
+    finally:
+        if uses_postgres():
+            from app.infrastructure.postgres_client import PostgresClient
+            await PostgresClient.close()
+        await SupabaseClient.close()
+        close_embedding_cache()
+
+if __name__ == "__main__":
+    print(f"Indexed {asyncio.run(rebuild_index())} profiles")
+
+"""
+1. What is indexed:
+    . One vector per active user: profile_text plus the stored resume text, chunked and pooled by EmbeddingService
+    . country, user_type and work_status ride along as pre-filter attributes
+
+2. Staying current:
+    . Listeners on AuthRepository (create/create_many/update/delete) and ResumeRepository (upserts) queue users
+    . _index_pending embeds queued users VECTOR_INDEX_BATCH_SIZE at a time, so a bulk registration is a few requests
+    . Deletes and deactivations tombstone the row immediately; compaction runs on a thread every
+      VECTOR_INDEX_COMPACT_INTERVAL once VECTOR_INDEX_COMPACT_RATIO of the rows are dead
+
+3. Several workers:
+    . Each worker applies the writes it sees itself; writes made through other workers arrive with the next snapshot
+    . Snapshots are written by a scheduled rebuild: python -m app.services.search_service
+    . VECTOR_INDEX_SAVE_ON_SHUTDOWN (off by default) also saves each worker's own partial view on shutdown;
+      only turn it on with a single worker, since the last worker to stop would win
+    . Results are re-checked against the users table, so users deactivated since the snapshot are left out
+    . A rebuild re-embeds mostly from the embedding cache, so it costs cache lookups rather than API calls
+"""
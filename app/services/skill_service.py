@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from app.core.config import settings
+from app.core.exceptions import NotFoundException
+from app.domain.skills.models import Skill, SkillMatch
+from app.repositories.resume_repository import ResumeRepository
+from app.utils.aho_corasick import AhoCorasick, normalize_pattern
+from app.utils.process_pool import BoundedProcessPool
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_TAXONOMY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "domain", "skills", "taxonomy.json")
+
+class SkillTaxonomy:
+    """Canonical skills by id and the normalized terms (names and aliases) that map to them."""
+
+    def __init__(self, skills: Iterable[Skill], version: str = ""):
+        self.version = version
+        self.skills: Dict[str, Skill] = {}
+        self.terms: Dict[str, str] = {}
+        for skill in skills:
+            if skill.id in self.skills:
+                logger.warning(f"Duplicate skill id {skill.id} in taxonomy; keeping the first")
+                continue
+            self.skills[skill.id] = skill
+            for term in ([skill.name] if skill.match_name else []) + skill.aliases:
+                key = normalize_pattern(term)
+                owner = self.terms.setdefault(key, skill.id)
+                if owner != skill.id:
+                    logger.warning(f"Skill term '{term}' is claimed by {owner} and {skill.id}; keeping {owner}")
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        """A taxonomy from a JSON file of the form {"version": ..., "skills": [{"id", "name", "category", "aliases"}]}."""
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        return cls((Skill(**skill) for skill in data["skills"]), str(data.get("version", "")))
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def resolve(self, term: str) -> Optional[Skill]:
+        """The skill a name or alias refers to, or None."""
+        skill_id = self.terms.get(normalize_pattern(term))
+        return self.skills.get(skill_id) if skill_id else None
+
+class SkillExtractor:
+    """Finds taxonomy skills in free text with one Aho-Corasick pass, whatever the taxonomy size."""
+
+    def __init__(self, taxonomy: SkillTaxonomy):
+        self.taxonomy = taxonomy
+        self.automaton: AhoCorasick[str] = AhoCorasick(taxonomy.terms.items())
+
+    def find(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Offsets of every skill mentioned in text, by skill id.
+
+        Where occurrences overlap ("machine learning" and "learning") the
+        longest wins, so every span of text counts towards at most one skill.
+        """
+        matches = sorted(self.automaton.iter_matches(text), key=lambda match: (match[0], match[0] - match[1]))
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        covered = 0
+        for start, end, skill_id in matches:
+            if start < covered:
+                continue
+            covered = end
+            found.setdefault(skill_id, []).append((start, end))
+        return found
+
+    def to_matches(self, found: Dict[str, List[Tuple[int, int]]]) -> List[SkillMatch]:
+        """SkillMatch per skill in find() output, most frequent first."""
+        results = []
+        for skill_id, offsets in found.items():
+            skill = self.taxonomy.skills[skill_id]
+            # Fields are already valid; skipping validation halves the cost for skill-dense documents
+            results.append(SkillMatch.model_construct(
+                skill_id=skill_id, name=skill.name, category=skill.category, count=len(offsets), offsets=offsets
+            ))
+        results.sort(key=lambda match: (-match.count, match.offsets[0][0]))
+        return results
+
+    def extract(self, text: str) -> List[SkillMatch]:
+        """Skills mentioned in text, most frequent first."""
+        return self.to_matches(self.find(text))
+
+@lru_cache(maxsize=1)
+def get_skill_extractor() -> SkillExtractor:
+    """The extractor for SKILL_TAXONOMY_PATH, compiled once per process (the API worker and each pool worker)."""
+    taxonomy = SkillTaxonomy.load(settings.SKILL_TAXONOMY_PATH or BUNDLED_TAXONOMY)
+    extractor = SkillExtractor(taxonomy)
+    logger.info(f"Skill taxonomy compiled: {len(taxonomy)} skills, {len(taxonomy.terms)} terms, {len(extractor.automaton)} states")
+    return extractor
+
+def find_skills_batch(texts: List[str]) -> List[Dict[str, List[Tuple[int, int]]]]:
+    """
+    find() over several documents; runs on the pool, so it must stay importable at module level.
+
+    Plain dicts go back to the parent: pickling a SkillMatch costs more than finding it.
+    """
+    extractor = get_skill_extractor()
+    return [extractor.find(text) for text in texts]
+
+def _compile_taxonomy() -> int:
+    return len(get_skill_extractor().taxonomy)
+
+class SkillExtractionPool(BoundedProcessPool):
+    """Process pool for batch skill extraction; started on first use."""
+    busy_message = "Skill extraction is busy, please retry shortly."
+
+    @classmethod
+    def from_settings(cls) -> "SkillExtractionPool":
+        workers = settings.SKILL_POOL_WORKERS or os.cpu_count() or 1
+        return cls(workers=workers, max_concurrency=workers, max_queue=settings.SKILL_POOL_MAX_QUEUE)
+
+skill_extraction_pool = SkillExtractionPool.from_settings()
+
+class SkillService:
+    def __init__(
+        self,
+        resume_repo: Optional[ResumeRepository] = None,
+        pool: Optional[SkillExtractionPool] = None
+    ):
+        self.resume_repo = resume_repo or ResumeRepository()
+        self.pool = pool or skill_extraction_pool
+
+    async def warm(self) -> None:
+        """Compile the taxonomy in this process without blocking the event loop."""
+        try:
+            await asyncio.to_thread(get_skill_extractor)
+        except Exception as e:
+            logger.error(f"Failed to compile skill taxonomy: {str(e)}")
+
+    def extract(self, text: str) -> List[SkillMatch]:
+        """Skills in one document, scanned inline: a resume takes a few milliseconds."""
+        return get_skill_extractor().extract(text[:settings.SKILL_MAX_TEXT_CHARS])
+
+    async def extract_many(self, texts: Sequence[str]) -> List[List[SkillMatch]]:
+        """Skills in many documents, in SKILL_BATCH_SIZE slices spread over the process pool."""
+        texts = [text[:settings.SKILL_MAX_TEXT_CHARS] for text in texts]
+        slices = [texts[start:start + settings.SKILL_BATCH_SIZE] for start in range(0, len(texts), settings.SKILL_BATCH_SIZE)]
+        results = await asyncio.gather(*(self.pool.run(find_skills_batch, batch) for batch in slices))
+        extractor = get_skill_extractor()
+        return [extractor.to_matches(found) for batch in results for found in batch]
+
+    async def warm_pool(self) -> None:
+        """Spawn the pool workers and compile the taxonomy in each (for batch jobs that start right away)."""
+        await self.pool.spawn_all(_compile_taxonomy)
+
+    async def extract_for_user(self, user_id: UUID) -> List[SkillMatch]:
+        """Skills in the user's stored resume."""
+        resume = await self.resume_repo.get_by_user_id(user_id)
+        if resume is None:
+            raise NotFoundException("No resume uploaded yet.")
+        return self.extract(resume.text)
+
+"""
+1. Taxonomy:
+    . app/domain/skills/taxonomy.json (or SKILL_TAXONOMY_PATH): canonical ids, display names, categories and aliases
+    . Names and aliases are normalized like scanned text (case folded, whitespace collapsed) and map to one id;
+      conflicting aliases are logged and the first skill keeps them
+
+2. Extraction:
+    . One AhoCorasick automaton per process over all terms, compiled on startup (warm) or first use
+    . A scan is linear in the document length, so 20k terms cost the same per character as 200
+    . Overlapping occurrences resolve to the longest; results carry counts and character offsets into the text
+
+3. Batch mode:
+    . extract_many sends SKILL_BATCH_SIZE documents per job to SkillExtractionPool, which spawns its workers on first use
+    . Each worker compiles the automaton once and keeps it for every later job
+"""
@@ -0,0 +1,127 @@
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# Whitespace variants collapse to a plain space, so "machine\nlearning" matches "machine learning"
+_SPACE_TABLE = str.maketrans({char: " " for char in "\t\n\r\x0b\x0c\xa0\u2002\u2003\u2009\u200a\u202f\u3000"})
+
+def fold(text: str) -> str:
+    """Case-folded text of exactly the same length, so match offsets index the original."""
+    text = text.translate(_SPACE_TABLE)
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded
+    # A few characters fold to several ("ß" -> "ss"); those fall back to lower() or stay as they are
+    return "".join(
+        char.casefold() if len(char.casefold()) == 1 else char.lower() if len(char.lower()) == 1 else char
+        for char in text
+    )
+
+def normalize_pattern(pattern: str) -> str:
+    """A pattern folded the way scanned text is, with runs of spaces collapsed."""
+    return " ".join(fold(pattern).split())
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class AhoCorasick(Generic[V]):
+    """
+    Multi-pattern matcher: every occurrence of every pattern in one pass over the text.
+
+    Matching is case-insensitive, treats any run of whitespace as one space
+    and only reports whole-word occurrences: a pattern that starts (ends) with
+    a letter or digit must not be preceded (followed) by one.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, V]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (length, value, check start boundary, check end boundary) of every pattern ending there
+        self._out: List[Tuple[Tuple[int, V, bool, bool], ...]] = [()]
+        self.patterns = 0
+        for pattern, value in patterns:
+            self._add(normalize_pattern(pattern), value)
+        self._link()
+
+    def _add(self, pattern: str, value: V) -> None:
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] += ((len(pattern), value, _is_word(pattern[0]), _is_word(pattern[-1])),)
+        self.patterns += 1
+
+    def _link(self) -> None:
+        # Breadth-first, so a state's failure target is final before its children are linked
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Patterns that are suffixes of this one are reported here too
+                self._out[child] += self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, V]]:
+        """(start, end, value) of every whole-word occurrence, ordered by end offset."""
+        folded = fold(text)
+        size = len(folded)
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        previous_space = True
+        # Offset of each consumed character; collapsed spaces are skipped, so match starts are looked up here
+        consumed: List[int] = []
+        for index, char in enumerate(folded):
+            if char == " ":
+                if previous_space:
+                    continue
+                previous_space = True
+            else:
+                previous_space = False
+            consumed.append(index)
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if out[state]:
+                end = index + 1
+                for length, value, check_start, check_end in out[state]:
+                    start = consumed[-length]
+                    if check_start and start and _is_word(folded[start - 1]):
+                        continue
+                    if check_end and end < size and _is_word(folded[end]):
+                        continue
+                    yield start, end, value
+
+"""
+1. Automaton:
+    . A trie of the folded patterns plus failure links, built breadth-first; output lists are merged along the
+      failure links so suffix patterns ("script" inside "javascript") need no extra walk
+    . Scanning is linear in the text length plus the number of matches, independent of the number of patterns
+
+2. Normalization:
+    . Text and patterns go through the same fold(): whitespace to spaces, then casefold with a length-preserving fallback
+    . Offsets always refer to the original text
+
+3. Word boundaries are checked per match against the folded text; "java" does not match inside "javascript"
+"""
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Returned by TTLCache.get when a key is absent, so a cached None (negative entry) stays distinguishable
+MISSING: Any = object()
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "negative_hits": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: K) -> V:
+        """Return the cached value (None for a negative entry) or MISSING."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return MISSING
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self._counters["negative_hits" if value is None else "hits"] += 1
+        return value
+
+    def peek(self, key: K) -> V:
+        """Like get, but without touching LRU order or the counters."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return MISSING
+        return entry[0]
+
+    def set(self, key: K, value: Optional[V]) -> None:
+        """Cache a value; None is stored as a negative entry with the shorter negative TTL."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["negative_hits"] + self._counters["misses"]
+        hit_rate = (self._counters["hits"] + self._counters["negative_hits"]) / lookups if lookups else 0.0
+        return {**self._counters, "size": len(self._entries), "max_size": self.max_size, "hit_rate": round(hit_rate, 4)}
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        """Run fn() unless a call for key is already in flight, in which case wait for its result."""
+        self._counters["calls"] += 1
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self._counters["shared"] += 1
+        # Shielded so one cancelled caller does not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "in_flight": len(self._calls)}
+
+"""
+1. TTLCache:
+    . OrderedDict in LRU order; the oldest entry is evicted once max_size is exceeded
+    . Entries expire ttl seconds after they were set
+    . None values are negative entries ("known not to exist") and use negative_ttl
+    . get returns MISSING on a miss, so callers can tell a negative hit from a miss
+
+2. SingleFlight:
+    . The first caller for a key starts the work as a task
+    . Later callers for the same key await the same task instead of repeating the work
+    . The key is released as soon as the task finishes, successfully or not
+"""
@@ -0,0 +1,60 @@
+import io
+import re
+from typing import List, Union
+
+# bytes for uploads still held in memory, a file path for uploads spooled to disk
+Source = Union[bytes, str]
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _clean(text: str) -> str:
+    return _BLANK_LINES.sub("\n\n", text.replace("\x00", "")).strip()
+
+def count_pdf_pages(source: Source) -> int:
+    """Number of pages, read from the page tree without parsing any page content."""
+    import pdfplumber
+    with pdfplumber.open(_open(source)) as pdf:
+        return len(pdf.pages)
+
+def extract_pdf_pages(source: Source, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop), one string per page."""
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(_open(source), pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(_clean(page.extract_text() or ""))
+            # pdfplumber caches layout objects per page; drop them so long documents stay flat
+            page.close()
+    return texts
+
+def extract_docx_sections(source: Source, paragraphs_per_section: int) -> List[str]:
+    """
+    Text of a .docx file split into sections of paragraphs_per_section paragraphs.
+
+    DOCX has no pages; sections stand in for them. Tables follow the body paragraphs.
+    """
+    import docx
+    document = docx.Document(_open(source))
+    blocks = [paragraph.text for paragraph in document.paragraphs if paragraph.text.strip()]
+    for table in document.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                blocks.append(" | ".join(cells))
+    return [
+        _clean("\n".join(blocks[start:start + paragraphs_per_section]))
+        for start in range(0, len(blocks), paragraphs_per_section)
+    ]
+
+"""
+1. Runs in the resume parser pool:
+    . Every function here is a pool job; results are plain lists of str so they pickle cheaply
+    . pdfplumber and python-docx are imported inside the jobs, only the worker processes load them
+
+2. Sources:
+    . Small uploads are passed as bytes, spooled uploads as the path of their temp file
+    . A PDF job opens the file itself and only parses the pages it was asked for
+"""
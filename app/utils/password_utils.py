@@ -1,29 +1,419 @@
-import re
-from passlib.context import CryptContext
-from zxcvbn import zxcvbn
+import asyncio
+import fcntl
+import hashlib
+import json
+import math
+import os
+import socket
+import string
+import time
+from functools import lru_cache
+from typing import IO, Any, Dict, Optional, Tuple
+import logging
+from app.core.config import settings
+from app.core.metrics import (
+    PASSWORD_OPERATION_DURATION,
+    PASSWORD_OPERATIONS_IN_PROGRESS,
+    PASSWORD_POLICY_VERDICTS,
+    PASSWORD_QUEUE_WAIT,
+    PASSWORD_REJECTIONS
+)
+from app.utils.cache import MISSING, TTLCache
+from app.utils.process_pool import BoundedProcessPool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# A password needs at least one character of each class
+CHARACTER_CLASSES = (
+    frozenset(string.ascii_uppercase),
+    frozenset(string.ascii_lowercase),
+    frozenset(string.digits),
+    frozenset("+#!?@$%^&*-"),
+)
+
+@lru_cache(maxsize=None)
+def pwd_context(rounds: Optional[int] = None):
+    """
+    The bcrypt CryptContext for a cost (None: passlib's default), built on first use.
+
+    Hashes are made at `rounds`; needs_update flags stored hashes more than
+    PASSWORD_BCRYPT_REHASH_TOLERANCE rounds away from it.
+    Hashing only runs in the pool workers, so the API process never imports passlib.
+    """
+    from passlib.context import CryptContext
+    if rounds is None:
+        return CryptContext(schemes=["bcrypt"], deprecated="auto")
+    tolerance = settings.PASSWORD_BCRYPT_REHASH_TOLERANCE
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=max(4, rounds - tolerance),
+        bcrypt__max_rounds=min(31, rounds + tolerance)
+    )
+
+class PasswordPolicy:
+    """
+    Length bounds, one character of each class, and a minimum zxcvbn score.
+
+    Composition is cheap and checked in one pass over the password. The zxcvbn
+    estimate costs grow steeply with length, so it only sees the first
+    strength_max_chars characters; a weak prefix fails the whole password.
+    Strength verdicts of recent passwords are cached under a hash keyed with
+    a per-process random salt, so neither the password nor a plain digest of
+    it is kept in memory.
+    """
+
+    def __init__(
+        self,
+        min_length: int,
+        max_length: int,
+        min_score: int,
+        strength_max_chars: int,
+        cache_size: int,
+        cache_ttl: float
+    ):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.min_score = min_score
+        self.strength_max_chars = strength_max_chars
+        self._salt = os.urandom(16)
+        self._verdicts: TTLCache[bytes, bool] = TTLCache(cache_size, cache_ttl)
+
+    @classmethod
+    def from_settings(cls) -> "PasswordPolicy":
+        """Build a policy from the application settings."""
+        return cls(
+            min_length=settings.PASSWORD_MIN_LENGTH,
+            max_length=settings.PASSWORD_MAX_LENGTH,
+            min_score=settings.PASSWORD_MIN_SCORE,
+            strength_max_chars=settings.PASSWORD_STRENGTH_MAX_CHARS,
+            cache_size=settings.PASSWORD_VERDICT_CACHE_SIZE,
+            cache_ttl=settings.PASSWORD_VERDICT_CACHE_TTL
+        )
+
+    def check_composition(self, password: str) -> Optional[str]:
+        """The rule the password breaks (too_short, too_long, composition), or None."""
+        if len(password) < self.min_length:
+            return "too_short"
+        if len(password) > self.max_length:
+            return "too_long"
+        characters = set(password)
+        if any(characters.isdisjoint(character_class) for character_class in CHARACTER_CLASSES):
+            return "composition"
+        return None
+
+    def check_strength(self, password: str) -> bool:
+        """Whether zxcvbn scores the password (its first strength_max_chars characters) at least min_score."""
+        # Imported here: zxcvbn builds its ranked dictionaries on import, which only pool workers should pay for
+        from zxcvbn import zxcvbn
+        return zxcvbn(password[:self.strength_max_chars])["score"] >= self.min_score
+
+    def validate(self, password: str) -> bool:
+        return self.check_composition(password) is None and self.check_strength(password)
+
+    def cached_strength(self, password: str) -> Optional[bool]:
+        """The remembered strength verdict for the password, None if there is none."""
+        verdict = self._verdicts.get(self._key(password))
+        return None if verdict is MISSING else verdict
+
+    def remember_strength(self, password: str, strong: bool) -> None:
+        self._verdicts.set(self._key(password), strong)
+
+    def _key(self, password: str) -> bytes:
+        estimated = password[:self.strength_max_chars].encode("utf-8", "surrogatepass")
+        return hashlib.blake2b(estimated, key=self._salt, digest_size=16).digest()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._verdicts.stats()
+
+password_policy = PasswordPolicy.from_settings()
 
 def validate_password(password: str) -> bool:
-    if len(password) < 12:
-        return False
-    if not re.search(r"[A-Z]", password):
-        return False
-    if not re.search(r"[a-z]", password):
-        return False
-    if not re.search(r"[0-9]", password):
-        return False
-    if not re.search(r"[+#!?@$%^&*-]", password):
+    return password_policy.validate(password)
+
+def check_strength(password: str) -> bool:
+    return password_policy.check_strength(password)
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    return pwd_context(rounds).hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context().verify(plain_password, hashed_password)
+
+def hash_password_if_valid(password: str, rounds: Optional[int] = None) -> Optional[str]:
+    """Validate and hash in one call, so a pool job covers both. None means too weak."""
+    return hash_password(password, rounds) if validate_password(password) else None
+
+def rehash_if_needed(password: str, password_hash: str, rounds: int) -> Optional[str]:
+    """A new hash at `rounds` when the stored one was made at a cost too far from it (or a deprecated scheme), else None."""
+    context = pwd_context(rounds)
+    return context.hash(password) if context.needs_update(password_hash) else None
+
+def calibrate_rounds(target_seconds: float, min_rounds: int, max_rounds: int, probe_rounds: int = 8) -> Tuple[int, float]:
+    """
+    The highest bcrypt cost whose hash takes at most target_seconds on this
+    machine (clamped to min_rounds..max_rounds), and its measured seconds.
+
+    Every round doubles the work, so the cost is extrapolated from the best of
+    three hashes at the cheap probe_rounds and then timed once; if that single
+    hash overshoots the target by half, the next lower cost is taken.
+    """
+    def timed(rounds: int) -> float:
+        started = time.perf_counter()
+        hash_password("calibration", rounds)
+        return time.perf_counter() - started
+
+    probe = min(timed(probe_rounds) for _ in range(3))
+    rounds = probe_rounds + math.floor(math.log2(target_seconds / probe))
+    rounds = max(min_rounds, min(max_rounds, rounds))
+    seconds = timed(rounds)
+    if seconds > target_seconds * 1.5 and rounds > min_rounds:
+        rounds, seconds = rounds - 1, seconds / 2
+    return rounds, seconds
+
+def calibration_key() -> Dict[str, Any]:
+    """What a recorded calibration is only valid for: this host and the current target and bounds."""
+    return {
+        "host": socket.gethostname(),
+        "target_seconds": settings.PASSWORD_HASH_TARGET_SECONDS,
+        "min_rounds": settings.PASSWORD_BCRYPT_MIN_ROUNDS,
+        "max_rounds": settings.PASSWORD_BCRYPT_MAX_ROUNDS,
+    }
+
+def read_calibration(path: str, key: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+    """The (rounds, seconds) recorded at path for key, None if there is none or it was made for something else."""
+    try:
+        with open(path) as f:
+            record = json.load(f)
+        if record.get("key") != key:
+            return None
+        return int(record["rounds"]), float(record["hash_seconds"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def write_calibration(path: str, key: Dict[str, Any], rounds: int, seconds: float) -> None:
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"key": key, "rounds": rounds, "hash_seconds": seconds, "measured_at": time.time()}, f)
+    os.replace(f"{path}.tmp", path)
+
+def _exclusive_lock(path: str) -> IO[str]:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lock = open(path, "w")
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    return lock
+
+def warm_worker() -> int:
+    """Import passlib and zxcvbn in a pool worker ahead of the first real job."""
+    pwd_context()
+    password_policy.check_strength("warm-up")
+    return os.getpid()
+
+class PasswordExecutor(BoundedProcessPool):
+    """Runs CPU-heavy password work on a bounded process pool, off the event loop."""
+    busy_message = "Password service is busy, please retry shortly."
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int, rounds: Optional[int] = None):
+        super().__init__(workers, max_concurrency, max_queue)
+        # bcrypt cost of new hashes: pinned by PASSWORD_BCRYPT_ROUNDS or set by calibrate(); None is passlib's default
+        self.rounds = rounds
+
+    @classmethod
+    def from_settings(cls) -> "PasswordExecutor":
+        """Build an executor from the application settings."""
+        workers = settings.PASSWORD_POOL_WORKERS or os.cpu_count() or 1
+        return cls(
+            workers=workers,
+            max_concurrency=settings.PASSWORD_POOL_MAX_CONCURRENCY or workers,
+            max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+            rounds=settings.PASSWORD_BCRYPT_ROUNDS
+        )
+
+    async def warm(self) -> None:
+        """
+        Spawn every worker and import the hashing libraries in it, so the first
+        registration or login after a cold start does not pay for either.
+        """
+        started = time.perf_counter()
+        try:
+            pids = await self.spawn_all(warm_worker)
+            logger.info("Password pool warm", extra={
+                "workers": len(set(pids)),
+                "warm_seconds": round(time.perf_counter() - started, 3)
+            })
+        except Exception as e:
+            logger.error(f"Failed to warm password pool: {str(e)}")
+
+    async def prepare(self, warm: bool) -> None:
+        """
+        Warm the workers if asked to, then calibrate the bcrypt cost. Calibration
+        runs either way (new hashes would otherwise keep passlib's default cost),
+        but after warming so worker start-up does not skew the timing.
+        """
+        if warm:
+            await self.warm()
+        await self.calibrate()
+
+    async def calibrate(self) -> None:
+        """
+        Set the cost of new hashes so one takes about PASSWORD_HASH_TARGET_SECONDS.
+        A pinned PASSWORD_BCRYPT_ROUNDS skips this. With PASSWORD_CALIBRATION_PATH
+        set, only the first worker on the host times bcrypt and the others reuse
+        what it recorded there; otherwise every worker times it itself.
+        """
+        if settings.PASSWORD_BCRYPT_ROUNDS:
+            return
+        path = settings.PASSWORD_CALIBRATION_PATH
+        try:
+            if path:
+                rounds, seconds, measured = await self._calibrate_shared(path)
+            else:
+                (rounds, seconds), measured = await self._measure(), True
+        except Exception as e:
+            logger.error(f"Failed to calibrate bcrypt cost: {str(e)}")
+            return
+        self.rounds = rounds
+        logger.info("bcrypt cost calibrated" if measured else "bcrypt cost loaded", extra={
+            "rounds": rounds,
+            "hash_seconds": round(seconds, 3),
+            "target_seconds": settings.PASSWORD_HASH_TARGET_SECONDS
+        })
+
+    async def _calibrate_shared(self, path: str) -> Tuple[int, float, bool]:
+        # Workers booting together queue on the lock, so the host is timed once and by one worker at a time
+        key = calibration_key()
+        lock = await asyncio.to_thread(_exclusive_lock, f"{path}.lock")
+        try:
+            recorded = await asyncio.to_thread(read_calibration, path, key)
+            if recorded is not None:
+                return recorded[0], recorded[1], False
+            rounds, seconds = await self._measure()
+            await asyncio.to_thread(write_calibration, path, key, rounds, seconds)
+            return rounds, seconds, True
+        finally:
+            lock.close()
+
+    async def _measure(self) -> Tuple[int, float]:
+        return await self.run(
+            calibrate_rounds,
+            settings.PASSWORD_HASH_TARGET_SECONDS,
+            settings.PASSWORD_BCRYPT_MIN_ROUNDS,
+            settings.PASSWORD_BCRYPT_MAX_ROUNDS
+        )
+
+    def _on_rejected(self) -> None:
+        PASSWORD_REJECTIONS.inc()
+
+    def _on_started(self, operation: str, queue_wait: float) -> None:
+        PASSWORD_QUEUE_WAIT.labels(operation).observe(queue_wait)
+        PASSWORD_OPERATIONS_IN_PROGRESS.inc()
+
+    def _on_finished(self, operation: str, duration: float) -> None:
+        PASSWORD_OPERATIONS_IN_PROGRESS.dec()
+        PASSWORD_OPERATION_DURATION.labels(operation).observe(duration)
+
+password_executor = PasswordExecutor.from_settings()
+
+def _precheck(password: str) -> Optional[bool]:
+    """The verdict when it needs no pool job (composition failure or a cached strength verdict), else None."""
+    rule = password_policy.check_composition(password)
+    if rule:
+        PASSWORD_POLICY_VERDICTS.labels(rule, "policy").inc()
         return False
+    strong = password_policy.cached_strength(password)
+    if strong is not None:
+        PASSWORD_POLICY_VERDICTS.labels("strong" if strong else "weak", "cache").inc()
+    return strong
+
+def _estimated(password: str, strong: bool) -> None:
+    password_policy.remember_strength(password, strong)
+    PASSWORD_POLICY_VERDICTS.labels("strong" if strong else "weak", "estimator").inc()
+
+async def validate_password_async(password: str) -> bool:
+    verdict = _precheck(password)
+    if verdict is None:
+        verdict = await password_executor.run(check_strength, password)
+        _estimated(password, verdict)
+    return verdict
+
+async def hash_password_async(password: str) -> str:
+    return await password_executor.run(hash_password, password, password_executor.rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
 
-    # zxcvbn strength check (score 3 or 4 is strong)
-    result = zxcvbn(password)
-    if result["score"] < 3:
+async def hash_password_if_valid_async(password: str) -> Optional[str]:
+    verdict = _precheck(password)
+    if verdict is False:
+        return None
+    if verdict:
+        return await password_executor.run(hash_password, password, password_executor.rounds)
+    password_hash = await password_executor.run(hash_password_if_valid, password, password_executor.rounds)
+    _estimated(password, password_hash is not None)
+    return password_hash
+
+def bcrypt_rounds(password_hash: str) -> Optional[int]:
+    """The cost of a bcrypt hash ($2b$12$...), None for anything else."""
+    parts = password_hash.split("$")
+    if len(parts) == 4 and parts[1] in ("2a", "2b", "2y") and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Whether a stored hash may be off the current cost and is worth a pool job.
+
+    Reads the cost off the hash in the API process, so logins of users whose
+    hash is current cost nothing; passlib's needs_update on the pool decides
+    for the rest. False while the cost is neither pinned nor calibrated.
+    """
+    rounds = password_executor.rounds
+    if rounds is None:
         return False
-    return True
+    stored = bcrypt_rounds(password_hash)
+    return stored is None or abs(stored - rounds) > settings.PASSWORD_BCRYPT_REHASH_TOLERANCE
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def rehash_password_if_needed_async(password: str, password_hash: str) -> Optional[str]:
+    """A new hash at the current cost when passlib says the stored one needs updating, else None."""
+    return await password_executor.run(rehash_if_needed, password, password_hash, password_executor.rounds)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password) 
\ No newline at end of file
+if __name__ == "__main__":
+    # Measure this machine without starting the app, e.g. to pin PASSWORD_BCRYPT_ROUNDS in a deployment
+    rounds, seconds = calibrate_rounds(
+        settings.PASSWORD_HASH_TARGET_SECONDS, settings.PASSWORD_BCRYPT_MIN_ROUNDS, settings.PASSWORD_BCRYPT_MAX_ROUNDS
+    )
+    print(json.dumps({
+        "rounds": rounds,
+        "hash_seconds": round(seconds, 3),
+        "target_seconds": settings.PASSWORD_HASH_TARGET_SECONDS
+    }))
+
+"""
+1. Policy (PasswordPolicy):
+    . Length bounds first, then one set() pass over the password for the four character classes
+    . zxcvbn only sees the first PASSWORD_STRENGTH_MAX_CHARS characters; its cost grows steeply with
+      length (and zxcvbn itself raises past 72 characters)
+    . Pool workers import zxcvbn, and build its ranked dictionaries, when they are warmed at startup
+
+2. API process vs pool:
+    . Composition failures and cached strength verdicts are answered in the API process, without a pool job
+    . Otherwise the estimate runs on the pool (together with the hash for registrations) and its verdict is cached
+    . Cache keys are keyed BLAKE2b digests of the estimated prefix; the key is random per process and entries
+      expire after PASSWORD_VERDICT_CACHE_TTL
+
+3. bcrypt cost:
+    . PasswordExecutor.calibrate times bcrypt on a pool worker once the app is ready (after warm-up when
+      PASSWORD_POOL_WARM is on, on its own otherwise) and picks the highest cost within
+      PASSWORD_HASH_TARGET_SECONDS, between PASSWORD_BCRYPT_MIN_ROUNDS and PASSWORD_BCRYPT_MAX_ROUNDS
+    . The cost travels with each pool job, so workers need no shared state; until calibration ends passlib's default is used
+    . Uvicorn workers share one calibration per host: the first to take the flock on PASSWORD_CALIBRATION_PATH.lock
+      times bcrypt and records {rounds, hash_seconds} with the host name, target and bounds it was made for; the
+      others wait on the lock and reuse the record, so N workers booting together neither time bcrypt N times nor
+      time it against each other's warm-up. A record for another host, target or bounds is measured again; delete
+      the file to re-measure after a hardware change
+    . Fleets (or hosts whose data directory is not shared by all workers) should pin the cost instead: run
+      `python -m app.utils.password_utils` once on the target hardware and set PASSWORD_BCRYPT_ROUNDS to its rounds
+    . PASSWORD_BCRYPT_ROUNDS pins the cost; `python -m app.utils.password_utils` prints what calibration would pick here
+    . After a successful login AuthService rehashes the stored hash in the background when it is more than
+      PASSWORD_BCRYPT_REHASH_TOLERANCE rounds off; needs_rehash screens in the API process, needs_update decides
+"""
@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.exceptions import ServiceUnavailableException
+
+class BoundedProcessPool:
+    """
+    Runs CPU-heavy work on a spawn-context process pool, off the event loop.
+
+    At most max_concurrency jobs are in flight; once max_queue callers are
+    waiting for a slot, further callers are rejected instead of queued.
+    Subclasses hook their metrics into _on_rejected/_on_started/_on_finished.
+    """
+    busy_message = "Service is busy, please retry shortly."
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "queue_wait_seconds": 0.0,
+            "queue_wait_max_seconds": 0.0,
+            "execution_seconds": 0.0,
+            "execution_max_seconds": 0.0,
+        }
+
+    def start(self) -> None:
+        """Start the worker processes (called on startup, or lazily on first use)."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, abandoning work that has not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) in the pool.
+
+        Raises ServiceUnavailableException instead of queueing once max_queue
+        callers are already waiting for a free slot.
+        """
+        if self._waiting >= self.max_queue:
+            self._counters["rejected"] += 1
+            self._on_rejected()
+            raise ServiceUnavailableException(self.busy_message)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.start()
+
+        self._counters["submitted"] += 1
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        operation = fn.__name__
+        self._record("queue_wait", started_at - queued_at)
+        self._running += 1
+        self._on_started(operation, started_at - queued_at)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+            self._counters["completed"] += 1
+            return result
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+            self._record("execution", time.perf_counter() - started_at)
+            self._on_finished(operation, time.perf_counter() - started_at)
+
+    async def spawn_all(self, fn: Callable[[], Any]) -> list:
+        """Run fn once per worker at the same time, which makes the pool spawn every worker now."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(self._pool, fn) for _ in range(self.workers)))
+
+    def _on_rejected(self) -> None:
+        pass
+
+    def _on_started(self, operation: str, queue_wait: float) -> None:
+        pass
+
+    def _on_finished(self, operation: str, duration: float) -> None:
+        pass
+
+    def _record(self, name: str, seconds: float) -> None:
+        self._counters[f"{name}_seconds"] += seconds
+        self._counters[f"{name}_max_seconds"] = max(self._counters[f"{name}_max_seconds"], seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the current queue depth and in-flight count."""
+        return {**self._counters, "waiting": self._waiting, "running": self._running}
+
+"""
+1. Why a process pool:
+    . bcrypt, zxcvbn and PDF parsing hold the GIL; on a thread they would still stall every request
+    . The spawn context starts clean interpreters, safe next to the event loop's threads
+
+2. Bounds:
+    . The semaphore caps jobs in flight, so a burst cannot queue unbounded work inside the executor
+    . max_queue caps callers waiting for a slot; beyond it callers get a 503 right away
+
+3. Users: PasswordExecutor (app/utils/password_utils.py), DocumentParserPool (app/services/resume_service.py)
+   and SkillExtractionPool (app/services/skill_service.py),
+   each with its own workers so a burst of uploads cannot starve logins
+"""
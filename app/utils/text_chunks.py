@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
+# An offline, byte-level encoding: one token per UTF-8 byte, for the fake embedder and air-gapped runs
+BYTES_ENCODING = "bytes"
+
+@dataclass(frozen=True)
+class TextChunk:
+    """A token-bounded slice of a document."""
+    index: int
+    text: str
+    tokens: int
+
+@lru_cache(maxsize=None)
+def get_encoder(name: str):
+    """
+    The tiktoken encoding called name, loaded once per process.
+
+    tiktoken downloads the BPE ranks on first use (cached under TIKTOKEN_CACHE_DIR);
+    BYTES_ENCODING needs no download.
+    """
+    import tiktoken
+    if name == BYTES_ENCODING:
+        return tiktoken.Encoding(
+            name=BYTES_ENCODING,
+            pat_str=r"\s*\S+|\s+",
+            mergeable_ranks={bytes([byte]): byte for byte in range(256)},
+            special_tokens={}
+        )
+    return tiktoken.get_encoding(name)
+
+def chunk_text(text: str, encoder, max_tokens: int, overlap: int = 0) -> List[TextChunk]:
+    """
+    Split text into chunks of at most max_tokens tokens.
+
+    Consecutive chunks share overlap tokens so a sentence cut at a boundary
+    still appears whole in one of them.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    tokens = encoder.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return [TextChunk(index=0, text=text, tokens=len(tokens))]
+
+    stride = max(max_tokens - overlap, 1)
+    chunks = []
+    for start in range(0, len(tokens), stride):
+        window = tokens[start:start + max_tokens]
+        chunk = encoder.decode(window).strip()
+        if chunk:
+            chunks.append(TextChunk(index=len(chunks), text=chunk, tokens=len(window)))
+        if start + max_tokens >= len(tokens):
+            break
+    return chunks
+
+"""
+1. Token-aware chunking:
+    . Chunks are cut on token counts from the embedding model's own encoding, so no chunk exceeds its input limit
+    . Cutting between tokens can split a multi-byte character; decode replaces the partial bytes and strip() tidies the edges
+
+2. Encoders:
+    . get_encoder is cached, so each process builds an encoding once (EmbeddingService.warm loads it at startup)
+    . Set TIKTOKEN_CACHE_DIR to a pre-populated directory where the BPE files cannot be downloaded
+"""
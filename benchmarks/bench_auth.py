@@ -0,0 +1,63 @@
+"""
+Per-request auth overhead of get_current_user (local JWT) vs get_current_user_remote.
+
+    python -m benchmarks.bench_auth --latency-ms 20 --iterations 2000
+
+Reports the mean cost of one dependency call for: local verification of a fresh
+token, local verification of a cached token, and the remote Supabase Auth check.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.loadgen import configure_env
+
+SECRET = "bench-jwt-secret-with-at-least-32-bytes!"
+configure_env(SUPABASE_JWT_SECRET=SECRET)
+
+import jwt  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core.security import get_current_user, get_current_user_remote, token_verifier  # noqa: E402
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+
+def make_token(sub: str, nonce: int) -> HTTPAuthorizationCredentials:
+    claims = {"sub": sub, "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + 3600, "nonce": nonce}
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=jwt.encode(claims, SECRET, algorithm="HS256"))
+
+
+async def timed(dependency, tokens) -> float:
+    started = time.perf_counter()
+    for credentials in tokens:
+        await dependency(credentials)
+    return (time.perf_counter() - started) / len(tokens) * 1e6
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    sub = fake.seed_user(email="auth@bench.dev")["id"]
+    fresh = [make_token(sub, index) for index in range(args.iterations)]
+    with FakeSupabaseServer(fake):
+        await SupabaseClient.connect()
+        try:
+            results = {
+                "local_uncached_us": round(await timed(get_current_user, fresh), 1),
+                "local_cached_us": round(await timed(get_current_user, fresh), 1),
+                "remote_us": round(await timed(get_current_user_remote, fresh[:args.remote_iterations]), 1),
+            }
+        finally:
+            await token_verifier.stop()
+            await SupabaseClient.close()
+    results["remote_over_local_cached"] = round(results["remote_us"] / results["local_cached_us"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--remote-iterations", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Registration throughput: N x POST /register vs POST /register/bulk.
+
+    python -m benchmarks.bench_bulk_register --users 500 --batch-size 250 --latency-ms 20
+
+Half the users are clients spread over a few companies. Pass
+`--registration-type phone` to leave password hashing out of the picture.
+The bulk route is admin-only, so its requests carry an admin token signed
+with the bench JWT secret.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.loadgen import configure_env, run_load
+
+SECRET = "bench-jwt-secret-with-at-least-32-bytes!"
+configure_env(SUPABASE_JWT_SECRET=SECRET)
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+PASSWORD = "Correct-Horse-Battery-9!"
+
+
+def admin_headers() -> dict:
+    claims = {
+        "sub": "00000000-0000-4000-8000-00000000ad01",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "app_metadata": {"role": "admin"},
+        "exp": int(time.time()) + 3600,
+    }
+    return {"Authorization": f"Bearer {jwt.encode(claims, SECRET, algorithm='HS256')}"}
+
+
+def registration(run: str, index: int, registration_type: str) -> dict:
+    payload = {
+        "user_type": "client" if index % 2 else "job_seeker",
+        "registration_type": registration_type,
+        "first_name": "Bench",
+        "last_name": f"User{index}",
+        "country": "IN",
+        "email": f"{run}-{index}@bench.dev",
+        "phone": f"+9198{index:08d}" if registration_type == "phone" else None,
+        "password": PASSWORD if registration_type == "email" else None,
+    }
+    if index % 2:
+        payload.update(company_name=f"Company {index % 10}", company_country="IN")
+    return payload
+
+
+async def main(args: argparse.Namespace) -> None:
+    from main import app
+
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    results = {}
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                # Warm the password pool so worker start-up is not billed to either mode.
+                await client.post("/api/v1/register", json=registration("warmup", 0, args.registration_type))
+
+                fake.request_count = 0
+                async def send(index: int) -> bool:
+                    response = await client.post("/api/v1/register", json=registration("single", index, args.registration_type))
+                    return response.status_code == 200
+
+                single = await run_load(send, args.users, args.concurrency)
+                single["round_trips"] = fake.request_count
+                single["users_per_minute"] = round(single["rps"] * 60)
+                results["single"] = single
+
+                fake.request_count = 0
+                created = 0
+                started = time.perf_counter()
+                for start in range(0, args.users, args.batch_size):
+                    batch = [registration("bulk", index, args.registration_type) for index in range(start, min(start + args.batch_size, args.users))]
+                    response = await client.post("/api/v1/register/bulk", json={"users": batch}, headers=admin_headers())
+                    created += response.json()["created"]
+                elapsed = time.perf_counter() - started
+                results["bulk"] = {
+                    "users": args.users,
+                    "created": created,
+                    "batch_size": args.batch_size,
+                    "seconds": round(elapsed, 3),
+                    "round_trips": fake.request_count,
+                    "users_per_minute": round(args.users / elapsed * 60),
+                }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--registration-type", choices=["email", "phone"], default="email")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,173 @@
+"""
+End-to-end load benchmark: boots `main.app` against the fake Supabase server and
+drives the auth and verification routes at fixed concurrency levels.
+
+    python -m benchmarks.bench_e2e --latency-ms 20 --concurrency 1,16,64 --requests 200
+    python -m benchmarks.bench_e2e --baseline benchmarks/baselines/e2e.json          # exit 1 on regression
+    python -m benchmarks.bench_e2e --baseline benchmarks/baselines/e2e.json --update-baseline
+
+Prints throughput and p50/p95/p99 latency per scenario and concurrency as JSON.
+A scenario regresses when its throughput drops, or its p95/p99 rises, by more
+than --tolerance against the baseline, or when any request fails. Baselines are
+machine specific: regenerate them on the machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Callable, Dict, List
+
+from benchmarks.loadgen import configure_env, run_load
+
+configure_env()
+
+import httpx  # noqa: E402
+
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+PASSWORD = "Correct-Horse-Battery-9!"
+OTP = "123456"
+SEEDED_USERS = 200
+
+# scenario -> fn(run, index) returning the request to send
+Scenario = Callable[[str, int], Dict[str, Any]]
+
+
+def register(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/register", "json": {
+        "user_type": "job_seeker",
+        "registration_type": "email",
+        "first_name": "Bench",
+        "last_name": f"User{index}",
+        "country": "IN",
+        "work_status": "experienced",
+        "email": f"{run}-{index}@bench.dev",
+        "password": PASSWORD,
+    }}
+
+
+def login_password(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/login", "json": {
+        "email": f"user{index % SEEDED_USERS}@bench.dev", "password": PASSWORD
+    }}
+
+
+def login_otp(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/login", "json": {"phone": seeded_phone(index), "otp": OTP}}
+
+
+def send_otp(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/send-otp", "params": {"phone": seeded_phone(index)}}
+
+
+def resend_email_verification(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/verify/email/resend", "params": {"email": f"user{index % SEEDED_USERS}@bench.dev"}}
+
+
+def verify_phone(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/verify/phone", "params": {"otp": OTP}, "json": {"phone": seeded_phone(index)}}
+
+
+def resend_phone_verification(run: str, index: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/api/v1/verify/phone/resend", "json": {"phone": seeded_phone(index)}}
+
+
+def seeded_phone(index: int) -> str:
+    return f"+91990{index % SEEDED_USERS:07d}"
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "register": register,
+    "login_password": login_password,
+    "login_otp": login_otp,
+    "send_otp": send_otp,
+    "verify_email_resend": resend_email_verification,
+    "verify_phone": verify_phone,
+    "verify_phone_resend": resend_phone_verification,
+}
+
+
+def seed(fake: FakeSupabase) -> None:
+    for index in range(SEEDED_USERS):
+        fake.seed_user(email=f"user{index}@bench.dev", password=PASSWORD)
+        fake.seed_user(phone=seeded_phone(index))
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from main import app
+
+    fake = FakeSupabase(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    seed(fake)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                # Warm the password pool and connection pool so start-up is not billed to the first scenario
+                await client.request(**register("warmup", 0))
+                await client.request(**login_password("warmup", 0))
+
+                for name in args.scenarios:
+                    build = SCENARIOS[name]
+                    results[name] = {}
+                    for concurrency in args.concurrency:
+                        run = f"{name}-c{concurrency}"
+
+                        async def send(index: int, build: Scenario = build, run: str = run) -> bool:
+                            response = await client.request(**build(run, index))
+                            return response.status_code < 400
+
+                        results[name][str(concurrency)] = await run_load(send, args.requests, concurrency)
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, levels in results.items():
+        for concurrency, current in levels.items():
+            if current["errors"]:
+                regressions.append(f"{name} c={concurrency}: {current['errors']} failed requests")
+            previous = baseline.get(name, {}).get(concurrency)
+            if not previous:
+                continue
+            if current["rps"] < previous["rps"] * (1 - tolerance):
+                regressions.append(f"{name} c={concurrency}: rps {current['rps']} < baseline {previous['rps']}")
+            for key in ("p95_ms", "p99_ms"):
+                if current[key] > previous[key] * (1 + tolerance):
+                    regressions.append(f"{name} c={concurrency}: {key} {current[key]} > baseline {previous[key]}")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    results = asyncio.run(run_suite(args))
+    report = {
+        "config": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "requests": args.requests},
+        "results": results,
+    }
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print(f"warning: baseline was recorded with {baseline.get('config')}", file=sys.stderr)
+        report["regressions"] = find_regressions(results, baseline["results"], args.tolerance)
+
+    print(json.dumps(report, indent=2))
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")], default=[1, 16, 64])
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS))
+    parser.add_argument("--baseline", help="JSON report to compare against (or write with --update-baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression")
+    sys.exit(main(parser.parse_args()))
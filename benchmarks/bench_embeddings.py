@@ -0,0 +1,120 @@
+"""
+Embedding pipeline cost: requests and wall time per corpus, naive vs batched and cached.
+
+    python -m benchmarks.bench_embeddings --documents 500 --latency-ms 150
+
+Builds a corpus of resume-like documents in which sections repeat across
+documents (shared boilerplate) and some documents are re-uploaded unchanged,
+then embeds it with the offline fake backend:
+
+    naive         one request per document, no cache
+    cold          EmbeddingService with an empty cache (dedupe + packing + bounded concurrency)
+    warm          the same corpus again, now all cache hits
+    incremental   10% new documents on top of a warm cache
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+from app.infrastructure.embedding_cache import EmbeddingCache  # noqa: E402
+from app.infrastructure.embeddings import FakeEmbeddingBackend  # noqa: E402
+from app.services.embedding_service import EmbeddingService  # noqa: E402
+from app.utils.text_chunks import BYTES_ENCODING, chunk_text, get_encoder  # noqa: E402
+from benchmarks.bench_resume import WORDS  # noqa: E402
+
+
+def make_corpus(documents: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+
+    def section(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    # A pool of sections that many documents share (summaries, skill lists, templates)
+    shared = [section(rng.randint(150, 400)) for _ in range(40)]
+    corpus = []
+    for _ in range(documents):
+        if corpus and rng.random() < 0.1:
+            corpus.append(rng.choice(corpus))  # re-upload
+            continue
+        parts = [rng.choice(shared) for _ in range(2)] + [section(rng.randint(300, 1200)) for _ in range(3)]
+        rng.shuffle(parts)
+        corpus.append("\n\n".join(parts))
+    return corpus
+
+
+def encoding_name() -> str:
+    try:
+        get_encoder("cl100k_base")
+        return "cl100k_base"
+    except Exception:
+        return BYTES_ENCODING
+
+
+async def naive(corpus: List[str], backend: FakeEmbeddingBackend, encoding: str, chunk_tokens: int) -> dict:
+    encoder = get_encoder(encoding)
+    started = time.perf_counter()
+    for text in corpus:
+        await backend.embed([chunk.text for chunk in chunk_text(text, encoder, chunk_tokens, 64)])
+    return {"seconds": round(time.perf_counter() - started, 2), "requests": backend.requests, "inputs": backend.inputs}
+
+
+async def pipelined(service: EmbeddingService, corpus: List[str]) -> dict:
+    backend = service.backend
+    requests, inputs = backend.requests, backend.inputs
+    started = time.perf_counter()
+    await service.embed_documents(corpus)
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "requests": backend.requests - requests,
+        "inputs": backend.inputs - inputs,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    corpus = make_corpus(args.documents, seed=1)
+    extra = make_corpus(max(args.documents // 10, 1), seed=2)
+    encoding = encoding_name()
+    # The byte encoding counts ~4x the tokens of cl100k_base, so chunks are scaled to stay comparable
+    chunk_tokens = 512 if encoding != BYTES_ENCODING else 2048
+    latency = args.latency_ms / 1000
+
+    def backend() -> FakeEmbeddingBackend:
+        return FakeEmbeddingBackend(
+            dimensions=args.dimensions, latency=latency, max_batch_size=args.batch_size, max_batch_tokens=400_000
+        )
+
+    results = {"documents": len(corpus), "encoding": encoding, "chunk_tokens": chunk_tokens, "latency_ms": args.latency_ms}
+    results["naive"] = await naive(corpus, backend(), encoding, chunk_tokens)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(os.path.join(directory, "embeddings.sqlite3"))
+        service = EmbeddingService(
+            backend=backend(), cache=cache, encoding=encoding, chunk_tokens=chunk_tokens,
+            chunk_overlap=64, max_concurrency=args.concurrency
+        )
+        results["cold"] = await pipelined(service, corpus)
+        results["warm"] = await pipelined(service, corpus)
+        results["incremental"] = await pipelined(service, corpus + extra)
+        results["cache_rows"] = cache.count()
+        cache.close()
+    results["cold_speedup"] = round(results["naive"]["seconds"] / results["cold"]["seconds"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,208 @@
+"""
+Faceted candidate filtering at scale: FacetIndex bitmaps vs a scan over user rows.
+
+    python -m benchmarks.bench_facets --users 1000000
+
+Users get a country (40, skewed), user_type, work_status and 3-12 skills of
+the bundled taxonomy (popular skills far more common). Then:
+
+    load_s          bulk load in FACET_INDEX_FLUSH_SIZE batches (index_mb: memory it took)
+    queries         p50 ms per query: evaluate (bitmap), ids (first page), facets (all four fields), and
+                    the same filter as a Python scan over the rows for reference
+    unordered_ms    the AND query evaluated in written order (broad clause first) instead of by selectivity
+    update_us       one user's attributes changed / one resume's skills replaced / one user deleted
+    service_load    CandidateFacetService loading the same users from in-memory repositories, with the
+                    worst and p99 event-loop lag seen by a 1 ms ticker meanwhile, and facets_lag_ms: the
+                    worst lag while requests asking for facets over all users are served
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+from uuid import UUID
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env()
+
+from app.core.config import settings  # noqa: E402
+from app.infrastructure.facet_index import And, FacetIndex, Not, Term, all_of, any_of  # noqa: E402
+from app.services.facet_service import FACET_FIELDS, CandidateFacetService  # noqa: E402
+from app.services.skill_service import get_skill_extractor  # noqa: E402
+
+COUNTRIES = [f"C{index:02d}" for index in range(40)]
+
+
+def make_users(count: int, seed: int) -> List[Dict[str, object]]:
+    rng = random.Random(seed)
+    skills = list(get_skill_extractor().taxonomy.skills)
+    skill_weights = [1 / (rank + 1) for rank in range(len(skills))]
+    country_weights = [1 / (rank + 1) ** 0.7 for rank in range(len(COUNTRIES))]
+    countries = rng.choices(COUNTRIES, country_weights, k=count)
+    users = []
+    for index in range(count):
+        users.append({
+            "country": countries[index],
+            "user_type": "job_seeker" if rng.random() < 0.85 else "client",
+            "work_status": "experienced" if rng.random() < 0.6 else "fresher",
+            "skills": sorted(set(rng.choices(skills, skill_weights, k=rng.randint(3, 12)))),
+        })
+    return users
+
+
+def p50_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def matches(query, user) -> bool:
+    if isinstance(query, Term):
+        value = user[query.field]
+        return query.value in value if isinstance(value, list) else value == query.value
+    if isinstance(query, And):
+        return all(matches(clause, user) for clause in query.clauses)
+    if isinstance(query, Not):
+        return not matches(query.clause, user)
+    return any(matches(clause, user) for clause in query.clauses)
+
+
+def evaluate_in_order(index: FacetIndex, query: And) -> int:
+    result = index.evaluate(query.clauses[0])
+    for clause in query.clauses[1:]:
+        result &= index.evaluate(clause)
+    return result
+
+
+class MemoryRepositories:
+    """Just enough of AuthRepository and ResumeRepository for CandidateFacetService to load from."""
+
+    def __init__(self, users: List[Dict[str, object]]):
+        self.users = [
+            SimpleNamespace(id=UUID(int=index + 1), is_active=True, **{name: user[name] for name in ("country", "user_type", "work_status")})
+            for index, user in enumerate(users)
+        ]
+        self.skills = {self.users[index].id: user["skills"] for index, user in enumerate(users)}
+
+    def add_listener(self, listener) -> None:
+        pass
+
+    async def iter_all(self, batch_size: int):
+        for start in range(0, len(self.users), batch_size):
+            await asyncio.sleep(0)
+            for user in self.users[start:start + batch_size]:
+                yield user
+
+    async def get_skills_by_user_ids(self, ids):
+        return {id: self.skills[id] for id in ids}
+
+    async def get_by_id(self, id):
+        return None
+
+
+async def watch_loop(stop: asyncio.Event) -> List[float]:
+    """Event-loop lag in ms: how late each 1 ms sleep wakes up, until stop is set."""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - started - 0.001) * 1000)
+    return lags
+
+
+async def bench_service_load(users: List[Dict[str, object]]) -> dict:
+    repositories = MemoryRepositories(users)
+    service = CandidateFacetService(repositories, repositories)
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    started = time.perf_counter()
+    await service.start()
+    await service._task
+    load_s = time.perf_counter() - started
+    stop.set()
+    lags = await watcher
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    for _ in range(20):
+        await service.search(None, 0, 20)
+    stop.set()
+    search_lags = await watcher
+    return {
+        "load_s": round(load_s, 2),
+        "documents": len(service.index),
+        "max_lag_ms": round(max(lags), 1),
+        "p99_lag_ms": round(percentile(lags, 99), 1),
+        "facets_lag_ms": round(max(search_lags), 1),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    users = make_users(args.users, seed=1)
+    ids = [f"user-{index}" for index in range(args.users)]
+    index = FacetIndex(FACET_FIELDS)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    flush = settings.FACET_INDEX_FLUSH_SIZE
+    for start in range(0, args.users, flush):
+        index.upsert_many(zip(ids[start:start + flush], users[start:start + flush]))
+    results = {
+        "users": args.users,
+        "load_s": round(time.perf_counter() - started, 2),
+        # Peak RSS growth while loading: bitmaps plus the per-user id and term bookkeeping
+        "index_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024),
+        **index.stats(),
+    }
+
+    popular = [skill for skill, _ in index.facets(index.evaluate(None), ["skills"], 30)["skills"]]
+    queries = {
+        "country": Term("country", "C05"),
+        "attributes": And((Term("user_type", "job_seeker"), Term("work_status", "experienced"), Term("country", "C05"))),
+        "skills_and": And((Term("user_type", "job_seeker"), all_of("skills", popular[:2]), Term("skills", popular[20]))),
+        "or_not": And((any_of("country", COUNTRIES[:3]), Term("skills", popular[1]), Not(Term("skills", popular[0])))),
+        "empty": And((Term("user_type", "job_seeker"), Term("country", "C07"), Term("skills", "no_such_skill"))),
+    }
+    sample = users[:args.scan_users]
+    results["queries"] = {}
+    for name, query in queries.items():
+        bitmap = index.evaluate(query)
+        scan_ms = p50_ms(lambda: [user for user in sample if matches(query, user)], 3)
+        results["queries"][name] = {
+            "matches": bitmap.bit_count(),
+            "evaluate_ms": p50_ms(lambda: index.evaluate(query), args.repeat),
+            "ids_ms": p50_ms(lambda: index.ids(bitmap, 0, 20), args.repeat),
+            "deep_page_ms": p50_ms(lambda: index.ids(bitmap, bitmap.bit_count() // 2, 20), args.repeat),
+            "facets_ms": p50_ms(lambda: index.facets(bitmap, FACET_FIELDS), max(args.repeat // 5, 3)),
+            "scan_ms": round(scan_ms * args.users / len(sample), 1),
+        }
+    attributes = queries["attributes"]
+    results["unordered_ms"] = p50_ms(lambda: evaluate_in_order(index, attributes), args.repeat)
+    results["ordered_ms"] = results["queries"]["attributes"]["evaluate_ms"]
+
+    rng = random.Random(2)
+    targets = rng.sample(ids, args.updates)
+    results["update_us"] = {
+        "attributes": round(p50_ms(lambda: index.upsert(rng.choice(targets), {"country": rng.choice(COUNTRIES)}), args.updates) * 1000, 1),
+        "skills": round(p50_ms(lambda: index.upsert(rng.choice(targets), {"skills": rng.sample(popular, 5)}), args.updates) * 1000, 1),
+        "delete": round(p50_ms(lambda: index.delete(targets.pop()), args.updates // 2) * 1000, 1),
+    }
+    del index
+    results["service_load"] = asyncio.run(bench_service_load(users))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--scan-users", type=int, default=100_000, help="rows actually scanned; scaled up to --users")
+    main(parser.parse_args())
@@ -0,0 +1,203 @@
+"""
+Background job queue: request latency of the dispatch routes, retries under a flaky provider, and restart recovery.
+
+    python -m benchmarks.bench_jobs --dispatch-ms 300 --requests 200 --concurrency 16
+
+"app" sends /send-otp through the app against a fake Supabase whose SMS
+dispatch takes --dispatch-ms, once with the side effect awaited in the request
+(no job queue) and once queued, and reports request latency and the time until
+every OTP was delivered. "retries" runs --jobs jobs against a handler that
+fails --error-rate of its calls and counts attempts and dead letters.
+"rejections" sends /send-otp with malformed phone numbers, which the fake
+Supabase Auth rejects with a 400: those jobs must be dead-lettered on their
+first attempt rather than retried, and a phone-only /reset-password must be
+answered 400 without queueing a job.
+"restart" stops a SQLite-backed queue mid-way with no drain time and starts a
+new one on the same file, checking that every job still completes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.loadgen import configure_env, run_load
+
+configure_env()
+
+import httpx  # noqa: E402
+
+from app.infrastructure.job_queue import JobQueue, MemoryJobStore, SQLiteJobStore  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+
+def make_queue(store, **overrides) -> JobQueue:
+    options = dict(
+        workers=8, max_queue=10000, max_attempts=5, retry_base_delay=0.01, retry_max_delay=0.2,
+        attempt_timeout=5.0, drain_timeout=30.0, lease_seconds=60.0, retention=3600.0
+    )
+    return JobQueue(store, **{**options, **overrides})
+
+
+async def wait_until(predicate, timeout: float = 120.0) -> float:
+    started = time.perf_counter()
+    while not predicate() and time.perf_counter() - started < timeout:
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - started
+
+
+async def bench_app(args: argparse.Namespace) -> dict:
+    from main import app
+
+    fake = FakeSupabase(latency=args.latency_ms / 1000, dispatch_latency=args.dispatch_ms / 1000)
+    results = {}
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            queued_service = app.state.auth_service
+            inline_service = AuthService(queued_service.auth_repo, queued_service.company_repo)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for mode, service in (("inline", inline_service), ("queued", queued_service)):
+                    app.state.auth_service = service
+                    dispatched = fake.dispatched
+
+                    async def send(index: int) -> bool:
+                        response = await client.post("/api/v1/send-otp", params={"phone": f"+9199{index:08d}"})
+                        return response.status_code < 400
+
+                    started = time.perf_counter()
+                    load = await run_load(send, args.requests, args.concurrency)
+                    await wait_until(lambda: fake.dispatched - dispatched >= args.requests)
+                    load["all_delivered_s"] = round(time.perf_counter() - started, 3)
+                    results[mode] = load
+            app.state.auth_service = queued_service
+    return results
+
+
+async def bench_rejections(args: argparse.Namespace) -> dict:
+    from main import app
+
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            queue = app.state.job_queue
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                job_ids = []
+                for index in range(20):
+                    response = await client.post("/api/v1/send-otp", params={"phone": f"0{index:04d}"})
+                    job_ids.append(response.json()["job_id"])
+                reset = await client.post("/api/v1/reset-password", json={"phone": "+919900000001"})
+
+                def jobs():
+                    return [queue.store.get(job_id) for job_id in job_ids]
+
+                waited = await wait_until(lambda: all(job.status == "dead" for job in jobs()), timeout=30.0)
+                return {
+                    "invalid_phone_jobs": len(job_ids),
+                    "dead": sum(job.status == "dead" for job in jobs()),
+                    "attempts": sum(job.attempts for job in jobs()),
+                    "dead_after_s": round(waited, 3),
+                    "phone_only_reset_status": reset.status_code,
+                }
+
+
+async def bench_retries(args: argparse.Namespace) -> dict:
+    rng = random.Random(0)
+    calls = 0
+
+    async def flaky(index: int) -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.001)
+        if rng.random() < args.error_rate:
+            raise RuntimeError("provider error")
+
+    queue = make_queue(MemoryJobStore())
+    queue.register("flaky", flaky)
+    await queue.start()
+    started = time.perf_counter()
+    for index in range(args.jobs):
+        await queue.enqueue("flaky", index=index)
+
+    def finished() -> bool:
+        counts = queue.store.counts()
+        return counts["succeeded"] + counts["dead"] == args.jobs
+
+    await wait_until(finished)
+    elapsed = time.perf_counter() - started
+    stats = await queue.stats()
+    await queue.stop()
+    return {
+        "jobs": args.jobs,
+        "error_rate": args.error_rate,
+        "attempts": calls,
+        "attempts_per_job": round(calls / args.jobs, 3),
+        "succeeded": stats["jobs"]["succeeded"],
+        "dead": stats["jobs"]["dead"],
+        # With independent failures a job dies with probability error_rate ** max_attempts
+        "expected_dead": round(args.jobs * args.error_rate ** queue.max_attempts, 2),
+        "seconds": round(elapsed, 3),
+    }
+
+
+async def bench_restart(args: argparse.Namespace) -> dict:
+    done = []
+
+    async def slow(index: int) -> None:
+        await asyncio.sleep(0.005)
+        done.append(index)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jobs.sqlite3")
+        first = make_queue(SQLiteJobStore(path), workers=2, drain_timeout=0.0)
+        first.register("slow", slow)
+        await first.start()
+        for index in range(args.jobs):
+            await first.enqueue("slow", index=index)
+        await asyncio.sleep(0.1)
+        await first.stop()
+        first.close()
+        done_before_restart = len(done)
+
+        started = time.perf_counter()
+        second = make_queue(SQLiteJobStore(path))
+        second.register("slow", slow)
+        await second.start()
+        await wait_until(lambda: len(set(done)) == args.jobs)
+        elapsed = time.perf_counter() - started
+        stats = await second.stats()
+        await second.stop()
+        second.close()
+    return {
+        "jobs": args.jobs,
+        "done_before_restart": done_before_restart,
+        "recovered": stats["recovered"],
+        "completed": len(set(done)),
+        # A job cancelled mid-attempt at shutdown runs again after the restart (at-least-once)
+        "ran_twice": len(done) - len(set(done)),
+        "resume_seconds": round(elapsed, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    return {
+        "app": await bench_app(args),
+        "rejections": await bench_rejections(args),
+        "retries": await bench_retries(args),
+        "restart": await bench_restart(args),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--dispatch-ms", type=float, default=300.0, help="time the fake provider takes per SMS/email")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
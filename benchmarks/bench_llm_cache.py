@@ -0,0 +1,130 @@
+"""
+LLM response cache: upstream calls, hit rate and latency for a repetitive evaluation workload.
+
+    python -m benchmarks.bench_llm_cache --requests 2000 --distinct 300 --latency-ms 800
+
+Requests draw (resume, role) pairs from a skewed distribution (popular resumes
+are evaluated again and again), some of them as whitespace variants of the
+same resume, and arrive with --concurrency in flight so identical requests
+overlap. Answered by the offline fake LLM:
+
+    uncached      every request calls the backend
+    cached        CachedLLM over an on-disk LLMResponseCache (hits, single-flight, normalization)
+    bounded       the same with LLM_CACHE_MAX_BYTES set to a quarter of the working set (LRU eviction)
+    malformed     cached, with --malformed-rate of the fake's replies fenced or truncated: failed requests,
+                  and whether any unreadable reply ended up in the cache (it must not)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List, Tuple
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env()
+
+from app.core.exceptions import AppException  # noqa: E402
+from app.infrastructure.llm import FakeLLMBackend  # noqa: E402
+from app.infrastructure.llm_cache import CachedLLM, LLMResponseCache  # noqa: E402
+from app.services.resume_evaluation_service import RESUME_EVALUATION_PROMPT, parse_evaluation  # noqa: E402
+from benchmarks.bench_resume import WORDS  # noqa: E402
+
+ROLES = ["Backend Engineer", "Data Scientist", "Product Designer", "DevOps Engineer", "QA Engineer"]
+
+
+def make_workload(requests: int, distinct: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    resumes = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(400, 1200))) for _ in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    workload = []
+    for resume in rng.choices(resumes, weights, k=requests):
+        if rng.random() < 0.2:
+            # The same resume re-uploaded from another editor: CRLF line ends, doubled spaces
+            resume = resume.replace(" ", "  ", 5).replace(". ", ".\r\n")
+        workload.append((rng.choice(ROLES[:3]) if rng.random() < 0.8 else rng.choice(ROLES), resume))
+    return workload
+
+
+async def run(llm, workload: List[Tuple[str, str]], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failed = 0
+
+    async def one(role: str, resume: str) -> None:
+        nonlocal failed
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if isinstance(llm, CachedLLM):
+                    await llm.generate(RESUME_EVALUATION_PROMPT, parse=parse_evaluation, role=role, resume=resume)
+                else:
+                    await llm.complete(RESUME_EVALUATION_PROMPT.render(role=role, resume=resume), {})
+            except AppException:
+                failed += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(role, resume) for role, resume in workload))
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "failed": failed,
+    }
+
+
+def unreadable_entries(cache: LLMResponseCache) -> int:
+    unreadable = 0
+    for (value,) in cache._db.execute("SELECT value FROM llm_responses"):
+        try:
+            parse_evaluation(value)
+        except Exception:
+            unreadable += 1
+    return unreadable
+
+
+async def main(args: argparse.Namespace) -> None:
+    workload = make_workload(args.requests, args.distinct, seed=1)
+    latency = args.latency_ms / 1000
+    results = {"requests": len(workload), "distinct_resumes": args.distinct, "latency_ms": args.latency_ms}
+
+    backend = FakeLLMBackend(latency=latency)
+    results["uncached"] = {**await run(backend, workload, args.concurrency), "upstream_calls": backend.calls}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, max_bytes, malformed_rate in (("cached", 1 << 30, 0.0), ("bounded", None, 0.0), ("malformed", 1 << 30, args.malformed_rate)):
+            cache = LLMResponseCache(os.path.join(directory, f"{name}.sqlite3"), max_bytes or 1 << 30, ttl=3600)
+            if max_bytes is None:
+                # A quarter of what the cached run stored
+                cache.max_bytes = max(results["cached"]["cache"]["bytes"] // 4, 1)
+            backend = FakeLLMBackend(latency=latency, malformed_rate=malformed_rate)
+            llm = CachedLLM(backend, cache)
+            timing = await run(llm, workload, args.concurrency)
+            stats = llm.stats()
+            results[name] = {
+                **timing,
+                "upstream_calls": backend.calls,
+                "hits": stats["hits"],
+                "coalesced": stats["coalesced"],
+                "hit_rate": stats["hit_rate"],
+                "cache": {key: stats["cache"][key] for key in ("entries", "bytes", "max_bytes", "evicted")},
+            }
+            if malformed_rate:
+                results[name].update(malformed_replies=backend.malformed, unreadable_cached=unreadable_entries(cache))
+            cache.close()
+    results["upstream_saved"] = round(1 - results["cached"]["upstream_calls"] / results["uncached"]["upstream_calls"], 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+"""
+Point-lookup coalescing: PostgREST round trips per second with and without BatchLoader.
+
+    python -m benchmarks.bench_loader --concurrency 200 --seconds 5 --latency-ms 10
+
+Each worker repeatedly looks up a random user by id, email or phone.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from app.repositories.auth_repository import AuthRepository  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabaseServer  # noqa: E402
+
+USERS = 1000
+
+
+async def measure(fake: FakeSupabase, rows: list, batched: bool, args: argparse.Namespace) -> dict:
+    repo = AuthRepository()
+    for loader in repo._loaders.values():
+        loader.max_batch_size = 100 if batched else 1
+    lookups = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def worker() -> None:
+        nonlocal lookups
+        while time.perf_counter() < deadline:
+            row = random.choice(rows)
+            column = random.choice(("id", "email", "phone"))
+            lookup = {"id": repo.get_by_id, "email": repo.get_by_email, "phone": repo.get_by_phone}[column]
+            user = await lookup(row[column])
+            assert user is not None and str(user.id) == row["id"]
+            lookups += 1
+
+    fake.request_count = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "lookups_per_second": round(lookups / elapsed, 1),
+        "round_trips_per_second": round(fake.request_count / elapsed, 1),
+        "lookups_per_round_trip": round(lookups / max(fake.request_count, 1), 2),
+        "loaders": repo.loader_stats(),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    rows = [fake.seed_user(email=f"user{index}@bench.dev", phone=f"+91990{index:07d}") for index in range(USERS)]
+    with FakeSupabaseServer(fake):
+        await SupabaseClient.connect()
+        try:
+            results = {
+                "unbatched": await measure(fake, rows, False, args),
+                "batched": await measure(fake, rows, True, args),
+            }
+        finally:
+            await SupabaseClient.close()
+    # Round trips needed per lookup, unbatched over batched
+    results["round_trip_reduction"] = round(
+        results["batched"]["lookups_per_round_trip"] / results["unbatched"]["lookups_per_round_trip"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
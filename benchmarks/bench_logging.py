@@ -0,0 +1,143 @@
+"""
+Log throughput under an error storm: inline handler vs the queued log pipeline.
+
+    python -m benchmarks.bench_logging --records 20000 --threads 8 --stall-ms 200
+
+Every record is a logger.error with a traceback and `extra` fields, as the
+repositories emit on failure. The sink stalls for --stall-ms on every write,
+like a Logtail endpoint that stopped answering. "inline" formats and writes on
+the calling thread (what attaching a handler straight to the logger does);
+"pipeline_*" go through NonBlockingQueueHandler with each overflow policy.
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from typing import List
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env()
+
+from app.core.log_pipeline import JSONFormatter, LogPipeline  # noqa: E402
+
+
+class StalledSink:
+    """Accepts batches, but only after stalling like an unresponsive backend."""
+
+    def __init__(self, stall: float):
+        self.stall = stall
+        self.records = 0
+
+    def send(self, lines: List[bytes]) -> None:
+        time.sleep(self.stall)
+        self.records += len(lines)
+
+
+class InlineHandler(logging.Handler):
+    """Formats and ships each record on the caller's thread."""
+
+    def __init__(self, sink: StalledSink):
+        super().__init__()
+        self.sink = sink
+        self.formatter = JSONFormatter()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.sink.send([self.formatter.encode(record)])
+
+
+def storm(logger: logging.Logger, records: int, threads: int) -> dict:
+    latencies: List[float] = []
+    lock = threading.Lock()
+    per_thread = records // threads
+
+    def worker() -> None:
+        local = []
+        for index in range(per_thread):
+            try:
+                raise RuntimeError(f"upstream failure {index}")
+            except RuntimeError as e:
+                started = time.perf_counter()
+                logger.error(
+                    f"Failed to get user by email: {str(e)}",
+                    exc_info=True,
+                    extra={"error_type": "application_error", "path": "/api/v1/login", "status_code": 500}
+                )
+                local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "records": len(latencies),
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(len(latencies) / elapsed, 1),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 1),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def fresh_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def run_inline(args: argparse.Namespace) -> dict:
+    # Bounded so a stalled sink does not make the run take minutes
+    records = min(args.records, max(args.threads, int(args.threads * 2 / max(args.stall_ms / 1000, 1e-3))))
+    sink = StalledSink(args.stall_ms / 1000)
+    logger = fresh_logger("inline")
+    logger.addHandler(InlineHandler(sink))
+    return {**storm(logger, records, args.threads), "delivered": sink.records}
+
+
+def run_pipeline(args: argparse.Namespace, policy: str) -> dict:
+    sink = StalledSink(args.stall_ms / 1000)
+    pipeline = LogPipeline(
+        sink=sink,
+        fallback=StalledSink(0),
+        queue_size=args.queue_size,
+        policy=policy,
+        batch_size=500,
+        flush_interval=0.05,
+        offline_retry=0
+    )
+    logger = fresh_logger(policy)
+    pipeline.install(logger)
+    pipeline.start()
+    result = storm(logger, args.records, args.threads)
+    pipeline.stop(timeout=30)
+    stats = pipeline.stats()
+    return {
+        **result,
+        "delivered": sink.records,
+        "dropped": stats["dropped"],
+        "sampled_out": stats["sampled_out"],
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {"inline": run_inline(args)}
+    for policy in ("drop_newest", "drop_oldest", "sample"):
+        results[f"pipeline_{policy}"] = run_pipeline(args, policy)
+    results["p99_speedup"] = round(results["inline"]["p99_us"] / max(results["pipeline_drop_newest"]["p99_us"], 0.1), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--stall-ms", type=float, default=200.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+"""
+Concurrent /login throughput: blocking sync client vs pooled async client.
+
+    python -m benchmarks.bench_login --latency-ms 20 --requests 400 --concurrency 50
+
+"before" mounts the previous implementation (sync supabase client called from an
+async route), "after" drives the real app. Both talk to the same fake server.
+"""
+import argparse
+import asyncio
+import json
+
+from benchmarks.loadgen import configure_env, run_load
+
+configure_env()
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+from supabase import create_client  # noqa: E402
+
+from app.api.v1.auth.schemas import LoginRequest  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+USERS = 50
+PASSWORD = "Bench-Password-123!"
+
+
+def legacy_app() -> FastAPI:
+    """The pre-async login path: every Supabase call blocks the event loop."""
+    legacy = FastAPI()
+    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+    @legacy.post("/api/v1/login")
+    async def login(request: LoginRequest):
+        response = client.auth.sign_in_with_password({"email": request.email, "password": request.password})
+        if not response.user:
+            raise HTTPException(status_code=401)
+        result = client.table("users").select("*").eq("email", request.email).execute()
+        return result.data[0]
+
+    return legacy
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def send(index: int) -> bool:
+                payload = {"email": f"user{index % USERS}@bench.dev", "password": PASSWORD}
+                response = await client.post("/api/v1/login", json=payload)
+                return response.status_code == 200
+
+            return await run_load(send, requests, concurrency)
+
+
+async def main(args: argparse.Namespace) -> None:
+    from main import app
+
+    results = {}
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    for index in range(USERS):
+        fake.seed_user(email=f"user{index}@bench.dev", password=PASSWORD)
+    with FakeSupabaseServer(fake):
+        results["before"] = await measure(legacy_app(), args.requests, args.concurrency)
+        results["after"] = await measure(app, args.requests, args.concurrency)
+    results["speedup"] = round(results["after"]["rps"] / results["before"]["rps"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""
+bcrypt cost calibration and rehash-on-login.
+
+    python -m benchmarks.bench_password_cost --targets 0.05,0.1,0.25 --users 40
+
+"calibration" runs calibrate_rounds for each target hash time on this machine
+and reports the chosen cost, its measured hash time and how long calibrating
+took, next to passlib's default cost. "login" starts the app (which calibrates
+for --target on a pool worker), seeds users whose stored hashes were made at
+a cost below and above the calibrated one, then logs every user in with the
+rehash off, then in rounds with it on until every stored hash is within
+PASSWORD_BCRYPT_REHASH_TOLERANCE of the calibrated cost. Login latency should
+stay close to the rehash-off run (rehashes are capped at
+PASSWORD_REHASH_MAX_CONCURRENCY per process, the rest wait for a later login),
+every hash must still verify, and one more round must change nothing.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.loadgen import configure_env, run_load
+
+configure_env()
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.utils.password_utils import calibrate_rounds, password_executor, pwd_context  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+PASSWORD = "Bench-Password-123!"
+
+
+def cost(password_hash: str) -> int:
+    return int(password_hash.split("$")[2])
+
+
+def bench_calibration(targets: List[float]) -> dict:
+    started = time.perf_counter()
+    pwd_context(12).hash(PASSWORD)
+    results = {"default_rounds_12_seconds": round(time.perf_counter() - started, 3)}
+    for target in targets:
+        started = time.perf_counter()
+        rounds, seconds = calibrate_rounds(target, 4, 16)
+        results[f"target_{target}"] = {
+            "rounds": rounds,
+            "hash_seconds": round(seconds, 3),
+            "calibration_seconds": round(time.perf_counter() - started, 3),
+        }
+    return results
+
+
+def stored_costs(fake: FakeSupabase) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for row in fake.tables.get("auth_methods", []):
+        counts[cost(row["password_hash"])] = counts.get(cost(row["password_hash"]), 0) + 1
+    return dict(sorted(counts.items()))
+
+
+async def bench_login(args: argparse.Namespace) -> dict:
+    from main import app
+
+    settings.PASSWORD_HASH_TARGET_SECONDS = args.target
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    results: dict = {}
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            started = time.perf_counter()
+            while password_executor.rounds is None and time.perf_counter() - started < 60:
+                await asyncio.sleep(0.05)
+            rounds = password_executor.rounds
+            results["calibrated_rounds"] = rounds
+            results["calibrated_after_ready_s"] = round(time.perf_counter() - started, 3)
+
+            # Half the users were hashed too cheaply, half too expensively for this machine
+            skewed = [max(4, rounds - 3), rounds + 2]
+            hashes = {rounds_: pwd_context(rounds_).hash(PASSWORD) for rounds_ in skewed}
+            for index in range(args.users):
+                user = fake.seed_user(email=f"user{index}@bench.dev", password=PASSWORD)
+                fake.tables.setdefault("auth_methods", []).append({
+                    "id": f"00000000-0000-4000-8000-{index:012d}",
+                    "user_id": user["id"],
+                    "auth_type": "email",
+                    "auth_id": user["email"],
+                    "is_primary": True,
+                    "created_at": user["created_at"],
+                    "password_hash": hashes[skewed[index % 2]],
+                })
+            results["stored_costs_before"] = stored_costs(fake)
+
+            service = app.state.auth_service
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                async def send(index: int) -> bool:
+                    payload = {"email": f"user{index % args.users}@bench.dev", "password": PASSWORD}
+                    response = await client.post("/api/v1/login", json=payload)
+                    return response.status_code == 200
+
+                async def login_round(rehash: bool) -> dict:
+                    settings.PASSWORD_REHASH_ON_LOGIN = rehash
+                    before = [dict(row) for row in fake.tables["auth_methods"]]
+                    load = await run_load(send, args.users, args.concurrency)
+                    started = time.perf_counter()
+                    while service._rehashes:
+                        await asyncio.sleep(0.01)
+                    load["rehash_settle_s"] = round(time.perf_counter() - started, 3)
+                    load["hashes_changed"] = sum(
+                        old["password_hash"] != new["password_hash"] for old, new in zip(before, fake.tables["auth_methods"])
+                    )
+                    return load
+
+                def settled() -> bool:
+                    tolerance = settings.PASSWORD_BCRYPT_REHASH_TOLERANCE
+                    return all(abs(cost(row["password_hash"]) - rounds) <= tolerance for row in fake.tables["auth_methods"])
+
+                results["rehash_off"] = await login_round(False)
+                # Rehashes beyond PASSWORD_REHASH_MAX_CONCURRENCY are skipped, so it takes several rounds of logins
+                rounds_on: List[dict] = []
+                while not settled() and len(rounds_on) < 100:
+                    rounds_on.append(await login_round(True))
+                results["rehash_on"] = {
+                    "login_rounds": len(rounds_on),
+                    "logins": len(rounds_on) * args.users,
+                    "hashes_changed": sum(load["hashes_changed"] for load in rounds_on),
+                    "p50_ms_median_round": sorted(load["p50_ms"] for load in rounds_on)[len(rounds_on) // 2],
+                    "p95_ms_median_round": sorted(load["p95_ms"] for load in rounds_on)[len(rounds_on) // 2],
+                    "p95_ms_worst_round": max(load["p95_ms"] for load in rounds_on),
+                }
+                results["rehash_on_again"] = await login_round(True)
+                results["stored_costs_after"] = stored_costs(fake)
+
+            results["all_verify"] = all(
+                pwd_context(rounds).verify(PASSWORD, row["password_hash"]) for row in fake.tables["auth_methods"]
+            )
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    return {"calibration": bench_calibration(args.targets), "login": await bench_login(args)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", type=lambda value: [float(target) for target in value.split(",")], default=[0.05, 0.1, 0.25])
+    parser.add_argument("--target", type=float, default=0.05, help="hash time the app calibrates for in the login run")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
@@ -0,0 +1,115 @@
+"""
+Password policy cost per check for short, typical, long and adversarial passwords.
+
+    python -m benchmarks.bench_password_policy --seconds 1
+
+Paths, per input:
+
+    legacy     five regex searches, then zxcvbn on the whole password (the previous validate_password)
+    estimator  PasswordPolicy.validate: length bounds, one pass for the character classes, zxcvbn on
+               the first PASSWORD_STRENGTH_MAX_CHARS characters (what a pool worker runs on a cache miss)
+    api        what the API process runs before deciding whether a pool job is needed: composition plus
+               the verdict cache lookup, here with the verdict cached
+
+"cold_start" runs the first check in a fresh interpreter, with and without
+zxcvbn imported beforehand, which is what warming the pool workers moves off
+the first registration.
+"""
+import argparse
+import json
+import random
+import re
+import string
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+from zxcvbn import zxcvbn  # noqa: E402
+
+from app.utils.password_utils import _precheck, password_policy  # noqa: E402
+
+
+def legacy(password: str) -> bool:
+    if len(password) < 12:
+        return False
+    for pattern in (r"[A-Z]", r"[a-z]", r"[0-9]", r"[+#!?@$%^&*-]"):
+        if not re.search(pattern, password):
+            return False
+    return zxcvbn(password)["score"] >= 3
+
+
+def make_inputs() -> Dict[str, str]:
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + "+#!?@$%^&*-"
+
+    def generated(length: int) -> str:
+        return "Aa1!" + "".join(rng.choice(alphabet) for _ in range(length - 4))
+
+    return {
+        "short": "Ab1!xyz",
+        "typical": generated(16),
+        "passphrase": "Correct-Horse-Battery-Staple-9",
+        "long_64": generated(64),
+        # Repetitive input is the slow case for zxcvbn's repeat and sequence matchers
+        "adversarial_72": "aA1!" * 18,
+        "adversarial_10k": "aA1!" * 2500,
+    }
+
+
+def time_path(path: Callable[[str], object], password: str, budget: float) -> float:
+    """Best-of-five mean seconds per call, each round running for about budget / 5 seconds."""
+    path(password)
+    best = float("inf")
+    for _ in range(5):
+        calls, started = 0, time.perf_counter()
+        while True:
+            path(password)
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= budget / 5:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def cold_start() -> Dict[str, float]:
+    """Milliseconds to the first verdict in a fresh interpreter, with and without the zxcvbn import warmed."""
+    script = (
+        "import time\n"
+        "{warm}\n"
+        "started = time.perf_counter()\n"
+        "from zxcvbn import zxcvbn\n"
+        "zxcvbn('Tr0ub4dor&3-horse')\n"
+        "print((time.perf_counter() - started) * 1000)\n"
+    )
+    results = {}
+    for name, warm in (("cold_first_check_ms", ""), ("warm_first_check_ms", "from zxcvbn import zxcvbn; zxcvbn('warm-up')")):
+        runs = [float(subprocess.run([sys.executable, "-c", script.format(warm=warm)], capture_output=True, text=True, check=True).stdout) for _ in range(3)]
+        results[name] = round(min(runs), 2)
+    return results
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {}
+    for name, password in make_inputs().items():
+        password_policy.remember_strength(password, password_policy.check_strength(password))
+        row = {"length": len(password), "verdict": password_policy.validate(password)}
+        for path_name, path in (("legacy", legacy), ("estimator", password_policy.validate), ("api", _precheck)):
+            try:
+                row[f"{path_name}_us"] = round(time_path(path, password, args.seconds) * 1e6, 1)
+            except ValueError as e:
+                row[f"{path_name}_us"] = f"error: {e}"
+        results[name] = row
+    results["cold_start"] = cold_start()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per path and input")
+    main(parser.parse_args())
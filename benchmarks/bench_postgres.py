@@ -0,0 +1,174 @@
+"""
+Repository backends side by side: PostgREST (through the fake server) vs asyncpg on a real Postgres.
+
+    python -m benchmarks.bench_postgres --database-url postgresql://localhost/skillsync_bench --concurrency 32
+
+The database is (re)initialised from benchmarks/schema.sql, so point it at a
+scratch database. Both backends get the same seeded users and companies; each
+operation runs --iterations times at --concurrency and reports ops/s and
+mean/p99 latency. --latency-ms adds delay to the fake PostgREST server only, to
+model the extra network hop the REST path takes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env()
+
+import asyncpg  # noqa: E402
+
+from app.domain.auth.models import UserInDB  # noqa: E402
+from app.infrastructure.postgres_client import PostgresClient  # noqa: E402
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from app.repositories.auth_repository import AuthRepository  # noqa: E402
+from app.repositories.company_repository import CompanyRepository  # noqa: E402
+from app.repositories.postgres_auth_repository import PostgresAuthRepository  # noqa: E402
+from app.repositories.postgres_company_repository import PostgresCompanyRepository  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+SCHEMA = os.path.join(os.path.dirname(__file__), "schema.sql")
+
+
+async def prepare_database(database_url: str, users: List[Dict[str, Any]], companies: List[Dict[str, Any]]) -> None:
+    connection = await asyncpg.connect(database_url)
+    try:
+        await connection.execute("DROP TABLE IF EXISTS social_accounts, auth_methods, users, companies CASCADE")
+        with open(SCHEMA) as f:
+            await connection.execute(f.read())
+        await connection.copy_records_to_table(
+            "companies", records=[tuple(row.values()) for row in companies], columns=list(companies[0])
+        )
+        await connection.copy_records_to_table(
+            "users", records=[tuple(row.values()) for row in users], columns=list(users[0])
+        )
+        await connection.executemany(
+            "INSERT INTO social_accounts (user_id, provider, social_id) VALUES ($1, 'google', $2)",
+            [(row["id"], f"google-{index}") for index, row in enumerate(users)]
+        )
+    finally:
+        await connection.close()
+
+
+def seed_rows(count: int) -> Dict[str, List[Dict[str, Any]]]:
+    companies = [
+        {"id": f"00000000-0000-4000-8000-{index:012d}", "company_name": f"Company {index}", "registration_number": None,
+         "country": "IN", "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00"}
+        for index in range(max(count // 10, 1))
+    ]
+    users = [
+        UserInDB(email=f"user{index}@bench.dev", phone=f"+91990{index:07d}", first_name="Bench", last_name="User",
+                 country="IN", user_type="job_seeker").model_dump(mode="json")
+        for index in range(count)
+    ]
+    return {"users": users, "companies": companies}
+
+
+def to_python(rows: List[Dict[str, Any]], model) -> List[Dict[str, Any]]:
+    return [model(**row).model_dump() for row in rows]
+
+
+async def measure(op: Callable[[int], Awaitable[Any]], iterations: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    counter = iter(range(iterations))
+
+    async def worker() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            await op(index)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "ops_per_second": round(iterations / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def operations(auth: AuthRepository, companies: CompanyRepository, count: int) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    pick = random.Random(7)
+
+    async def get_by_email(index: int) -> None:
+        assert await auth.get_by_email(f"user{pick.randrange(count)}@bench.dev")
+
+    async def get_by_phone(index: int) -> None:
+        assert await auth.get_by_phone(f"+91990{pick.randrange(count):07d}")
+
+    async def get_by_social_id(index: int) -> None:
+        assert await auth.get_by_social_id("google", f"google-{pick.randrange(count)}")
+
+    async def get_company_by_name(index: int) -> None:
+        # The uncached storage call, so the caches in front of it do not hide the backend
+        assert await companies._fetch_by_name(f"Company {pick.randrange(max(count // 10, 1))}")
+
+    async def create_user(index: int) -> None:
+        await auth.create(UserInDB(email=f"new{index}-{time.monotonic_ns()}@bench.dev", first_name="New",
+                                   last_name="User", country="IN", user_type="job_seeker"))
+
+    return {
+        "get_by_email": get_by_email,
+        "get_by_phone": get_by_phone,
+        "get_by_social_id": get_by_social_id,
+        "get_company_by_name": get_company_by_name,
+        "create_user": create_user,
+    }
+
+
+async def run_backend(auth: AuthRepository, companies: CompanyRepository, args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        name: await measure(op, args.iterations, args.concurrency)
+        for name, op in operations(auth, companies, args.users).items()
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rows = seed_rows(args.users)
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    fake.tables["users"] = [dict(row) for row in rows["users"]]
+    fake.tables["companies"] = [dict(row) for row in rows["companies"]]
+    fake.tables["social_accounts"] = [
+        {"id": str(index), "user_id": row["id"], "provider": "google", "social_id": f"google-{index}"}
+        for index, row in enumerate(rows["users"])
+    ]
+    from app.domain.company.models import Company
+    await prepare_database(args.database_url, to_python(rows["users"], UserInDB), to_python(rows["companies"], Company))
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.core.config import settings
+    settings.DATABASE_URL = args.database_url
+    settings.DATABASE_POOL_MAX_SIZE = args.pool_size
+
+    results = {}
+    with FakeSupabaseServer(fake):
+        await SupabaseClient.connect()
+        await PostgresClient.connect()
+        try:
+            results["postgrest"] = await run_backend(AuthRepository(), CompanyRepository(), args)
+            results["postgres"] = await run_backend(PostgresAuthRepository(), PostgresCompanyRepository(), args)
+        finally:
+            await PostgresClient.close()
+            await SupabaseClient.close()
+    results["speedup"] = {
+        name: round(results["postgres"][name]["ops_per_second"] / results["postgrest"][name]["ops_per_second"], 1)
+        for name in results["postgres"]
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "postgresql://localhost/skillsync_bench"))
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""
+Rate limiter cost: per-check time and memory with millions of distinct keys, and 429 latency through the app.
+
+    python -m benchmarks.bench_rate_limit --keys 1000000
+
+"store" hits a SlidingWindowStore with --keys distinct phone numbers (the bot
+burst case) and reports ns per hit and bytes per tracked key. "app" sends
+/send-otp for one phone until it is limited and reports the latency of the
+rejected requests and how many reached the fake Supabase server.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env(RATE_LIMIT_ENABLED="true")
+
+import httpx  # noqa: E402
+
+from app.core.rate_limit import SlidingWindowStore  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+
+def bench_store(keys: int) -> dict:
+    phones = [f"+91{index:010d}" for index in range(keys)]
+    now = time.monotonic()
+
+    tracemalloc.start()
+    store = SlidingWindowStore(5, 3600)
+    for phone in phones:
+        store.hit(phone, now)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    store = SlidingWindowStore(5, 3600)
+    started = time.perf_counter()
+    for phone in phones:
+        if not store.retry_after(phone, now):
+            store.hit(phone, now)
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for phone in phones[:100000]:
+        store.retry_after(phone, now)
+        store.hit(phone, now)
+    repeat = time.perf_counter() - started
+
+    # Three windows later every key is due; the sweeper drains them a batch per hit
+    later = now + 3 * 3600
+    slowest_hit = 0.0
+    hits_to_drain = 0
+    while len(store) > 1 and hits_to_drain < 10 * keys:
+        hit_started = time.perf_counter()
+        store.hit("+910000000000", later)
+        slowest_hit = max(slowest_hit, time.perf_counter() - hit_started)
+        hits_to_drain += 1
+    return {
+        "keys": keys,
+        "new_key_check_and_hit_ns": round(elapsed / keys * 1e9),
+        "existing_key_check_and_hit_ns": round(repeat / 100000 * 1e9),
+        "bytes_per_key": round(memory / keys),
+        "hits_to_expire_all": hits_to_drain,
+        "slowest_hit_while_expiring_us": round(slowest_hit * 1e6, 1),
+        "keys_after_expiry": len(store),
+    }
+
+
+async def bench_app(requests: int, latency_ms: float) -> dict:
+    from main import app
+
+    fake = FakeSupabase(latency=latency_ms / 1000)
+    admitted, rejected = [], []
+    with FakeSupabaseServer(fake):
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = await client.post("/api/v1/send-otp", params={"phone": "+919900000001"})
+                    (rejected if response.status_code == 429 else admitted).append(time.perf_counter() - started)
+    return {
+        "admitted": len(admitted),
+        "rejected": len(rejected),
+        "supabase_requests": fake.request_count,
+        "admitted_p50_ms": round(percentile(admitted, 50) * 1000, 3),
+        "rejected_p50_ms": round(percentile(rejected, 50) * 1000, 3),
+        "rejected_p99_ms": round(percentile(rejected, 99) * 1000, 3),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {
+        "store": bench_store(args.keys),
+        "app": asyncio.run(bench_app(args.requests, args.latency_ms)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    main(parser.parse_args())
@@ -0,0 +1,160 @@
+"""
+Supabase resilience layer against a fault-injecting fake: stalls, an outage and slow tails.
+
+    python -m benchmarks.bench_resilience --requests 2000 --concurrency 16
+
+Each scenario looks users up by email through AuthRepository (one request per
+lookup, batching off) with the plain pooled transport and with the
+ResilientTransport, and reports latency, failures and how many requests
+reached the fake server:
+
+    stall   --stall-rate of requests hang for --stall-seconds; timeouts plus retries bound the wait
+    outage  every request fails with 503; the breaker opens and later requests fail without a round trip,
+            then the fake heals and the time until the breaker closes again is measured
+    tail    --tail-rate of requests take --tail-seconds longer; hedged reads cut the p99
+    gzip    every response is gzip-encoded; each transport must decode it once and fail nothing
+
+Exits 1 when the resilient transport does not beat the plain one where it should.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.loadgen import configure_env, percentile
+
+configure_env()
+
+from app.core.config import settings  # noqa: E402
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from app.repositories.auth_repository import AuthRepository  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+USERS = 500
+
+
+async def connect(mode: str, args: argparse.Namespace) -> None:
+    settings.SUPABASE_RESILIENCE_ENABLED = mode != "plain"
+    settings.SUPABASE_HEDGE_ENABLED = mode == "hedged"
+    settings.SUPABASE_OPERATION_TIMEOUTS = {"read": args.read_timeout, "write": 5.0, "auth": 5.0, "other": 10.0}
+    settings.SUPABASE_BREAKER_OPEN_SECONDS = args.open_seconds
+    settings.SUPABASE_READ_TIMEOUT = args.stall_seconds * 2  # the plain client waits out every stall
+    await SupabaseClient.connect()
+
+
+async def lookups(fake: FakeSupabase, emails: List[str], args: argparse.Namespace) -> Dict[str, float]:
+    repo = AuthRepository()
+    for loader in repo._loaders.values():
+        loader.max_batch_size = 1
+    latencies: List[float] = []
+    failures = 0
+    counter = iter(range(args.requests))
+
+    async def worker() -> None:
+        nonlocal failures
+        for _ in counter:
+            started = time.perf_counter()
+            try:
+                await repo.get_by_email(random.choice(emails))
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    fake.request_count = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "failures": failures,
+        "upstream_requests": fake.request_count,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+async def scenario(name: str, fake: FakeSupabase, emails: List[str], modes: List[str], args: argparse.Namespace) -> dict:
+    results = {}
+    for mode in modes:
+        await connect(mode, args)
+        try:
+            # Healthy warm-up gives the hedging delay its latency samples
+            await lookups(fake, emails, argparse.Namespace(**{**vars(args), "requests": 200}))
+            fake.inject_faults(**{
+                "stall": dict(slow_rate=args.stall_rate, slow_seconds=args.stall_seconds),
+                "outage": dict(error_rate=1.0),
+                "tail": dict(slow_rate=args.tail_rate, slow_seconds=args.tail_seconds),
+                "gzip": dict(gzip=True),
+            }[name])
+            result = await lookups(fake, emails, args)
+            result["faults"] = fake.faults
+            resilience = SupabaseClient.get_resilience()
+            if name == "outage" and resilience:
+                result["breaker_opened"] = resilience.breakers["rest"].stats()["opened"]
+                fake.inject_faults()
+                healed = time.perf_counter()
+                while resilience.breakers["rest"].state != "closed" and time.perf_counter() - healed < 60:
+                    await lookups(fake, emails, argparse.Namespace(**{**vars(args), "requests": 1, "concurrency": 1}))
+                    await asyncio.sleep(0.05)
+                result["closed_after_heal_s"] = round(time.perf_counter() - healed, 2)
+            if resilience:
+                stats = resilience.stats()
+                result["transport"] = {key: stats[key] for key in ("timeouts", "retries", "rejected", "hedges", "hedges_won")}
+            results[mode] = result
+        finally:
+            fake.inject_faults()
+            await SupabaseClient.close()
+    return results
+
+
+def check(results: dict) -> List[str]:
+    failed = []
+    stall, outage, tail, gzip = results["stall"], results["outage"], results["tail"], results["gzip"]
+    if stall["resilient"]["p99_ms"] >= stall["plain"]["p99_ms"]:
+        failed.append("stall: timeouts and retries did not lower the p99")
+    if stall["resilient"]["failures"] > stall["plain"]["failures"] + stall["resilient"]["transport"]["timeouts"]:
+        failed.append("stall: more failures than timed-out attempts explain")
+    if not outage["resilient"].get("breaker_opened"):
+        failed.append("outage: breaker never opened")
+    if outage["resilient"]["upstream_requests"] >= outage["plain"]["upstream_requests"] / 2:
+        failed.append("outage: open breaker did not shed upstream requests")
+    if outage["resilient"]["closed_after_heal_s"] >= 60:
+        failed.append("outage: breaker did not close after the fake healed")
+    if tail["hedged"]["p99_ms"] >= tail["plain"]["p99_ms"]:
+        failed.append("tail: hedging did not lower the p99")
+    for mode, result in gzip.items():
+        if result["failures"]:
+            failed.append(f"gzip: {result['failures']} failed lookups with the {mode} transport")
+    return failed
+
+
+async def main(args: argparse.Namespace) -> int:
+    fake = FakeSupabase(latency=args.latency_ms / 1000, jitter=args.latency_ms / 1000)
+    emails = [fake.seed_user(email=f"user{index}@bench.dev")["email"] for index in range(USERS)]
+    with FakeSupabaseServer(fake):
+        results = {
+            "stall": await scenario("stall", fake, emails, ["plain", "resilient"], args),
+            "outage": await scenario("outage", fake, emails, ["plain", "resilient"], args),
+            "tail": await scenario("tail", fake, emails, ["plain", "resilient", "hedged"], args),
+            "gzip": await scenario("gzip", fake, emails, ["plain", "resilient", "hedged"], args),
+        }
+    results["failed_checks"] = check(results)
+    print(json.dumps(results, indent=2))
+    return 1 if results["failed_checks"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--read-timeout", type=float, default=0.5)
+    parser.add_argument("--open-seconds", type=float, default=1.0)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    parser.add_argument("--stall-seconds", type=float, default=2.0)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-seconds", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
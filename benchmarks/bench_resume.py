@@ -0,0 +1,196 @@
+"""
+Resume ingestion throughput and event-loop impact.
+
+    python -m benchmarks.bench_resume --documents 16 --pages 20 --concurrency 1,4,8
+
+Generates multi-page PDFs and DOCX files, then feeds them through
+SpooledUpload and ResumeService (stored in the fake Supabase) at each
+concurrency level. Reports pages/s, MB/s, time to first page and per-upload
+latency, plus the worst event-loop stall seen while parsing on the pool vs
+parsing inline on the loop.
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import statistics
+import time
+from typing import List, Tuple
+from uuid import uuid4
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from app.services.resume_service import DocumentParserPool, ResumeService, SpooledUpload  # noqa: E402
+from app.utils.document_text import count_pdf_pages, extract_pdf_pages  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+WORDS = (
+    "python fastapi postgres kubernetes docker terraform react typescript aws gcp kafka redis "
+    "led team delivered migrated designed scaled reduced latency improved reliability mentored "
+    "engineer senior backend platform data pipeline analytics product stakeholder roadmap"
+).split()
+CHUNK_BYTES = 64 * 1024
+
+
+def _lines(rng: random.Random, count: int) -> List[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))) for _ in range(count)]
+
+
+def make_pdf(pages: int, seed: int, lines_per_page: int = 45) -> bytes:
+    """A minimal text-only PDF: one Helvetica content stream per page."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        text = "".join(f"({line}) Tj T* " for line in _lines(rng, lines_per_page))
+        stream = f"BT /F1 10 Tf 12 TL 50 800 Td {text}ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int, seed: int) -> bytes:
+    import docx
+    document = docx.Document()
+    for line in _lines(random.Random(seed), paragraphs):
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def spool(content: bytes, filename: str) -> SpooledUpload:
+    upload = SpooledUpload.from_settings(filename)
+    for start in range(0, len(content), CHUNK_BYTES):
+        upload.write(content[start:start + CHUNK_BYTES])
+    return upload
+
+
+class LoopLag:
+    """Worst delay of a 5 ms ticker, i.e. the longest the event loop was blocked."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.worst = 0.0
+        self._task = None
+
+    async def _tick(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.worst = max(self.worst, time.perf_counter() - started - self.interval)
+
+    def __enter__(self) -> "LoopLag":
+        self._task = asyncio.ensure_future(self._tick())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._task.cancel()
+
+
+async def ingest_one(service: ResumeService, content: bytes, filename: str) -> Tuple[float, float, int]:
+    started = time.perf_counter()
+    first_page = None
+    pages = 0
+    with spool(content, filename) as upload:
+        async for _ in service.ingest(uuid4(), upload):
+            if first_page is None:
+                first_page = time.perf_counter() - started
+            pages += 1
+    return first_page or 0.0, time.perf_counter() - started, pages
+
+
+async def run_level(service: ResumeService, corpus: List[Tuple[str, bytes]], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(filename: str, content: bytes) -> Tuple[float, float, int]:
+        async with semaphore:
+            return await ingest_one(service, content, filename)
+
+    with LoopLag() as lag:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(filename, content) for filename, content in corpus))
+        elapsed = time.perf_counter() - started
+    first_pages = sorted(result[0] for result in results)
+    latencies = sorted(result[1] for result in results)
+    pages = sum(result[2] for result in results)
+    megabytes = sum(len(content) for _, content in corpus) / (1024 * 1024)
+    return {
+        "pages_per_s": round(pages / elapsed, 1),
+        "mb_per_s": round(megabytes / elapsed, 2),
+        "first_page_p50_ms": round(statistics.median(first_pages) * 1000, 1),
+        "upload_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "upload_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "loop_lag_max_ms": round(lag.worst * 1000, 1),
+    }
+
+
+async def inline_lag(corpus: List[Tuple[str, bytes]]) -> dict:
+    """The same PDFs parsed on the event loop itself, for comparison."""
+    with LoopLag() as lag:
+        started = time.perf_counter()
+        pages = 0
+        for _, content in corpus:
+            pages += len(extract_pdf_pages(content, 0, count_pdf_pages(content)))
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+    return {"pages_per_s": round(pages / elapsed, 1), "loop_lag_max_ms": round(lag.worst * 1000, 1)}
+
+
+async def main(args: argparse.Namespace) -> None:
+    pdfs = [(f"resume-{index}.pdf", make_pdf(args.pages, index)) for index in range(args.documents)]
+    docxs = [(f"resume-{index}.docx", make_docx(args.pages * 40, index)) for index in range(args.documents)]
+    pool = DocumentParserPool(workers=args.workers, max_concurrency=args.workers, max_queue=1024)
+    service = ResumeService(parser_pool=pool)
+    results = {
+        "documents": args.documents,
+        "pages": args.pages,
+        "workers": args.workers,
+        "pdf_kb": round(statistics.mean(len(content) for _, content in pdfs) / 1024, 1),
+        "docx_kb": round(statistics.mean(len(content) for _, content in docxs) / 1024, 1),
+    }
+    with FakeSupabaseServer(FakeSupabase()):
+        await SupabaseClient.connect()
+        try:
+            await pool.spawn_all(time.time)
+            for concurrency in args.concurrency:
+                results[f"pdf_c{concurrency}"] = await run_level(service, pdfs, concurrency)
+                results[f"docx_c{concurrency}"] = await run_level(service, docxs, concurrency)
+            results["pdf_inline"] = await inline_lag(pdfs)
+        finally:
+            pool.shutdown()
+            await SupabaseClient.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--concurrency", type=lambda value: [int(level) for level in value.split(",")], default=[1, 4, 8]
+    )
+    asyncio.run(main(parser.parse_args()))
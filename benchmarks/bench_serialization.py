@@ -0,0 +1,118 @@
+"""
+Response serialization cost: from a PostgREST JSON row to the bytes of a UserResponse body.
+
+    python -m benchmarks.bench_serialization --sizes 1,100,1000
+
+Each path starts from decoded row dicts (what the Supabase client hands the
+repository) and ends with the response body, for one user and for lists:
+
+    legacy           UserInDB(**row), then UserResponse(**user.model_dump()), then dump_json
+    from_attributes  UserRow rows, then UserResponse.model_validate(user, from_attributes=True), then dump_json
+    orjson           UserRow rows, then UserResponse.project(user), then orjson.dumps(model_dump(mode="json"))
+                     (what an ORJSONResponse default would do)
+    projected        UserRow rows, then UserResponse.project(user), then dump_json (what the routes do now)
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+from uuid import uuid4
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.api.v1.auth.schemas import UserResponse  # noqa: E402
+from app.domain.auth.models import UserInDB, UserRow  # noqa: E402
+from app.repositories.base import rows_adapter  # noqa: E402
+
+RESPONSES = TypeAdapter(List[UserResponse])
+
+
+def make_rows(count: int) -> List[dict]:
+    now = datetime(2025, 1, 1)
+    return [
+        UserInDB(
+            email=f"user{index}@example.com",
+            phone=f"+91{index:010d}",
+            first_name="Asha",
+            last_name="Rao",
+            country="IN",
+            user_type="job_seeker",
+            work_status="open",
+            company_id=uuid4(),
+            created_at=now + timedelta(seconds=index),
+            updated_at=now + timedelta(seconds=index),
+        ).model_dump(mode="json")
+        for index in range(count)
+    ]
+
+
+def legacy(rows: List[dict]) -> bytes:
+    users = [UserInDB(**row) for row in rows]
+    return RESPONSES.dump_json([UserResponse(**user.model_dump()) for user in users])
+
+
+def from_attributes(rows: List[dict]) -> bytes:
+    users = rows_adapter(UserRow).validate_python(rows)
+    return RESPONSES.dump_json([UserResponse.model_validate(user, from_attributes=True) for user in users])
+
+
+def orjson_response(rows: List[dict]) -> bytes:
+    users = rows_adapter(UserRow).validate_python(rows)
+    return orjson.dumps([UserResponse.project(user).model_dump(mode="json") for user in users])
+
+
+def projected(rows: List[dict]) -> bytes:
+    users = rows_adapter(UserRow).validate_python(rows)
+    return RESPONSES.dump_json([UserResponse.project(user) for user in users])
+
+
+PATHS = {
+    "legacy": legacy,
+    "from_attributes": from_attributes,
+    "orjson": orjson_response,
+    "projected": projected,
+}
+
+
+def time_path(path: Callable[[List[dict]], bytes], rows: List[dict], budget: float) -> float:
+    """Best-of-five mean seconds per call, each round running for about budget / 5 seconds."""
+    path(rows)
+    best = float("inf")
+    for _ in range(5):
+        calls, started = 0, time.perf_counter()
+        while True:
+            path(rows)
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= budget / 5:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {}
+    for size in args.sizes:
+        rows = make_rows(size)
+        bodies = {name: json.loads(path(rows)) for name, path in PATHS.items()}
+        assert all(body == bodies["legacy"] for body in bodies.values()), "paths disagree on the response body"
+
+        timings = {name: time_path(path, rows, args.seconds) for name, path in PATHS.items()}
+        results[f"users_{size}"] = {
+            **{f"{name}_us": round(seconds * 1e6, 1) for name, seconds in timings.items()},
+            "projected_speedup_vs_legacy": round(timings["legacy"] / timings["projected"], 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[1, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per path and size")
+    main(parser.parse_args())
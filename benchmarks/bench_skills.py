@@ -0,0 +1,183 @@
+"""
+Skill extraction: Aho-Corasick automaton vs one regex per skill term, at a 20k-term taxonomy.
+
+    python -m benchmarks.bench_skills --terms 20000 --documents 200
+
+The taxonomy is the bundled one padded with generated multi-word and
+versioned terms; documents are resume-like text with taxonomy terms mixed in.
+
+    compile_ms      building the automaton vs compiling every regex
+    per_doc_ms      scanning one document (p50) with each approach
+    agreement       both approaches find the same (start, end, term) occurrences
+    batch           documents/s for extract_many on the process pool vs inline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+from typing import List, Set, Tuple
+
+from benchmarks.loadgen import configure_env
+
+configure_env()
+
+from app.core.config import settings  # noqa: E402
+from app.services.skill_service import (  # noqa: E402
+    BUNDLED_TAXONOMY,
+    SkillExtractionPool,
+    SkillExtractor,
+    SkillService,
+    SkillTaxonomy,
+    get_skill_extractor,
+)
+from benchmarks.bench_resume import WORDS  # noqa: E402
+
+SUFFIXES = ("js", "db", "ql", "ops", "kit", "io", "ml", "api", "sdk", "cloud")
+
+
+def make_taxonomy(terms: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    with open(BUNDLED_TAXONOMY, encoding="utf-8") as file:
+        data = json.load(file)
+    seen = {term.lower() for skill in data["skills"] for term in [skill["name"]] + skill["aliases"]}
+    skills = list(data["skills"])
+    while len(seen) < terms:
+        shape = rng.random()
+        if shape < 0.4:
+            name = f"{rng.choice(WORDS)} {rng.choice(WORDS)}"
+        elif shape < 0.7:
+            name = f"{rng.choice(WORDS)}{rng.choice(SUFFIXES)}"
+        else:
+            name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randint(1, 20)}"
+        aliases = [name.replace(" ", "-")] if " " in name and rng.random() < 0.5 else []
+        fresh = [term for term in [name] + aliases if term.lower() not in seen]
+        if not fresh:
+            continue
+        seen.update(term.lower() for term in fresh)
+        skills.append({"id": f"s{len(skills)}", "name": fresh[0], "category": "generated", "aliases": fresh[1:]})
+    return {"version": "bench", "skills": skills}
+
+
+def make_documents(taxonomy: SkillTaxonomy, documents: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    terms = list(taxonomy.terms)
+    corpus = []
+    for _ in range(documents):
+        words = []
+        for _ in range(rng.randint(600, 1500)):
+            words.append(rng.choice(terms) if rng.random() < 0.03 else rng.choice(WORDS))
+            if rng.random() < 0.08:
+                words[-1] += rng.choice((".", ",", ";", "\n"))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def compile_regexes(taxonomy: SkillTaxonomy) -> List[Tuple[str, "re.Pattern[str]"]]:
+    patterns = []
+    for term in taxonomy.terms:
+        before = r"(?<!\w)" if re.match(r"\w", term) else ""
+        after = r"(?!\w)" if re.search(r"\w$", term) else ""
+        # Multi-word terms match across any whitespace run, as the automaton does
+        body = r"\s+".join(re.escape(word) for word in term.split(" "))
+        patterns.append((term, re.compile(before + body + after, re.IGNORECASE)))
+    return patterns
+
+
+def regex_matches(patterns, text: str) -> Set[Tuple[int, int, str]]:
+    return {(match.start(), match.end(), term) for term, pattern in patterns for match in pattern.finditer(text)}
+
+
+def automaton_matches(extractor: SkillExtractor, text: str) -> Set[Tuple[int, int, str]]:
+    # finditer never reports overlapping occurrences of one term ("go go go" for "go go"), so neither does this
+    matches, covered = set(), {}
+    for start, end, _ in sorted(extractor.automaton.iter_matches(text)):
+        term = " ".join(text[start:end].lower().split())
+        if start >= covered.get(term, 0):
+            matches.add((start, end, term))
+            covered[term] = end
+    return matches
+
+
+def p50_ms(fn, inputs) -> float:
+    samples = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+async def batch(documents: List[str], workers: int) -> dict:
+    service = SkillService(resume_repo=object(), pool=SkillExtractionPool(workers=workers, max_concurrency=workers, max_queue=1024))
+    started = time.perf_counter()
+    await service.warm_pool()
+    spawn_s = time.perf_counter() - started
+    started = time.perf_counter()
+    results = await service.extract_many(documents)
+    seconds = time.perf_counter() - started
+    service.pool.shutdown()
+    return {
+        "workers": workers,
+        "spawn_s": round(spawn_s, 2),
+        "docs_per_s": round(len(documents) / seconds, 1),
+        "skills_found": sum(len(matches) for matches in results),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    data = make_taxonomy(args.terms, seed=1)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "taxonomy.json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    # Spawned pool workers read the path from the environment
+    os.environ["SKILL_TAXONOMY_PATH"] = settings.SKILL_TAXONOMY_PATH = path
+    get_skill_extractor.cache_clear()
+
+    taxonomy = SkillTaxonomy.load(path)
+    started = time.perf_counter()
+    extractor = SkillExtractor(taxonomy)
+    automaton_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    patterns = compile_regexes(taxonomy)
+    regex_ms = (time.perf_counter() - started) * 1000
+
+    documents = make_documents(taxonomy, args.documents, seed=2)
+    sample = documents[:args.regex_documents]
+    results = {
+        "terms": len(taxonomy.terms),
+        "skills": len(taxonomy),
+        "automaton_states": len(extractor.automaton),
+        "documents": len(documents),
+        "avg_doc_chars": round(statistics.mean(len(text) for text in documents)),
+        "compile_ms": {"automaton": round(automaton_ms, 1), "regex": round(regex_ms, 1)},
+        "per_doc_ms": {
+            "automaton_scan": p50_ms(lambda text: list(extractor.automaton.iter_matches(text)), documents),
+            "automaton_extract": p50_ms(extractor.extract, documents),
+            "regex": p50_ms(lambda text: regex_matches(patterns, text), sample),
+        },
+        "agreement": all(regex_matches(patterns, text) == automaton_matches(extractor, text) for text in sample),
+    }
+    results["speedup"] = round(results["per_doc_ms"]["regex"] / results["per_doc_ms"]["automaton_extract"], 1)
+
+    started = time.perf_counter()
+    for text in documents:
+        extractor.extract(text)
+    results["batch"] = [{"workers": 0, "docs_per_s": round(len(documents) / (time.perf_counter() - started), 1)}]
+    for workers in args.workers:
+        results["batch"].append(await batch(documents, workers))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=20_000)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--regex-documents", type=int, default=10)
+    parser.add_argument("--workers", type=lambda value: [int(count) for count in value.split(",")], default=[1, os.cpu_count() or 1])
+    asyncio.run(main(parser.parse_args()))
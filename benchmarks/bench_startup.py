@@ -0,0 +1,91 @@
+"""
+Worker cold start: boots real uvicorn workers and checks process start to ready against the target.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 5 --target-ms 1500     # exit 1 when the median boot is slower
+
+Each run starts `uvicorn main:app` in a fresh process against the fake Supabase
+server, polls /ready until it answers 200 and keeps the startup report it
+returns. Prints the median and worst boot_ms, the median split into
+interpreter / import / lifespan time, and the slowest imports of the median
+run. The target defaults to STARTUP_TARGET_SECONDS.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from benchmarks.loadgen import BENCH_ENV
+
+import httpx  # noqa: E402
+
+from benchmarks.fake_supabase import FakeSupabase, FakeSupabaseServer  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_once(timeout: float) -> Dict[str, Any]:
+    port = free_port()
+    env = {**os.environ, **BENCH_ENV}
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if worker.poll() is not None:
+                raise RuntimeError(f"worker exited: {worker.stderr.read().decode()[-2000:]}")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1.0)
+                if response.status_code == 200:
+                    return {**response.json(), "observed_ms": round((time.perf_counter() - started) * 1000, 1)}
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"worker not ready after {timeout}s")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def main(args: argparse.Namespace) -> None:
+    with FakeSupabaseServer(FakeSupabase(latency=args.latency_ms / 1000)):
+        reports = [boot_once(args.timeout) for _ in range(args.runs)]
+
+    reports.sort(key=lambda report: report["boot_ms"])
+    median = reports[len(reports) // 2]
+    target_ms = args.target_ms or median["target_ms"]
+    results = {
+        "runs": len(reports),
+        "boot_ms_median": statistics.median(report["boot_ms"] for report in reports),
+        "boot_ms_max": reports[-1]["boot_ms"],
+        "observed_ms_median": statistics.median(report["observed_ms"] for report in reports),
+        "median_run": {key: median[key] for key in ("interpreter_ms", "import_ms", "lifespan_ms", "phases_ms")},
+        "slowest_imports": median["slowest_imports"],
+        "target_ms": target_ms,
+    }
+    results["within_target"] = results["boot_ms_median"] <= target_ms
+    print(json.dumps(results, indent=2))
+    if not results["within_target"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake Supabase latency per request")
+    parser.add_argument("--target-ms", type=float, default=None, help="defaults to the target the workers report")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+"""
+VectorIndex at scale: build, top-k query latency with and without pre-filters, compaction and snapshots.
+
+    python -m benchmarks.bench_vector_index --sizes 100000,1000000 --dimensions 256
+
+For each size the index is filled with random unit vectors and attribute values
+drawn like the user table (40 countries, 2 user types, 2 work statuses), then:
+
+    argsort_ms     a full sort of all scores, the naive top-k
+    topk_ms        VectorIndex.search, unfiltered (argpartition)
+    country_ms     filtered to one country (~2.5% of rows)
+    combined_ms    country + user_type + work_status (~0.6% of rows)
+    compact_ms     compaction after tombstoning 10% of rows
+    save_ms / load_ms / first_query_ms   snapshot round trip through copy-on-write memory maps
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from app.infrastructure.vector_index import VectorIndex
+
+ATTRIBUTES = ("country", "user_type", "work_status")
+COUNTRIES = [f"C{index:02d}" for index in range(40)]
+
+
+def timed_ms(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {"p50": round(statistics.median(samples), 2), "p95": round(samples[int(len(samples) * 0.95) - 1], 2)}
+
+
+def run(size: int, dimensions: int, k: int, queries: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    ids = [str(uuid.UUID(int=int(value))) for value in rng.integers(0, 2 ** 63, size)]
+    countries = rng.integers(0, len(COUNTRIES), size)
+    user_types = rng.integers(0, 2, size)
+    statuses = rng.integers(0, 2, size)
+
+    index = VectorIndex(dimensions, ATTRIBUTES)
+    started = time.perf_counter()
+    for start in range(0, size, 10_000):
+        block = rng.standard_normal((min(10_000, size - start), dimensions), dtype=np.float32)
+        for offset, vector in enumerate(block):
+            row = start + offset
+            index.upsert(ids[row], vector, {
+                "country": COUNTRIES[countries[row]],
+                "user_type": ("job_seeker", "client")[user_types[row]],
+                "work_status": ("experienced", "fresher")[statuses[row]],
+            })
+    result = {"size": size, "build_s": round(time.perf_counter() - started, 1)}
+
+    probes = iter(rng.standard_normal((queries * 4 + 8, dimensions), dtype=np.float32))
+    matrix = index._vectors[:size]
+
+    def argsort_topk():
+        scores = matrix @ next(probes)
+        np.argsort(-scores)[:k]
+
+    result["argsort_ms"] = timed_ms(argsort_topk, queries)
+    result["topk_ms"] = timed_ms(lambda: index.search(next(probes), k), queries)
+    result["country_ms"] = timed_ms(lambda: index.search(next(probes), k, {"country": ["C07"]}), queries)
+    result["combined_ms"] = timed_ms(lambda: index.search(next(probes), k, {
+        "country": ["C07", "C11"], "user_type": ["job_seeker"], "work_status": ["experienced"],
+    }), queries)
+
+    for id in ids[::10]:
+        index.delete(id)
+    started = time.perf_counter()
+    index.compact()
+    result["compact_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        path = index.save(directory)
+        result["save_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        started = time.perf_counter()
+        loaded = VectorIndex.load(directory)
+        result["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        started = time.perf_counter()
+        loaded.search(next(probes), k)
+        result["first_query_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["matrix_mb"] = round(os.path.getsize(os.path.join(path, "vectors.npy")) / 2 ** 20)
+        del loaded
+    return result
+
+
+def main(args: argparse.Namespace) -> None:
+    results = [run(size, args.dimensions, args.k, args.queries, seed=size) for size in args.sizes]
+    print(json.dumps({"dimensions": args.dimensions, "k": args.k, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,375 @@
+"""
+In-process stand-in for the Supabase REST (PostgREST) and Auth (GoTrue) APIs.
+
+Implements only the calls made by the repositories, keeps all rows in memory
+and adds a configurable delay (latency plus uniform jitter) to every request so benchmarks see realistic
+network latency without touching a real project. inject_faults() makes a share of requests fail or stall.
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import jwt
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def _split_list(value: str) -> List[str]:
+    """Split a PostgREST `(a,"b,c")` list while honouring double quotes."""
+    items, current, quoted = [], "", False
+    for char in value:
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    items.append(current)
+    return items
+
+
+def _compare(row_value: Any, op: str, value: str) -> bool:
+    if op == "is":
+        return row_value is None if value == "null" else str(row_value).lower() == value
+    if row_value is None:
+        return False
+    row_value = str(row_value).lower() if isinstance(row_value, bool) else str(row_value)
+    value = value.strip('"')
+    if op == "eq":
+        return row_value == value
+    if op == "neq":
+        return row_value != value
+    if op == "in":
+        return row_value in [item.strip('"') for item in _split_list(value.strip("()"))]
+    if op == "gt":
+        return row_value > value
+    if op == "gte":
+        return row_value >= value
+    if op == "lt":
+        return row_value < value
+    if op == "lte":
+        return row_value <= value
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    op, _, value = expression.partition(".")
+    if op == "not":
+        return not _matches(row, column, value)
+    return _compare(row.get(column), op, value)
+
+
+def _matches_logic(row: Dict[str, Any], expression: str, conjunction: str) -> bool:
+    """Evaluate an `or=(...)` / `and(...)` group."""
+    results = []
+    for term in _split_logic(expression):
+        if term.startswith("and(") or term.startswith("or("):
+            name, _, inner = term.partition("(")
+            results.append(_matches_logic(row, inner[:-1], name))
+        else:
+            column, _, rest = term.partition(".")
+            results.append(_matches(row, column, rest))
+    return all(results) if conjunction == "and" else any(results)
+
+
+def _split_logic(expression: str) -> List[str]:
+    terms, current, depth, quoted = [], "", 0, False
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        if not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            terms.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        terms.append(current)
+    return terms
+
+
+class FakeSupabase:
+    """Holds the fake tables and auth users and exposes them as an ASGI app."""
+
+    RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 0,
+        dispatch_latency: float = 0.0,
+        dispatch_error_rate: float = 0.0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        # Extra delay and failure rate of OTP, recovery and resend calls (the SMS/email provider behind Auth)
+        self.dispatch_latency = dispatch_latency
+        self.dispatch_error_rate = dispatch_error_rate
+        self.dispatched = 0
+        self._random = random.Random(seed)
+        self._faults = random.Random(seed + 1)
+        self.inject_faults()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.auth_users: Dict[str, Dict[str, Any]] = {}
+        self.request_count = 0
+        self.router = Starlette(routes=[
+            Route("/rest/v1/{table}", self.rest, methods=["GET", "POST", "PATCH", "DELETE"]),
+            Route("/auth/v1/token", self.token, methods=["POST"]),
+            Route("/auth/v1/verify", self.verify, methods=["POST"]),
+            Route("/auth/v1/otp", self.accepted, methods=["POST"]),
+            Route("/auth/v1/recover", self.accepted, methods=["POST"]),
+            Route("/auth/v1/resend", self.accepted, methods=["POST"]),
+            Route("/auth/v1/user", self.user, methods=["GET"]),
+            Route("/auth/v1/.well-known/jwks.json", self.jwks, methods=["GET"]),
+        ])
+
+    # Fault injection
+
+    def inject_faults(
+        self,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_seconds: float = 0.0,
+        paths: Tuple[str, ...] = ("/rest/v1/", "/auth/v1/"),
+        gzip: bool = False
+    ) -> None:
+        """
+        Answer a share of requests under paths with 503, and delay a share by slow_seconds. No arguments heals.
+
+        gzip compresses every response body for clients that accept it, as a CDN in front of Supabase may.
+        """
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.fault_paths = paths
+        self.gzip = gzip
+        self.faults = {"errors": 0, "slow": 0}
+
+    async def app(self, scope, receive, send) -> None:
+        """The ASGI app served by FakeSupabaseServer: the routes behind the injected faults."""
+        if scope["type"] == "http" and scope["path"].startswith(self.fault_paths):
+            if self.slow_rate and self._faults.random() < self.slow_rate:
+                self.faults["slow"] += 1
+                await asyncio.sleep(self.slow_seconds)
+            if self.error_rate and self._faults.random() < self.error_rate:
+                self.faults["errors"] += 1
+                self.request_count += 1
+                await JSONResponse({"message": "injected fault"}, status_code=503)(scope, receive, send)
+                return
+        if self.gzip:
+            await GZipMiddleware(self.router, minimum_size=0)(scope, receive, send)
+            return
+        await self.router(scope, receive, send)
+
+    # Seeding
+
+    def seed_user(self, email: Optional[str] = None, phone: Optional[str] = None, password: str = "", **fields) -> Dict[str, Any]:
+        """Create a matching `users` row and auth identity."""
+        now = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+        row = {
+            "id": str(uuid4()),
+            "email": email,
+            "phone": phone,
+            "first_name": "Bench",
+            "last_name": "User",
+            "country": "IN",
+            "user_type": "job_seeker",
+            "is_active": True,
+            "is_verified": True,
+            "work_status": "experienced",
+            "company_id": None,
+            "created_at": now,
+            "updated_at": now,
+            **fields,
+        }
+        self.tables.setdefault("users", []).append(row)
+        self.auth_users[email or phone] = {"id": row["id"], "email": email, "phone": phone, "password": password}
+        return row
+
+    # Helpers
+
+    async def _delay(self) -> None:
+        self.request_count += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+    def _auth_user(self, identity: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": identity["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": identity.get("email"),
+            "phone": identity.get("phone"),
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": "2024-01-01T00:00:00+00:00",
+        }
+
+    def _session(self, identity: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "access_token": f"token-{identity['id']}",
+            "refresh_token": "refresh",
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "expires_at": int(time.time()) + 3600,
+            "user": self._auth_user(identity),
+        }
+
+    def _filter(self, rows: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+        for key, expression in params.multi_items():
+            if key in self.RESERVED_PARAMS:
+                continue
+            if key in ("or", "and"):
+                rows = [row for row in rows if _matches_logic(row, expression[1:-1], key)]
+            else:
+                rows = [row for row in rows if _matches(row, key, expression)]
+        return rows
+
+    # PostgREST
+
+    async def rest(self, request: Request) -> Response:
+        await self._delay()
+        table = self.tables.setdefault(request.path_params["table"], [])
+        params = request.query_params
+
+        if request.method == "POST":
+            payload = json.loads(await request.body())
+            rows = payload if isinstance(payload, list) else [payload]
+            conflict = params.get("on_conflict")
+            stored = []
+            for row in rows:
+                existing = next((other for other in table if conflict and other.get(conflict) == row.get(conflict)), None)
+                if existing is not None:
+                    # Upsert: merge into the row that holds the same key
+                    existing.update(row)
+                    stored.append(existing)
+                    continue
+                row.setdefault("id", str(uuid4()))
+                row.setdefault("created_at", time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()))
+                table.append(row)
+                stored.append(row)
+            return JSONResponse(stored, status_code=201)
+
+        rows = self._filter(table, params)
+
+        if request.method == "PATCH":
+            changes = json.loads(await request.body())
+            for row in rows:
+                row.update(changes)
+            return JSONResponse(rows)
+
+        if request.method == "DELETE":
+            for row in rows:
+                table.remove(row)
+            return JSONResponse(rows)
+
+        if "order" in params:
+            for term in reversed(params["order"].split(",")):
+                column, _, direction = term.partition(".")
+                rows = sorted(rows, key=lambda row: str(row.get(column)), reverse=direction.startswith("desc"))
+        offset = int(params.get("offset", 0))
+        if "limit" in params:
+            rows = rows[offset:offset + int(params["limit"])]
+        elif offset:
+            rows = rows[offset:]
+        return JSONResponse(self._embed(rows, params.get("select", "*")))
+
+    def _embed(self, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        """Resolve `alias:table(*)` embeds through the `<singular table>_id` foreign key."""
+        embeds = re.findall(r"(?:(\w+):)?(\w+)\(\*\)", select)
+        if not embeds:
+            return rows
+        embedded = []
+        for row in rows:
+            row = dict(row)
+            for alias, table in embeds:
+                foreign_key = f"{table.rstrip('s')}_id"
+                target = next(
+                    (other for other in self.tables.get(table, []) if str(other.get("id")) == str(row.get(foreign_key))),
+                    None
+                )
+                row[alias or table] = target
+            embedded.append(row)
+        return embedded
+
+    # GoTrue
+
+    async def token(self, request: Request) -> Response:
+        await self._delay()
+        body = json.loads(await request.body())
+        identity = self.auth_users.get(body.get("email") or body.get("phone"))
+        if not identity or identity["password"] != body.get("password"):
+            return JSONResponse({"error": "invalid_grant", "error_description": "Invalid login credentials"}, status_code=400)
+        return JSONResponse(self._session(identity))
+
+    async def verify(self, request: Request) -> Response:
+        await self._delay()
+        body = json.loads(await request.body())
+        identity = self.auth_users.get(body.get("phone") or body.get("email"))
+        if not identity or body.get("token") != "123456":
+            return JSONResponse({"msg": "Token has expired or is invalid"}, status_code=403)
+        return JSONResponse(self._session(identity))
+
+    async def accepted(self, request: Request) -> Response:
+        await self._delay()
+        body = json.loads(await request.body() or b"{}")
+        # Rejected before anything is sent, with the 4xx Supabase Auth answers
+        if request.url.path.endswith("/otp") and not re.fullmatch(r"\+[1-9]\d{7,14}", body.get("phone") or ""):
+            return JSONResponse({"code": "validation_failed", "msg": "Invalid phone number format (E.164 required)"}, status_code=400)
+        if request.url.path.endswith("/recover") and not body.get("email"):
+            return JSONResponse({"code": "validation_failed", "msg": "Unable to validate email address: invalid format"}, status_code=400)
+        if self.dispatch_latency:
+            await asyncio.sleep(self.dispatch_latency)
+        if self.dispatch_error_rate and self._random.random() < self.dispatch_error_rate:
+            return JSONResponse({"msg": "Error sending message"}, status_code=500)
+        self.dispatched += 1
+        return JSONResponse({})
+
+    async def jwks(self, request: Request) -> Response:
+        return JSONResponse({"keys": []})
+
+    async def user(self, request: Request) -> Response:
+        await self._delay()
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").removeprefix("token-")
+        if token.count(".") == 2:
+            token = jwt.decode(token, options={"verify_signature": False}).get("sub", "")
+        for identity in self.auth_users.values():
+            if identity["id"] == token:
+                return JSONResponse(self._auth_user(identity))
+        return JSONResponse({"msg": "invalid JWT"}, status_code=401)
+
+
+class FakeSupabaseServer:
+    """Runs a FakeSupabase app on a background thread with its own event loop."""
+
+    def __init__(self, fake: FakeSupabase, host: str = "127.0.0.1", port: int = 54321):
+        self.fake = fake
+        self.url = f"http://{host}:{port}"
+        # The app is a bound coroutine method, which uvicorn's interface detection would take for ASGI2
+        config = uvicorn.Config(fake.app, host=host, port=port, log_level="warning", lifespan="off", interface="asgi3")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "FakeSupabaseServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.should_exit = True
+        self._thread.join()
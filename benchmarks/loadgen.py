@@ -0,0 +1,69 @@
+"""Small closed-loop load generator shared by the benchmarks."""
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+BENCH_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:54321",
+    "SUPABASE_ANON_KEY": "bench-anon-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "bench-service-key",
+    "OPENAI_API_KEY": "bench",
+    "EMBEDDING_BACKEND": "fake",
+    "EMBEDDING_ENCODING": "bytes",
+    "EMBEDDING_CACHE_PATH": ":memory:",
+    "VECTOR_INDEX_PATH": "",
+    "LLM_BACKEND": "fake",
+    "LLM_CACHE_PATH": ":memory:",
+    "JOBS_BACKEND": "memory",
+    "LOGTAIL_SOURCE_TOKEN": "",
+    "LOGTAIL_INGESTING_HOST": "",
+    # Load runs reuse a handful of phones and emails; bench_rate_limit turns the limiter back on
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def configure_env(**overrides: str) -> None:
+    """Point the settings at the fake server before the app is imported."""
+    for key, value in {**BENCH_ENV, **overrides}.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(send: Callable[[int], Awaitable[bool]], requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue `requests` calls with at most `concurrency` in flight and summarise them."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            ok = await send(index)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
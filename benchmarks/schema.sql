@@ -0,0 +1,70 @@
+-- Tables used by AuthRepository and CompanyRepository, for running the Postgres
+-- repository backend against a local database:
+--
+--     psql "$DATABASE_URL" -f benchmarks/schema.sql
+
+create table if not exists companies (
+    id uuid primary key,
+    company_name text not null unique,
+    registration_number text,
+    country text not null,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists users (
+    id uuid primary key,
+    email text unique,
+    phone text unique,
+    first_name text not null,
+    last_name text not null,
+    country text not null,
+    user_type text not null,
+    is_active boolean not null default true,
+    is_verified boolean not null default false,
+    work_status text,
+    company_id uuid references companies (id),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists users_created_at_id_idx on users (created_at, id);
+create index if not exists companies_created_at_id_idx on companies (created_at, id);
+
+create table if not exists auth_methods (
+    id uuid primary key,
+    user_id uuid not null references users (id) on delete cascade,
+    auth_type text not null,
+    auth_provider text,
+    auth_id text not null,
+    is_primary boolean not null default true,
+    created_at timestamptz not null default now(),
+    last_used timestamptz,
+    password_hash text,
+    email_verification_token text,
+    phone_otp text
+);
+
+create index if not exists auth_methods_user_id_idx on auth_methods (user_id);
+
+create table if not exists social_accounts (
+    id uuid primary key default gen_random_uuid(),
+    user_id uuid not null references users (id) on delete cascade,
+    provider text not null,
+    social_id text not null,
+    email text,
+    unique (provider, social_id)
+);
+
+create table if not exists resumes (
+    id uuid primary key default gen_random_uuid(),
+    user_id uuid not null unique references users (id) on delete cascade,
+    filename text,
+    content_type text not null,
+    size_bytes integer not null,
+    page_count integer not null,
+    text text not null,
+    skills text[] not null default '{}',
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
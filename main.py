@@ -1,47 +1,120 @@
-from datetime import datetime
-import json
-import logging
-from logtail import LogtailHandler
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from app.api import api_router
-from app.core.config import settings
-from app.core.exceptions import AppException
+# Imported first so every import below shows up in the startup report served at /ready
+from app.core.startup import readiness_endpoint, startup_profile
+startup_profile.track_imports()
 
-class JSONFormatter(logging.Formatter):
-    def format(self, record) -> str:
-        log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno
-        }
-        if hasattr(record, "extra"):
-            log_record.update(record.extra)
-        return json.dumps(log_record)
+import asyncio  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+import logging  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from app.api import api_router  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.exceptions import AppException  # noqa: E402
+from app.core.log_pipeline import log_pipeline  # noqa: E402
+from app.core.metrics import PrometheusMiddleware, mark_process_dead, metrics_endpoint  # noqa: E402
+from app.core.security import token_verifier  # noqa: E402
+from app.infrastructure.embedding_cache import close_embedding_cache  # noqa: E402
+from app.infrastructure.job_queue import JobQueue  # noqa: E402
+from app.infrastructure.llm_cache import close_llm_cache  # noqa: E402
+from app.infrastructure.supabase_client import SupabaseClient  # noqa: E402
+from app.repositories.factory import uses_postgres  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from app.services.embedding_service import EmbeddingService  # noqa: E402
+from app.services.facet_service import CandidateFacetService  # noqa: E402
+from app.services.resume_evaluation_service import ResumeEvaluationService  # noqa: E402
+from app.services.resume_service import ResumeService, document_parser_pool  # noqa: E402
+from app.services.search_service import CandidateSearchService  # noqa: E402
+from app.services.skill_service import SkillService, skill_extraction_pool  # noqa: E402
+from app.utils.password_utils import password_executor  # noqa: E402
 
-# Configure logging
+# Configure logging: every module logger feeds the non-blocking log pipeline
+log_pipeline.install(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Add Logtail handler
-logtail_handler = LogtailHandler(
-    source_token=settings.LOGTAIL_SOURCE_TOKEN,
-    host=settings.LOGTAIL_INGESTING_HOST
-)
-logger.addHandler(logtail_handler)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled connections and build the services on startup; release them on shutdown."""
+    with startup_profile.phase("log_pipeline"):
+        log_pipeline.start()
+    with startup_profile.phase("supabase"):
+        await SupabaseClient.connect()
+    if uses_postgres():
+        from app.infrastructure.postgres_client import PostgresClient
+        with startup_profile.phase("postgres"):
+            await PostgresClient.connect()
+    with startup_profile.phase("token_verifier"):
+        await token_verifier.start()
+    with startup_profile.phase("services"):
+        app.state.job_queue = JobQueue.from_settings()
+        auth_service = AuthService(jobs=app.state.job_queue)
+        app.state.auth_service = auth_service
+        app.state.auth_repository = auth_service.auth_repo
+        app.state.company_repository = auth_service.company_repo
+        app.state.resume_service = ResumeService()
+        app.state.resume_evaluation_service = ResumeEvaluationService(app.state.resume_service.resume_repo)
+        app.state.skill_service = SkillService(app.state.resume_service.resume_repo)
+        app.state.embedding_service = EmbeddingService()
+        app.state.search_service = CandidateSearchService(
+            app.state.embedding_service, auth_service.auth_repo, app.state.resume_service.resume_repo
+        )
+        app.state.facet_service = CandidateFacetService(auth_service.auth_repo, app.state.resume_service.resume_repo)
+    with startup_profile.phase("job_queue"):
+        await app.state.job_queue.start()
+    with startup_profile.phase("search_index"):
+        await app.state.search_service.start()
+        await app.state.facet_service.start()
+    password_executor.start()
+    
+    startup_profile.ready()
+    report = startup_profile.report(settings.STARTUP_TARGET_SECONDS)
+    logger.info("Worker ready", extra={key: report[key] for key in ("boot_ms", "import_ms", "lifespan_ms", "target_ms")})
+    if report["within_target"] is False:
+        logger.warning(f"Worker boot took {report['boot_ms']}ms, over the {report['target_ms']}ms target")
+    
+    # Worker processes, the tokenizer, the embedding client and the skill automaton load after ready, so they never delay it;
+    # the bcrypt cost is calibrated there too, whether or not the password workers are warmed first
+    warm_tasks = [
+        asyncio.create_task(app.state.embedding_service.warm()),
+        asyncio.create_task(app.state.skill_service.warm()),
+        asyncio.create_task(password_executor.prepare(warm=settings.PASSWORD_POOL_WARM))
+    ]
+    try:
+        yield
+    finally:
+        for task in warm_tasks:
+            task.cancel()
+        # Drained first: queued jobs still need the Supabase client
+        await app.state.job_queue.stop()
+        app.state.job_queue.close()
+        await app.state.search_service.stop()
+        await app.state.facet_service.stop()
+        password_executor.shutdown()
+        document_parser_pool.shutdown()
+        skill_extraction_pool.shutdown()
+        close_embedding_cache()
+        close_llm_cache()
+        await token_verifier.stop()
+        if uses_postgres():
+            from app.infrastructure.postgres_client import PostgresClient
+            await PostgresClient.close()
+        await SupabaseClient.close()
+        mark_process_dead()
+        log_pipeline.stop()
 
 # Create FastAPI application
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="APIs for SkillSync: AI-driven professional platform",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(PrometheusMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.add_route("/ready", readiness_endpoint, include_in_schema=False)
 
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
@@ -57,7 +130,8 @@ async def app_exception_handler(request: Request, exc: AppException):
     )
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.message}
+        content={"detail": exc.message},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -75,3 +149,5 @@ async def general_exception_handler(request: Request, exc: Exception):
         status_code=500,
         content={"detail": "An unexpected error occurred"}
     )
+
+startup_profile.imports_done()